@@ -1,7 +1,18 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from backend.routes import chat, admin
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create the chatbot before the first request and load its tokenizer
+    await chat.start_chatbot_service()
+    yield
+    # Write buffered conversation messages and stop background threads
+    await chat.close_chatbot_service()
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(chat.router, prefix="/api/chat", tags=["chat"])
 app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
\ No newline at end of file
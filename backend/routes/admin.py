@@ -1,37 +1,29 @@
-import os
+import asyncio
 import logging
 from typing import List, Optional
 
-from fastapi import APIRouter, Header, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 
+from backend.routes.auth import ADMIN_PASSWORD, verify_admin_token
+from backend.routes.chat import get_chatbot_service
 from backend.services.admin_qa_service import AdminQAService
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "k2admin2026")
-
-_admin_qa_service = None
-
-def get_admin_qa_service() -> AdminQAService:
-    """Get or create AdminQAService instance."""
-    global _admin_qa_service
-    if _admin_qa_service is None:
-        _admin_qa_service = AdminQAService()
-    return _admin_qa_service
-
-def verify_admin_token(authorization: Optional[str] = Header(None)) -> bool:
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Authorization header required")
-    parts = authorization.split()
-    if len(parts) != 2 or parts[0].lower() != "bearer":
-        raise HTTPException(status_code=401, detail="Invalid authorization header format")
-    token = parts[1]
-    if token != ADMIN_PASSWORD:
-        raise HTTPException(status_code=401, detail="Invalid authentication token")
-    return True
+async def get_admin_qa_service() -> AdminQAService:
+    """
+    Get the chatbot's AdminQAService, so edits are matched by this worker
+    right away, caught up on edits made through other workers.
+    
+    Catching up and editing take a lock shared with the other workers and
+    read or write the file, so routes run them in a thread.
+    """
+    admin_qa_service = get_chatbot_service().admin_qa_service
+    await asyncio.to_thread(admin_qa_service.refresh)
+    return admin_qa_service
 
 # --- Models ---
 class LoginRequest(BaseModel):
@@ -66,14 +58,14 @@ async def admin_login(request: LoginRequest):
 
 @router.get("/qa", response_model=List[QAPairResponse])
 async def get_all_qa_pairs(authenticated: bool = Depends(verify_admin_token)):
-    admin_qa_service = get_admin_qa_service()
-    qa_pairs = admin_qa_service.get_all_qa_pairs()
+    admin_qa_service = await get_admin_qa_service()
+    qa_pairs = await asyncio.to_thread(admin_qa_service.get_all_qa_pairs)
     return qa_pairs
 
 @router.get("/qa/{qa_id}", response_model=QAPairResponse)
 async def get_qa_pair(qa_id: int, authenticated: bool = Depends(verify_admin_token)):
-    admin_qa_service = get_admin_qa_service()
-    qa_pair = admin_qa_service.get_qa_pair(qa_id)
+    admin_qa_service = await get_admin_qa_service()
+    qa_pair = await asyncio.to_thread(admin_qa_service.get_qa_pair, qa_id)
     if not qa_pair:
         raise HTTPException(status_code=404, detail="Q&A pair not found")
     return qa_pair
@@ -83,8 +75,8 @@ async def create_qa_pair(
     request: QAPairRequest,
     authenticated: bool = Depends(verify_admin_token)
 ):
-    admin_qa_service = get_admin_qa_service()
-    qa = admin_qa_service.add_qa_pair(request.question, request.answer)
+    admin_qa_service = await get_admin_qa_service()
+    qa = await asyncio.to_thread(admin_qa_service.add_qa_pair, request.question, request.answer)
     return qa
 
 @router.put("/qa/{qa_id}", response_model=QAPairResponse)
@@ -93,8 +85,8 @@ async def update_qa_pair(
     request: QAPairUpdateRequest,
     authenticated: bool = Depends(verify_admin_token)
 ):
-    admin_qa_service = get_admin_qa_service()
-    qa = admin_qa_service.update_qa_pair(qa_id, request.question, request.answer)
+    admin_qa_service = await get_admin_qa_service()
+    qa = await asyncio.to_thread(admin_qa_service.update_qa_pair, qa_id, request.question, request.answer)
     if not qa:
         raise HTTPException(status_code=404, detail="Q&A pair not found")
     return qa
@@ -104,8 +96,16 @@ async def delete_qa_pair(
     qa_id: int,
     authenticated: bool = Depends(verify_admin_token)
 ):
-    admin_qa_service = get_admin_qa_service()
-    success = admin_qa_service.delete_qa_pair(qa_id)
+    admin_qa_service = await get_admin_qa_service()
+    success = await asyncio.to_thread(admin_qa_service.delete_qa_pair, qa_id)
     if not success:
         raise HTTPException(status_code=404, detail="Q&A pair not found")
-    return {"success": True, "id": qa_id}
\ No newline at end of file
+    return {"success": True, "id": qa_id}
+
+@router.post("/translations")
+async def translate_curated_answers(authenticated: bool = Depends(verify_admin_token)):
+    """
+    Translate curated answers that have no translation yet into the
+    configured languages, and drop translations of edited answers.
+    """
+    return await get_chatbot_service().translate_curated_answers()
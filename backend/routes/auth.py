@@ -0,0 +1,17 @@
+import os
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "k2admin2026")
+
+def verify_admin_token(authorization: Optional[str] = Header(None)) -> bool:
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Authorization header required")
+    parts = authorization.split()
+    if len(parts) != 2 or parts[0].lower() != "bearer":
+        raise HTTPException(status_code=401, detail="Invalid authorization header format")
+    token = parts[1]
+    if token != ADMIN_PASSWORD:
+        raise HTTPException(status_code=401, detail="Invalid authentication token")
+    return True
@@ -1,7 +1,35 @@
-from fastapi import APIRouter, Request
+import json
+import uuid
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+
+from backend.models.schemas import ChatRequest
+from backend.routes.auth import verify_admin_token
+from backend.services.chatbot_service import ChatbotService
 
 router = APIRouter()
 
+_chatbot_service = None
+
+def get_chatbot_service() -> ChatbotService:
+    """Get or create ChatbotService instance."""
+    global _chatbot_service
+    if _chatbot_service is None:
+        _chatbot_service = ChatbotService()
+    return _chatbot_service
+
+async def start_chatbot_service() -> None:
+    """Create the ChatbotService on startup and load its tokenizer off the event loop."""
+    await get_chatbot_service().start()
+
+async def close_chatbot_service() -> None:
+    """Flush and release the ChatbotService on shutdown, if it was created."""
+    global _chatbot_service
+    if _chatbot_service is not None:
+        await _chatbot_service.close()
+        _chatbot_service = None
+
 @router.post("/")
 async def chat_endpoint(request: Request):
     try:
@@ -10,4 +38,45 @@ async def chat_endpoint(request: Request):
         # IMPORTANT: Try "answer" and/or "response" as the key
         return {"answer": f"You said: {user_message}"}
     except Exception as e:
-        return {"answer": f"Error: {str(e)}"}
\ No newline at end of file
+        return {"answer": f"Error: {str(e)}"}
+
+@router.post("/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """
+    Stream the chatbot's answer as Server-Sent Events.
+    Curated answers arrive as one "message" event; LLM answers arrive as
+    "token" events followed by a "done" event with the full response.
+    """
+    chatbot_service = get_chatbot_service()
+    conversation_id = request.conversation_id or str(uuid.uuid4())
+
+    async def event_stream():
+        async for event in chatbot_service.process_message_stream(
+            request.message,
+            conversation_id,
+            language=request.language,
+            context=request.context
+        ):
+            data = dict(event["data"], conversation_id=conversation_id)
+            yield f"event: {event['event']}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/metrics")
+async def chat_metrics_endpoint(authenticated: bool = Depends(verify_admin_token)):
+    """
+    Report LLM admission control, curated matching, response cache, answer
+    translation and conversation store metrics.
+    """
+    chatbot_service = get_chatbot_service()
+    return {
+        "llm": chatbot_service.get_llm_stats(),
+        "matching": chatbot_service.get_matching_stats(),
+        "cache": chatbot_service.get_cache_stats(),
+        "translations": chatbot_service.get_translation_stats(),
+        "conversations": chatbot_service.get_conversation_stats()
+    }
@@ -0,0 +1,258 @@
+import json
+import os
+import tempfile
+import threading
+from typing import Callable, ContextManager, Optional, Dict, List, Tuple
+from pathlib import Path
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def write_json_atomic(file_path: Path, data: Dict) -> None:
+    """
+    Write JSON to a file so readers only ever see the old or the new content.
+    The data goes to a temporary file in the same directory, is flushed to
+    disk, and then renamed over the target.
+
+    Args:
+        file_path: Destination file
+        data: JSON-serializable data
+    """
+    file_path = Path(file_path)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def replay_records(qa_pairs: List[Dict], next_id: int, records: List[Dict]) -> Tuple[List[Dict], int]:
+    """
+    Apply journal records on top of snapshot pairs.
+
+    Args:
+        qa_pairs: Pairs from the snapshot, in list order; updated in place
+        next_id: Next ID from the snapshot
+        records: Journal records in the order they were written
+
+    Returns:
+        (pairs in list order, next ID) after the records
+    """
+    pairs_by_id = {qa['id']: qa for qa in qa_pairs}
+    for record in records:
+        next_id = max(next_id, record.get('next_id', 1))
+        if record.get('op') == 'put':
+            qa = record['qa']
+            if qa['id'] in pairs_by_id:
+                # Updates keep the pair's position
+                pairs_by_id[qa['id']].update(qa)
+            else:
+                pairs_by_id[qa['id']] = qa
+        elif record.get('op') == 'delete':
+            pairs_by_id.pop(record['id'], None)
+    return list(pairs_by_id.values()), next_id
+
+
+class AdminQAJournal:
+    """
+    Append-only journal of admin Q&A mutations.
+
+    Each add, update or delete appends one JSON line instead of rewriting the
+    whole snapshot. Records are idempotent ("put" carries the full pair,
+    "delete" the id), so replaying them over a snapshot that already contains
+    some of them gives the same result. Compaction folds the journal into a
+    new snapshot:
+
+    1. the live journal is renamed to `<journal>.compacting` (or appended to
+       a `.compacting` file left by a crash);
+    2. the snapshot, replayed from the files themselves, is written to a
+       temporary file and renamed into place;
+    3. `<journal>.compacting` is deleted.
+
+    A crash at any step leaves snapshot + compacting + journal replayable.
+    Appends, compactions and reads hold the lock passed in as `locked`, which
+    must be shared by every process using the files, so a compaction never
+    interleaves with another worker's append, read or compaction.
+    """
+
+    def __init__(
+        self,
+        snapshot_path: Path,
+        compact_threshold: int = 500,
+        locked: Optional[Callable[[], ContextManager]] = None
+    ):
+        """
+        Initialize the journal next to the snapshot file.
+
+        Args:
+            snapshot_path: Path to the JSON snapshot (admin_qa.json)
+            compact_threshold: Number of journal records that triggers compaction
+            locked: Returns a re-entrant context manager holding the files
+                    exclusively across processes. Defaults to a lock that
+                    only serializes the threads of this process
+        """
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = self.snapshot_path.with_suffix('.journal')
+        self.compacting_path = self.snapshot_path.with_suffix('.journal.compacting')
+        self.compact_threshold = compact_threshold
+        self.record_count = 0
+
+        if locked is None:
+            lock = threading.RLock()
+            locked = lambda: lock
+        self._locked = locked
+        self._compaction_thread: Optional[threading.Thread] = None
+
+    def read(self) -> Tuple[List[Dict], int]:
+        """
+        Read the snapshot with the journal replayed on top. The caller
+        holds the lock, so no compaction moves records in between.
+
+        Returns:
+            (pairs in list order, next ID)
+
+        Raises:
+            OSError, json.JSONDecodeError: If the snapshot cannot be read or parsed
+        """
+        records = self.read_records()
+        with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return replay_records(data.get('qa_pairs', []), data.get('next_id', 1), records)
+
+    def read_records(self) -> List[Dict]:
+        """
+        Read all journal records that are not yet part of the snapshot.
+
+        Returns:
+            Records in the order they were written
+        """
+        records = []
+        for path in (self.compacting_path, self.journal_path):
+            if not path.exists():
+                continue
+            with open(path, 'rb') as f:
+                lines = f.read().split(b"\n")
+            # The last element is empty unless a crash tore the final append
+            torn_tail = lines.pop()
+            for line_number, line in enumerate(lines, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping unreadable admin Q&A journal record at {path}:{line_number}")
+            if torn_tail:
+                logger.warning(f"Dropping torn admin Q&A journal record at the end of {path}")
+                # Cut it off so the next append starts on a fresh line
+                with open(path, 'r+b') as f:
+                    f.truncate(os.path.getsize(path) - len(torn_tail))
+
+        self.record_count = len(records)
+        return records
+
+    def append(self, record: Dict) -> bool:
+        """
+        Durably append one record to the journal.
+
+        Args:
+            record: The mutation record
+
+        Returns:
+            True if the record was written, False otherwise
+        """
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        try:
+            with self._locked():
+                with open(self.journal_path, 'a', encoding='utf-8') as f:
+                    f.write(line)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.record_count += 1
+            return True
+        except Exception as e:
+            logger.error(f"Error appending to admin Q&A journal: {e}")
+            return False
+
+    @property
+    def needs_compaction(self) -> bool:
+        """Whether the journal has grown past the compaction threshold."""
+        return self.record_count >= self.compact_threshold and not self.is_compacting
+
+    @property
+    def is_compacting(self) -> bool:
+        """Whether a background compaction is running."""
+        return self._compaction_thread is not None and self._compaction_thread.is_alive()
+
+    def compact(self, background: bool = True) -> bool:
+        """
+        Fold the journal into a new snapshot.
+
+        The snapshot is replayed from the files while holding the lock, not
+        taken from this worker's memory, so it contains every worker's
+        records and a later compaction never writes an older snapshot.
+
+        Args:
+            background: Compact on a background thread
+
+        Returns:
+            True if compaction was started (or finished, when not in background)
+        """
+        if not background:
+            return self._compact()
+        if self.is_compacting:
+            return False
+        self._compaction_thread = threading.Thread(
+            target=self._compact,
+            name="admin-qa-compaction",
+            daemon=True
+        )
+        self._compaction_thread.start()
+        return True
+
+    def wait_for_compaction(self, timeout: Optional[float] = None) -> None:
+        """
+        Block until a running background compaction has finished. Do not
+        call it while holding the lock, which the compaction waits for.
+        """
+        thread = self._compaction_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _compact(self) -> bool:
+        """Rename the journal, write the replayed snapshot and drop the folded records."""
+        try:
+            with self._locked():
+                qa_pairs, next_id = self.read()
+                if self.compacting_path.exists():
+                    # A previous compaction never finished; keep its records by
+                    # folding the live journal into it before starting over
+                    if self.journal_path.exists():
+                        with open(self.journal_path, 'r', encoding='utf-8') as src, \
+                                open(self.compacting_path, 'a', encoding='utf-8') as dst:
+                            dst.write(src.read())
+                        os.unlink(self.journal_path)
+                elif self.journal_path.exists():
+                    os.replace(self.journal_path, self.compacting_path)
+                else:
+                    return True
+
+                write_json_atomic(self.snapshot_path, {"qa_pairs": qa_pairs, "next_id": next_id})
+                os.unlink(self.compacting_path)
+                self.record_count = 0
+            logger.info(f"Compacted admin Q&A journal into {self.snapshot_path}")
+            return True
+        except Exception as e:
+            # The compacting file is kept and replayed on the next load
+            logger.error(f"Error compacting admin Q&A journal: {e}")
+            return False
@@ -1,36 +1,359 @@
+import functools
 import json
 import os
-from typing import Optional, Dict, List
+import threading
+from collections import deque
+from typing import Callable, Deque, Optional, Dict, FrozenSet, Iterable, List, Set, Tuple
 from pathlib import Path
 import logging
-import re
+
+from .admin_qa_journal import AdminQAJournal, write_json_atomic
+from .generation_counter import GenerationCounter
+from .matching_pipeline import MatchQuery
+from .sqlite_qa_store import SQLiteAdminQAStore
+from .text_language import WORD_RE, entry_language, keyword_language, normalize_text
 
 logger = logging.getLogger(__name__)
 
+# Versions whose question changes are kept for changes_since
+CHANGE_LOG_SIZE = 1000
+
+
+class _AdminPartition:
+    """
+    The exact question map of one language's pairs, and word -> pair id
+    postings of the words written in its script; size counts the pairs
+    with a question or a word in it.
+    """
+    
+    def __init__(self):
+        self.size = 0
+        self.exact_index: Dict[str, Set[int]] = {}
+        self.token_index: Dict[str, Set[int]] = {}
+
+
+class _AdminIndex:
+    """
+    Immutable snapshot of the admin Q&A pairs with their match index:
+    per-pair normalized question and word set, and per language an exact
+    question map and a word -> pair id posting index.
+    
+    Edits and reloads build a new snapshot, which `edited` does by sharing
+    everything the edit leaves unchanged with the current one, and swap it
+    in with one assignment; readers on any thread see either snapshot whole.
+    """
+    
+    def __init__(self, qa_pairs: List[Dict], next_id: int = 1):
+        """
+        Index pairs in list order.
+        
+        Args:
+            qa_pairs: Q&A pairs in list order
+            next_id: Persisted next ID; raised past the highest existing ID if needed
+        """
+        # Pairs keyed by ID; dict order is the list order of the file
+        self.pairs_by_id: Dict[int, Dict] = {qa['id']: qa for qa in qa_pairs}
+        # Next ID to hand out; persisted so IDs are never reused after deletes
+        self.next_id = max([next_id] + [qa_id + 1 for qa_id in self.pairs_by_id])
+        
+        self.indexed: Dict[int, Dict] = {}
+        self.partitions: Dict[str, _AdminPartition] = {}
+        self.next_seq = 0
+        # Languages whose partition (and posting sets) this snapshot may
+        # modify while it is being built; None when it owns all of them
+        self._owned: Optional[Set[str]] = None
+        for qa in self.pairs_by_id.values():
+            self._add(qa)
+    
+    def edited(
+        self,
+        put: Iterable[Dict] = (),
+        deleted: Iterable[int] = (),
+        next_id: int = 1
+    ) -> "_AdminIndex":
+        """
+        A new snapshot with pairs deleted and pairs put; this one is left as is.
+        
+        Args:
+            put: Pairs replacing the pair with their ID in place, or appended
+            deleted: IDs of the pairs to delete
+            next_id: Persisted next ID, if it moved past the current one
+        """
+        index = _AdminIndex.__new__(_AdminIndex)
+        index.pairs_by_id = dict(self.pairs_by_id)
+        index.next_id = self.next_id
+        index.indexed = dict(self.indexed)
+        index.partitions = dict(self.partitions)
+        index.next_seq = self.next_seq
+        index._owned = set()
+        
+        for qa_id in deleted:
+            if index.pairs_by_id.pop(qa_id, None) is not None:
+                index._remove(qa_id)
+        for qa in put:
+            # Assigning to an existing key keeps its position
+            index.pairs_by_id[qa['id']] = qa
+            index._add(qa, seq=index._remove(qa['id']))
+        
+        index.next_id = max([index.next_id, next_id] + [qa_id + 1 for qa_id in index.pairs_by_id])
+        index._owned = None
+        return index
+    
+    def _partition(self, language: str) -> _AdminPartition:
+        """The partition of a language, copied first if it is shared with another snapshot."""
+        partition = self.partitions.get(language)
+        if self._owned is None or language in self._owned:
+            if partition is None:
+                partition = self.partitions[language] = _AdminPartition()
+            return partition
+        
+        copy = _AdminPartition()
+        if partition is not None:
+            copy.size = partition.size
+            copy.exact_index = dict(partition.exact_index)
+            copy.token_index = dict(partition.token_index)
+        self.partitions[language] = copy
+        self._owned.add(language)
+        return copy
+    
+    def _post(self, postings: Dict[str, Set[int]], key: str, qa_id: int, present: bool) -> None:
+        """Add or remove a pair ID in a posting set, copying sets shared with another snapshot."""
+        ids = postings.get(key)
+        if ids is None:
+            ids = set()
+        elif self._owned is not None:
+            ids = set(ids)
+        if present:
+            ids.add(qa_id)
+        else:
+            ids.discard(qa_id)
+        if ids:
+            postings[key] = ids
+        else:
+            postings.pop(key, None)
+    
+    def _add(self, qa: Dict, seq: Optional[int] = None) -> None:
+        """
+        Add a Q&A pair to the match index.
+        
+        Args:
+            qa: The Q&A pair to index
+            seq: Position in list order; new pairs go to the end
+        """
+        if seq is None:
+            seq = self.next_seq
+            self.next_seq += 1
+        
+        qa_id = qa['id']
+        question_lower = normalize_text(qa['question']).strip()
+        question_words = frozenset(WORD_RE.findall(question_lower))
+        language = entry_language(qa['question'], qa.get('language'))
+        # Each word is posted in the partition of its own script
+        word_languages = {word: keyword_language(word, language) for word in question_words}
+        
+        self.indexed[qa_id] = {
+            'seq': seq,
+            'question_lower': question_lower,
+            'question_words': question_words,
+            'language': language,
+            'word_languages': word_languages,
+            'qa': qa
+        }
+        for partition_language in {language, *word_languages.values()}:
+            self._partition(partition_language).size += 1
+        self._post(self._partition(language).exact_index, question_lower, qa_id, True)
+        for word, word_language in word_languages.items():
+            self._post(self._partition(word_language).token_index, word, qa_id, True)
+    
+    def _remove(self, qa_id: int) -> Optional[int]:
+        """
+        Remove a Q&A pair from the match index.
+        
+        Args:
+            qa_id: The ID of the Q&A pair to remove
+            
+        Returns:
+            The pair's position in list order, or None if it was not indexed
+        """
+        entry = self.indexed.pop(qa_id, None)
+        if entry is None:
+            return None
+        
+        word_languages = entry['word_languages']
+        for partition_language in {entry['language'], *word_languages.values()}:
+            partition = self._partition(partition_language)
+            partition.size -= 1
+            if not partition.size:
+                del self.partitions[partition_language]
+                continue
+            if partition_language == entry['language']:
+                self._post(partition.exact_index, entry['question_lower'], qa_id, False)
+            for word, word_language in word_languages.items():
+                if word_language == partition_language:
+                    self._post(partition.token_index, word, qa_id, False)
+        return entry['seq']
+    
+    def partitions_for(self, languages: Optional[FrozenSet[str]]) -> List[_AdminPartition]:
+        """The partitions of the languages, or all of them if None."""
+        if languages is None:
+            return list(self.partitions.values())
+        return [self.partitions[language] for language in languages if language in self.partitions]
+    
+    def in_list_order(self, qa_ids: Set[int]) -> List[Dict]:
+        """Return index entries for the given IDs in list order."""
+        entries = [self.indexed[qa_id] for qa_id in qa_ids]
+        entries.sort(key=lambda entry: entry['seq'])
+        return entries
+    
+    def applied(self, qa_pairs: List[Dict], next_id: int) -> Optional[Tuple["_AdminIndex", List[str], List[str]]]:
+        """
+        A snapshot in line with a newer list of the pairs, re-indexing only
+        pairs that were added, changed or deleted.
+        
+        Args:
+            qa_pairs: The newer pairs in list order
+            next_id: The newer persisted next ID
+            
+        Returns:
+            The new snapshot with the questions of the pairs removed and
+            added (a changed pair counts as both), or None if pairs kept
+            from before changed order or new pairs were not appended, in
+            which case a snapshot must be built from scratch instead
+        """
+        new_ids = {qa['id'] for qa in qa_pairs}
+        kept = [qa_id for qa_id in self.pairs_by_id if qa_id in new_ids]
+        # Kept pairs must lead in the same order, followed by the added ones
+        if [qa['id'] for qa in qa_pairs[:len(kept)]] != kept:
+            return None
+        
+        deleted = [qa_id for qa_id in self.pairs_by_id if qa_id not in new_ids]
+        removed = [self.pairs_by_id[qa_id]['question'] for qa_id in deleted]
+        put: List[Dict] = []
+        added: List[str] = []
+        for qa in qa_pairs:
+            current = self.pairs_by_id.get(qa['id'])
+            if current == qa:
+                continue
+            if current is not None:
+                removed.append(current['question'])
+            added.append(qa['question'])
+            put.append(qa)
+        
+        return self.edited(put, deleted, next_id), removed, added
+
+
+def _shared_edit(method: Callable) -> Callable:
+    """
+    Run an admin edit holding the cross-worker lock, on top of the edits
+    other workers have published, and publish it to them if it changed
+    anything.
+    """
+    @functools.wraps(method)
+    def wrapper(self: "AdminQAService", *args, **kwargs):
+        with self._generation.locked():
+            self._catch_up()
+            version = self.version
+            result = method(self, *args, **kwargs)
+            if self.version != version:
+                self._seen_generation = self._generation.bump()
+            return result
+    return wrapper
+
 
 class AdminQAService:
     """
     Service for managing admin-curated Q&A pairs.
     Provides CRUD operations and fuzzy matching for manually added Q&As.
+    
+    Edits and refresh hold a lock shared with the other workers and write
+    or re-read the file, so they block; call them off the event loop.
+    Matching only reads the current snapshot and never blocks.
     """
     
-    def __init__(self, qa_file_path: Optional[str] = None):
+    def __init__(
+        self,
+        qa_file_path: Optional[str] = None,
+        storage_mode: Optional[str] = None,
+        backend: Optional[str] = None
+    ):
         """
         Initialize the Admin Q&A service.
         
         Args:
             qa_file_path: Path to the JSON file containing admin Q&A pairs.
                          Defaults to backend/data/admin_qa.json
+            storage_mode: "snapshot" rewrites the JSON file on every edit,
+                         "journal" appends each edit to a journal that is
+                         compacted into the JSON file in the background.
+                         Defaults to the ADMIN_QA_STORAGE env var, then "snapshot"
+            backend: "json" keeps pairs in memory and persists them to the
+                    JSON file, "sqlite" keeps them in a shared SQLite database
+                    (seeded once from the JSON file). Defaults to the
+                    QA_BACKEND env var, then "json"
         """
         if qa_file_path is None:
             backend_dir = Path(__file__).parent.parent
             qa_file_path = backend_dir / "data" / "admin_qa.json"
         
         self.qa_file_path = Path(qa_file_path)
-        self.qa_pairs: List[Dict] = []
+        
+        self.backend = backend or os.getenv("QA_BACKEND", "json")
+        if self.backend == "sqlite":
+            self._store: Optional[SQLiteAdminQAStore] = SQLiteAdminQAStore()
+        elif self.backend == "json":
+            self._store = None
+        else:
+            raise ValueError(f"Unknown Q&A backend: {self.backend}")
+        
+        # Generation shared by all workers, bumped on every admin edit; a
+        # worker that sees it move catches up on the other workers' edits
+        self._generation = GenerationCounter(self.qa_file_path.with_suffix('.generation'))
+        self._seen_generation = self._generation.value()
+        
+        self.storage_mode = storage_mode or os.getenv("ADMIN_QA_STORAGE", "snapshot")
+        if self.storage_mode == "journal" and self._store is None:
+            # Compactions hold the cross-worker lock, like edits and reloads
+            self._journal: Optional[AdminQAJournal] = AdminQAJournal(
+                self.qa_file_path,
+                compact_threshold=int(os.getenv("ADMIN_QA_JOURNAL_COMPACT_EVERY", "500")),
+                locked=self._generation.locked
+            )
+        elif self.storage_mode in ("snapshot", "journal"):
+            self._journal = None
+        else:
+            raise ValueError(f"Unknown admin Q&A storage mode: {self.storage_mode}")
+        
+        # Pairs and their match index; edits and reloads swap in a new snapshot
+        self._index = _AdminIndex([])
+        # Held while swapping in a snapshot, so a reload that read the file
+        # before an edit cannot replace the edited pairs
+        self._swap_lock = threading.Lock()
+        # (version, pairs in list order) and (version, languages of the
+        # pairs) with the SQLite backend, so reads between edits skip the database
+        self._store_pairs: Tuple[Optional[int], List[Dict]] = (None, [])
+        self._store_languages: Tuple[Optional[int], Set[str]] = (None, set())
+        
+        # Bumped on every load and every add, update or delete
+        self.version = 0
+        # (version, questions removed, questions added) of the latest
+        # versions, for changes_since; emptied by changes it cannot describe
+        self._changes: Deque[Tuple[int, List[str], List[str]]] = deque(maxlen=CHANGE_LOG_SIZE)
+        
         self._ensure_file_exists()
         self.load_qa_pairs()
     
+    @property
+    def qa_pairs(self) -> List[Dict]:
+        """All Q&A pairs in list order."""
+        if self._store is not None:
+            version, pairs = self._store_pairs
+            if version != self.version:
+                version = self.version
+                pairs = self._store.all_pairs()
+                self._store_pairs = (version, pairs)
+            return list(pairs)
+        return list(self._index.pairs_by_id.values())
+    
     def _ensure_file_exists(self) -> None:
         """Ensure the admin Q&A file exists."""
         if not self.qa_file_path.exists():
@@ -39,31 +362,242 @@ class AdminQAService:
                 json.dump({"qa_pairs": []}, f, indent=2)
             logger.info(f"Created admin Q&A file at {self.qa_file_path}")
     
-    def load_qa_pairs(self) -> None:
-        """Load Q&A pairs from the JSON file."""
+    def load_qa_pairs(self) -> bool:
+        """
+        Load Q&A pairs from the JSON file, replaying the journal on top in journal mode.
+        
+        The new pairs are indexed before being swapped in with one
+        assignment. If the file cannot be read or parsed, or an admin edit
+        lands while it is being indexed, the current pairs are kept.
+        
+        Returns:
+            True if new pairs were loaded
+        """
+        version = self.version
         try:
-            with open(self.qa_file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.qa_pairs = data.get('qa_pairs', [])
-            logger.info(f"Loaded {len(self.qa_pairs)} admin Q&A pairs")
+            # Read while no other worker is writing
+            with self._generation.locked():
+                generation = self._generation.value()
+                qa_pairs, next_id = self._read_pairs()
+                
+                if self._store is not None:
+                    # The database is the source of truth once it has been
+                    # seeded; the file is imported again only over unedited pairs
+                    self._store.import_pairs(qa_pairs, next_id)
+                    with self._swap_lock:
+                        self._replace_index(self._index)
+                    self._seen_generation = generation
+                    logger.info(f"Loaded {self._store.count()} admin Q&A pairs from {self._store.db_path}")
+                    return True
+            
+            index = _AdminIndex(qa_pairs, next_id)
         except json.JSONDecodeError as e:
-            logger.error(f"Error parsing admin Q&A file: {e}")
-            self.qa_pairs = []
+            logger.error(f"Error parsing admin Q&A file: {e}. Keeping the current pairs.")
+            return False
         except Exception as e:
-            logger.error(f"Error loading admin Q&A file: {e}")
-            self.qa_pairs = []
+            logger.error(f"Error loading admin Q&A file: {e}. Keeping the current pairs.")
+            return False
+        
+        with self._swap_lock:
+            if self.version != version:
+                logger.info("Admin Q&A pairs were edited while reloading; keeping the edited pairs")
+                return False
+            # Our own saves and compactions rewrite the file with what is already loaded
+            current = self._index
+            if (self.version and list(index.pairs_by_id.values()) == list(current.pairs_by_id.values())
+                    and index.next_id == current.next_id):
+                self._seen_generation = max(self._seen_generation, generation)
+                return False
+            self._replace_index(index)
+            self._seen_generation = generation
+        logger.info(f"Loaded {len(index.pairs_by_id)} admin Q&A pairs")
+        return True
+    
+    def _read_pairs(self) -> Tuple[List[Dict], int]:
+        """
+        Read the pairs and next ID from the JSON file, with the journal
+        replayed on top in journal mode.
+        
+        Raises:
+            OSError, json.JSONDecodeError: If the file cannot be read or parsed
+        """
+        if self._journal is not None:
+            # The caller holds the cross-worker lock, which compactions take
+            # too, so snapshot and journal are read as one consistent pair
+            return self._journal.read()
+        
+        with open(self.qa_file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data.get('qa_pairs', []), data.get('next_id', 1)
+    
+    def is_stale(self) -> bool:
+        """
+        Whether other workers published admin edits this worker has not
+        caught up on yet. One read of shared memory, so it is cheap enough
+        for every request.
+        """
+        return self._generation.value() != self._seen_generation
+    
+    def refresh(self) -> bool:
+        """
+        Pick up admin edits published by other workers. Costs one read of
+        shared memory unless the shared generation has moved; otherwise it
+        waits for the cross-worker lock and may re-read the file, so call it
+        off the event loop.
+        
+        Returns:
+            True if this worker caught up on other workers' edits
+        """
+        if not self.is_stale():
+            return False
+        with self._generation.locked():
+            return self._catch_up()
+    
+    def _catch_up(self) -> bool:
+        """
+        Apply other workers' edits if the shared generation has moved;
+        the caller holds the generation lock.
+        """
+        generation = self._generation.value()
+        if generation == self._seen_generation:
+            return False
+        
+        if self._store is not None:
+            # Their edits are already in the shared database; only the
+            # version, which keys the match caches, has to move on
+            with self._swap_lock:
+                self._replace_index(self._index)
+        else:
+            try:
+                qa_pairs, next_id = self._read_pairs()
+            except Exception as e:
+                logger.error(f"Error reading admin Q&A edits from other workers: {e}")
+                self._seen_generation = generation
+                return False
+            applied = self._index.applied(qa_pairs, next_id)
+            if applied is None:
+                index = _AdminIndex(qa_pairs, next_id)
+                with self._swap_lock:
+                    self._replace_index(index)
+            else:
+                index, removed, added = applied
+                if removed or added:
+                    self._record_change(removed, added, index)
+                else:
+                    # Nothing to match differently; only the next ID may have moved
+                    with self._swap_lock:
+                        self._index = index
+            logger.info(f"Caught up on admin Q&A edits from other workers (generation {generation})")
+        
+        self._seen_generation = generation
+        return True
+    
+    def changes_since(self, since: int, until: int) -> Optional[Tuple[List[str], List[str]]]:
+        """
+        Questions removed and added by the edits after version since, up to
+        and including version until; an edited pair's question counts as
+        both, even if only its answer changed.
+        
+        Returns:
+            (removed, added) questions, or None if the changes are not known
+            (e.g. the pairs were reloaded), in which case everything derived
+            from the pairs must be rebuilt
+        """
+        removed: List[str] = []
+        added: List[str] = []
+        expected = since + 1
+        for version, change_removed, change_added in tuple(self._changes):
+            if version <= since or version > until:
+                continue
+            if version != expected:
+                return None
+            removed.extend(change_removed)
+            added.extend(change_added)
+            expected += 1
+        if expected != until + 1:
+            return None
+        return removed, added
+    
+    def _record_change(self, removed: List[str], added: List[str], index: Optional[_AdminIndex] = None) -> None:
+        """
+        Swap in the snapshot of an edit, if the pairs are kept in memory,
+        log the questions it changed and bump the version, in that order so
+        a reader that sees the new version also sees the new pairs.
+        """
+        with self._swap_lock:
+            if index is not None:
+                self._index = index
+            version = self.version + 1
+            self._changes.append((version, removed, added))
+            self.version = version
+    
+    def _replace_index(self, index: _AdminIndex) -> None:
+        """
+        Swap in a snapshot built from scratch and bump the version; the
+        changes are not known, so the change log is emptied. The caller
+        holds the swap lock.
+        """
+        self._index = index
+        self._changes.clear()
+        self.version += 1
     
     def save_qa_pairs(self) -> bool:
-        """Save Q&A pairs to the JSON file."""
+        """
+        Save all Q&A pairs to the JSON file.
+        The file is replaced atomically; in journal mode this also folds the
+        journal into it.
+        """
         try:
-            with open(self.qa_file_path, 'w', encoding='utf-8') as f:
-                json.dump({"qa_pairs": self.qa_pairs}, f, indent=2, ensure_ascii=False)
-            logger.info(f"Saved {len(self.qa_pairs)} admin Q&A pairs")
+            if self._store is not None:
+                # Export the database contents in the import format
+                saved = self._store.export_pairs(lambda data: write_json_atomic(self.qa_file_path, data))
+            else:
+                index = self._index
+                qa_pairs = list(index.pairs_by_id.values())
+                if self._journal is not None:
+                    # The journal already holds every edit; fold it in
+                    if not self._journal.compact(background=False):
+                        return False
+                else:
+                    write_json_atomic(self.qa_file_path, {"qa_pairs": qa_pairs, "next_id": index.next_id})
+                saved = len(qa_pairs)
+            logger.info(f"Saved {saved} admin Q&A pairs")
             return True
         except Exception as e:
             logger.error(f"Error saving admin Q&A file: {e}")
             return False
     
+    def _persist(self, record: Dict) -> bool:
+        """
+        Persist a single mutation.
+        
+        Args:
+            record: Journal record describing the mutation
+            
+        Returns:
+            True if the mutation was written, False otherwise
+        """
+        if self._journal is None:
+            return self.save_qa_pairs()
+        
+        written = self._journal.append(record)
+        if self._journal.needs_compaction:
+            self.compact()
+        return written
+    
+    def compact(self) -> bool:
+        """
+        Fold the journal into the JSON file in the background.
+        
+        Returns:
+            True if compaction was started, False if not in journal mode or
+            a compaction is already running
+        """
+        if self._journal is None:
+            return False
+        return self._journal.compact()
+    
+    @_shared_edit
     def add_qa_pair(self, question: str, answer: str) -> Dict:
         """
         Add a new Q&A pair.
@@ -75,12 +609,14 @@ class AdminQAService:
         Returns:
             The created Q&A pair with ID
         """
-        # Find the maximum existing ID and add 1, ensuring no collision even after deletions
-        existing_ids = [qa.get('id', 0) for qa in self.qa_pairs]
-        if existing_ids:
-            qa_id = max(existing_ids) + 1
-        else:
-            qa_id = 1
+        if self._store is not None:
+            new_pair = self._store.add(question.strip(), answer.strip())
+            self._record_change([], [new_pair['question']])
+            logger.info(f"Added admin Q&A pair with ID {new_pair['id']}")
+            return new_pair
+        
+        # IDs come from a monotonic counter, ensuring no collision even after deletions
+        qa_id = self._index.next_id
         
         new_pair = {
             'id': qa_id,
@@ -88,12 +624,13 @@ class AdminQAService:
             'answer': answer.strip()
         }
         
-        self.qa_pairs.append(new_pair)
-        self.save_qa_pairs()
+        self._record_change([], [new_pair['question']], self._index.edited(put=[new_pair]))
+        self._persist({'op': 'put', 'qa': new_pair, 'next_id': self._index.next_id})
         logger.info(f"Added admin Q&A pair with ID {qa_id}")
         
         return new_pair
     
+    @_shared_edit
     def update_qa_pair(self, qa_id: int, question: str, answer: str) -> Optional[Dict]:
         """
         Update an existing Q&A pair.
@@ -106,17 +643,26 @@ class AdminQAService:
         Returns:
             The updated Q&A pair or None if not found
         """
-        for qa in self.qa_pairs:
-            if qa.get('id') == qa_id:
-                qa['question'] = question.strip()
-                qa['answer'] = answer.strip()
-                self.save_qa_pairs()
+        if self._store is not None:
+            old_qa = self._store.get(qa_id)
+            qa = self._store.update(qa_id, question.strip(), answer.strip())
+            if qa is not None:
+                self._record_change([old_qa['question']] if old_qa else [], [qa['question']])
+                logger.info(f"Updated admin Q&A pair with ID {qa_id}")
+                return qa
+        else:
+            old_qa = self._index.pairs_by_id.get(qa_id)
+            if old_qa is not None:
+                qa = dict(old_qa, question=question.strip(), answer=answer.strip())
+                self._record_change([old_qa['question']], [qa['question']], self._index.edited(put=[qa]))
+                self._persist({'op': 'put', 'qa': qa, 'next_id': self._index.next_id})
                 logger.info(f"Updated admin Q&A pair with ID {qa_id}")
                 return qa
         
         logger.warning(f"Admin Q&A pair with ID {qa_id} not found")
         return None
     
+    @_shared_edit
     def delete_qa_pair(self, qa_id: int) -> bool:
         """
         Delete a Q&A pair.
@@ -127,11 +673,16 @@ class AdminQAService:
         Returns:
             True if deleted, False if not found
         """
-        initial_count = len(self.qa_pairs)
-        self.qa_pairs = [qa for qa in self.qa_pairs if qa.get('id') != qa_id]
-        
-        if len(self.qa_pairs) < initial_count:
-            self.save_qa_pairs()
+        if self._store is not None:
+            old_qa = self._store.get(qa_id)
+            if self._store.delete(qa_id):
+                self._record_change([old_qa['question']] if old_qa else [], [])
+                logger.info(f"Deleted admin Q&A pair with ID {qa_id}")
+                return True
+        elif qa_id in self._index.pairs_by_id:
+            old_qa = self._index.pairs_by_id[qa_id]
+            self._record_change([old_qa['question']], [], self._index.edited(deleted=[qa_id]))
+            self._persist({'op': 'delete', 'id': qa_id, 'next_id': self._index.next_id})
             logger.info(f"Deleted admin Q&A pair with ID {qa_id}")
             return True
         
@@ -142,85 +693,149 @@ class AdminQAService:
         """Get all Q&A pairs."""
         return self.qa_pairs
     
+    def get_all_questions(self) -> List[str]:
+        """Get all admin questions in list order."""
+        return [qa['question'] for qa in self.qa_pairs]
+    
+    def get_languages(self) -> Set[str]:
+        """Get the languages of the admin questions and of the scripts their words are written in."""
+        if self._store is not None:
+            version, languages = self._store_languages
+            if version != self.version:
+                version = self.version
+                languages = self._store.languages()
+                self._store_languages = (version, languages)
+            return languages
+        return set(self._index.partitions)
+    
     def get_qa_pair(self, qa_id: int) -> Optional[Dict]:
         """Get a specific Q&A pair by ID."""
-        for qa in self.qa_pairs:
-            if qa.get('id') == qa_id:
-                return qa
-        return None
+        if self._store is not None:
+            return self._store.get(qa_id)
+        return self._index.pairs_by_id.get(qa_id)
     
-    def find_matching_qa(self, user_message: str) -> Optional[Dict]:
+    def _find_exact(self, index: _AdminIndex, query: MatchQuery) -> Optional[Dict]:
+        """First pair in list order, among the message's languages, whose normalized question equals it."""
+        if self._store is not None:
+            return self._store.find_exact(query.lower, query.languages)
+        
+        exact_ids: Set[int] = set()
+        for partition in index.partitions_for(query.languages):
+            exact_ids.update(partition.exact_index.get(query.lower, ()))
+        if not exact_ids:
+            return None
+        return index.in_list_order(exact_ids)[0]['qa']
+    
+    def _find_candidates(self, index: _AdminIndex, query: MatchQuery) -> List[Dict]:
+        """
+        Index entries for pairs in the message's languages sharing at least
+        one word with it.
+        
+        Args:
+            index: Pairs and match index to search
+            query: The normalized user message
+            
+        Returns:
+            Entries with 'question_lower', 'question_words' and 'qa', in list order
+        """
+        if self._store is not None:
+            return self._store.find_candidates(query.words, query.languages)
+        
+        candidate_ids: Set[int] = set()
+        for partition in index.partitions_for(query.languages):
+            for word in query.words:
+                candidate_ids.update(partition.token_index.get(word, ()))
+        return index.in_list_order(candidate_ids)
+    
+    def find_matching_qa(self, user_message: str, min_keyword_score: float = 0.3) -> Optional[Dict]:
         """
         Find a matching admin Q&A pair using fuzzy matching.
         
         Args:
             user_message: The user's question
+            min_keyword_score: Minimum Jaccard similarity for a keyword match
             
         Returns:
             Dictionary with matched Q&A pair or None
         """
-        if not self.qa_pairs or not user_message:
+        return self.match(MatchQuery(user_message), min_keyword_score)
+    
+    def match(self, query: MatchQuery, min_keyword_score: float = 0.3) -> Optional[Dict]:
+        """
+        Find a matching admin Q&A pair for an already normalized message.
+        See find_matching_qa.
+        """
+        index = self._index
+        if not query.text or (self._store is None and not index.pairs_by_id):
             return None
         
-        user_message_lower = user_message.lower().strip()
+        user_message_lower = query.lower
         
         # First, try exact match
-        for qa in self.qa_pairs:
-            question_lower = qa['question'].lower().strip()
-            if user_message_lower == question_lower:
-                return {
-                    'id': qa['id'],
-                    'question': qa['question'],
-                    'answer': qa['answer'],
-                    'match_type': 'exact'
-                }
+        qa = self._find_exact(index, query)
+        if qa is not None:
+            return {
+                'id': qa['id'],
+                'question': qa['question'],
+                'answer': qa['answer'],
+                'match_type': 'exact'
+            }
+        
+        # Both remaining phases need at least one word in common, so only
+        # pairs sharing a word with the message are candidates
+        user_words = query.words
+        candidates = self._find_candidates(index, query)
         
         # Then, try partial match (question contains user message or vice versa)
-        for qa in self.qa_pairs:
-            question_lower = qa['question'].lower().strip()
+        for entry in candidates:
+            question_lower = entry['question_lower']
             # Check if user message contains the question or question contains user message
             if question_lower in user_message_lower or user_message_lower in question_lower:
                 # Additional check: ensure at least 50% of words match
-                user_words = set(re.findall(r'\w+', user_message_lower))
-                question_words = set(re.findall(r'\w+', question_lower))
+                question_words = entry['question_words']
+                common_words = user_words & question_words
+                if not common_words:
+                    continue
+                similarity = len(common_words) / min(len(user_words), len(question_words))
                 
-                if user_words and question_words:
-                    common_words = user_words & question_words
-                    similarity = len(common_words) / min(len(user_words), len(question_words))
-                    
-                    if similarity >= 0.5:
-                        return {
-                            'id': qa['id'],
-                            'question': qa['question'],
-                            'answer': qa['answer'],
-                            'match_type': 'partial'
-                        }
+                if similarity >= 0.5:
+                    qa = entry['qa']
+                    return {
+                        'id': qa['id'],
+                        'question': qa['question'],
+                        'answer': qa['answer'],
+                        'match_type': 'partial'
+                    }
         
         # Finally, try keyword-based matching
         best_match = None
         best_score = 0
         
-        for qa in self.qa_pairs:
-            question_lower = qa['question'].lower().strip()
-            user_words = set(re.findall(r'\w+', user_message_lower))
-            question_words = set(re.findall(r'\w+', question_lower))
+        for entry in candidates:
+            question_words = entry['question_words']
+            common_words = user_words & question_words
+            if not common_words:
+                continue
+            # Calculate Jaccard similarity
+            score = len(common_words) / len(user_words | question_words)
             
-            if user_words and question_words:
-                common_words = user_words & question_words
-                # Calculate Jaccard similarity
-                score = len(common_words) / len(user_words | question_words)
-                
-                if score > best_score and score >= 0.3:  # Minimum 30% similarity
-                    best_score = score
-                    best_match = {
-                        'id': qa['id'],
-                        'question': qa['question'],
-                        'answer': qa['answer'],
-                        'match_type': 'keyword'
-                    }
+            if score > best_score and score >= min_keyword_score:  # 30% similarity by default
+                best_score = score
+                qa = entry['qa']
+                best_match = {
+                    'id': qa['id'],
+                    'question': qa['question'],
+                    'answer': qa['answer'],
+                    'match_type': 'keyword'
+                }
         
         return best_match
     
-    def reload(self) -> None:
-        """Reload Q&A pairs from file."""
-        self.load_qa_pairs()
+    def reload(self) -> bool:
+        """
+        Reload Q&A pairs from file.
+        
+        Returns:
+            True if new pairs were loaded
+        """
+        return self.load_qa_pairs()
@@ -0,0 +1,236 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves are only serialized within the process
+    fcntl = None
+
+from .admin_qa_journal import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerTranslations:
+    """
+    Translations of curated answers, one map per language.
+
+    Translations are keyed by the exact text of the answer they translate,
+    so editing an answer makes its old translations unreachable: they are
+    never served again and are dropped by the next prune. Lookups are a
+    plain dict access.
+
+    The maps are persisted to a JSON file ({language: {answer: translation}}).
+    New translations are served at once but buffered, and written in one
+    batch per `flush_seconds` on a background thread. Every write holds an
+    exclusive lock on a lock file next to the JSON file (flock where
+    available) and merges with the file's current content, so workers
+    filling translations concurrently do not drop each other's entries.
+    Call `reload` when the file changes to pick up other workers' entries.
+    """
+
+    def __init__(self, file_path: Optional[str] = None, flush_seconds: float = 1.0):
+        """
+        Load the stored translations.
+
+        Args:
+            file_path: JSON file holding the translations.
+                       Defaults to backend/data/answer_translations.json
+            flush_seconds: How long new translations are buffered before
+                           they are written
+        """
+        if file_path is None:
+            backend_dir = Path(__file__).parent.parent
+            file_path = backend_dir / "data" / "answer_translations.json"
+
+        self.file_path = Path(file_path)
+        self.flush_seconds = flush_seconds
+
+        # Guards the maps and the buffer; never held during file I/O
+        self._lock = threading.Lock()
+        # Serializes this process's writes; the lock file serializes workers
+        self._write_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+
+        # Translations not written yet, kept on top of every reload
+        self._pending: Dict[str, Dict[str, str]] = {}
+        try:
+            self._translations: Dict[str, Dict[str, str]] = self._read()
+        except (OSError, ValueError) as e:
+            # Flushes re-read the file and refuse to write over it while it
+            # stays unreadable, so the stored translations are not lost
+            logger.error(f"Error reading answer translations: {e}. Starting without them.")
+            self._translations = {}
+        logger.info(
+            f"Loaded {sum(len(t) for t in self._translations.values())} answer translations "
+            f"from {self.file_path}"
+        )
+
+    def _read(self) -> Dict[str, Dict[str, str]]:
+        """
+        Read the translations file; a missing file yields no translations.
+
+        Raises:
+            OSError, ValueError: If the file cannot be read or parsed, e.g.
+                                 while it is being edited by hand
+        """
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        if not isinstance(data, dict) or not all(isinstance(t, dict) for t in data.values()):
+            raise ValueError("expected {language: {answer: translation}}")
+        return {language: dict(translations) for language, translations in data.items()}
+
+    @contextmanager
+    def _file_locked(self) -> Iterator[None]:
+        """Hold the translations file exclusively across threads and processes."""
+        with self._write_lock:
+            self.file_path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.file_path.with_suffix('.lock'), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                # Closing the descriptor releases the flock
+                os.close(fd)
+
+    def get(self, language: str, answer: str) -> Optional[str]:
+        """Get the translation of an answer, or None if it has not been translated yet."""
+        translations = self._translations.get(language)
+        return translations.get(answer) if translations else None
+
+    def put(self, language: str, answer: str, translation: str) -> None:
+        """Store the translation of an answer; it is written with the next batch."""
+        with self._lock:
+            self._translations.setdefault(language, {})[answer] = translation
+            self._pending.setdefault(language, {})[answer] = translation
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        """Start the batch timer unless it is running; the caller holds the lock."""
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_seconds, self._flush_in_background)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def missing(self, language: str, answers: Iterable[str]) -> List[str]:
+        """Get the answers that have no translation into a language, without duplicates."""
+        translations = self._translations.get(language, {})
+        return list(dict.fromkeys(answer for answer in answers if answer not in translations))
+
+    def flush(self) -> bool:
+        """
+        Write the buffered translations, merged with the file's current
+        content, and take in the entries other workers wrote meanwhile.
+        Does file I/O, so call it off the event loop.
+
+        Returns:
+            False if the file could not be read or written; the translations
+            stay buffered, and an unreadable file is left as it is
+        """
+        with self._file_locked():
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return True
+
+            try:
+                stored = self._read()
+                for language, translations in pending.items():
+                    stored.setdefault(language, {}).update(translations)
+                write_json_atomic(self.file_path, stored)
+            except (OSError, ValueError) as e:
+                logger.error(f"Error saving answer translations: {e}")
+                with self._lock:
+                    # Put back for the next flush, under anything stored since
+                    for language, translations in pending.items():
+                        buffered = self._pending.setdefault(language, {})
+                        for answer, translation in translations.items():
+                            buffered.setdefault(answer, translation)
+                return False
+            self._swap(stored)
+        return True
+
+    def reload(self) -> None:
+        """
+        Take in the translations file as other workers left it, keeping
+        buffered ones. An unreadable file keeps the current translations.
+        """
+        try:
+            stored = self._read()
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading answer translations: {e}. Keeping the current translations.")
+            return
+        self._swap(stored)
+
+    def _swap(self, stored: Dict[str, Dict[str, str]]) -> None:
+        """Replace the maps with the stored ones plus the buffered translations."""
+        with self._lock:
+            for language, translations in self._pending.items():
+                stored.setdefault(language, {}).update(translations)
+            self._translations = stored
+
+    def _flush_in_background(self) -> None:
+        with self._lock:
+            self._flush_timer = None
+        if not self.flush():
+            # Try again with the next batch
+            with self._lock:
+                self._schedule_flush()
+
+    def prune(self, answers: Iterable[str]) -> int:
+        """
+        Drop translations of answers that no longer exist, from the file
+        and from memory. Does file I/O, so call it off the event loop.
+
+        Args:
+            answers: Every current curated answer
+
+        Returns:
+            Number of translations dropped from the file
+        """
+        current = set(answers)
+        with self._file_locked():
+            with self._lock:
+                for translations in self._pending.values():
+                    for answer in [a for a in translations if a not in current]:
+                        del translations[answer]
+
+            try:
+                stored = self._read()
+            except (OSError, ValueError) as e:
+                logger.error(f"Error reading answer translations: {e}. Not pruning them.")
+                return 0
+            dropped = 0
+            for translations in stored.values():
+                for answer in [a for a in translations if a not in current]:
+                    del translations[answer]
+                    dropped += 1
+            if dropped:
+                try:
+                    write_json_atomic(self.file_path, stored)
+                except OSError as e:
+                    logger.error(f"Error saving answer translations: {e}")
+                    return 0
+            self._swap(stored)
+        return dropped
+
+    def stats(self) -> Dict[str, int]:
+        """Report the number of stored translations per language."""
+        return {language: len(translations) for language, translations in self._translations.items()}
+
+    def close(self) -> None:
+        """Stop the pending batch timer and write the buffered translations now."""
+        with self._lock:
+            timer, self._flush_timer = self._flush_timer, None
+        if timer is not None:
+            timer.cancel()
+        self.flush()
@@ -1,14 +1,45 @@
+import asyncio
 import os
-from openai import AsyncOpenAI
-from typing import Optional, Dict, List
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Iterable, Optional, Dict, List, Tuple
 from datetime import datetime
+import logging
+from .answer_translations import AnswerTranslations
 from .faq_service import FAQService
-from services.qa_service import QAService
-from services.admin_qa_service import AdminQAService
+from .file_watcher import FileWatcher
+from .qa_service import QAService
+from .admin_qa_service import AdminQAService
+from .conversation_store import create_conversation_store
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .context_builder import ContextBuilder
+from .llm_client import LLMClient, create_openai_client, is_retryable
+from .llm_limiter import ConcurrencyLimiter
+from .matching_pipeline import MatchingPipeline, MatchQuery
+from .response_cache import ResponseCache, normalize_message
+from .semantic_matcher import DEFAULT_THRESHOLD as SEMANTIC_THRESHOLD, SemanticMatcher, numpy_available
+from .single_flight import SingleFlight
+from .spelling_corrector import SpellingCorrector
+from .text_language import LANGUAGE_NAMES, detect_language, entry_language
+
+logger = logging.getLogger(__name__)
 
 # Constants
 PLACEHOLDER_API_KEY = "your_openai_api_key_here"
 
+# Minimum admin keyword similarity accepted while the LLM is unavailable
+DEGRADED_MIN_KEYWORD_SCORE = 0.1
+
+# Minimum predefined Q&A similarity accepted while the LLM is unavailable;
+# keyword matches always score at least QAService.BASE_SCORE, so this mainly
+# lets in weaker TF-IDF matches
+DEGRADED_MIN_PREDEFINED_SCORE = 0.15
+
+# Answers translated at once by translate_curated_answers, leaving LLM
+# capacity for users
+TRANSLATION_BATCH_CONCURRENCY = 4
+
 class ChatbotService:
     def __init__(self):
         # Check if API key is present
@@ -16,26 +47,288 @@ class ChatbotService:
         if not self.api_key or self.api_key == PLACEHOLDER_API_KEY:
             self.api_key_missing = True
             self.client = None
+            self.llm = None
         else:
             self.api_key_missing = False
-            self.client = AsyncOpenAI(api_key=self.api_key)
+            # One OpenAI client on a tuned, shared HTTP connection pool;
+            # retries and hedging are handled by LLMClient
+            self.client = create_openai_client(self.api_key)
+            self.llm = LLMClient(
+                self.client,
+                max_retries=int(os.getenv("LLM_MAX_RETRIES", "2")),
+                retry_base_delay=float(os.getenv("LLM_RETRY_BASE_DELAY_SECONDS", "0.25")),
+                retry_max_delay=float(os.getenv("LLM_RETRY_MAX_DELAY_SECONDS", "4")),
+                hedge=os.getenv("LLM_HEDGE", "false").lower() == "true"
+            )
         
         self.model = os.getenv("LLM_MODEL", "gpt-4-turbo-preview")
         self.temperature = float(os.getenv("LLM_TEMPERATURE", "0.7"))
         self.max_tokens = int(os.getenv("LLM_MAX_TOKENS", "1000"))
         
+        # Admission control for outbound LLM calls; calls that cannot get a
+        # slot in time fail fast to the fallback answer
+        self.llm_limiter = ConcurrencyLimiter(
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "10")),
+            max_queue=int(os.getenv("LLM_MAX_QUEUE", "50")),
+            queue_timeout_seconds=float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "5"))
+        )
+        
+        # Stop calling the LLM while it keeps failing or answering too slowly;
+        # in the meantime messages get the closest curated answer
+        self.llm_breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+            latency_threshold_seconds=float(os.getenv("LLM_BREAKER_LATENCY_SECONDS", "15")),
+            reset_timeout_seconds=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+        )
+        
+        # Prompt token budget: the configured budget, capped so the context
+        # window always has room for a full LLM_MAX_TOKENS reply; tokens are
+        # estimated until start() has loaded the tokenizer
+        context_window = int(os.getenv("LLM_CONTEXT_WINDOW", "8192"))
+        prompt_budget = int(os.getenv("LLM_PROMPT_BUDGET_TOKENS", "3000"))
+        self.context_builder = ContextBuilder(
+            model=self.model,
+            budget_tokens=min(prompt_budget, context_window - self.max_tokens)
+        )
+        
         # Initialize QA Service for predefined answers
         self.qa_service = QAService()
         
         # Initialize Admin QA Service for admin-curated answers
         self.admin_qa_service = AdminQAService()
         
-        # In-memory conversation storage (replace with database in production)
-        self.conversations: Dict[str, List[Dict]] = {}
+        # Conversation storage: bounded in-memory by default, or a SQLite
+        # database shared by all workers (CONVERSATION_BACKEND=sqlite)
+        self.conversations = create_conversation_store()
         
         # Initialize FAQ service
         self.faq_service = FAQService()
         
+        # With the SQLite backend the admin and predefined tiers query the
+        # database, so messages are matched on a worker thread
+        self._match_in_thread = "sqlite" in (self.admin_qa_service.backend, self.qa_service.backend)
+        
+        # Curated answers in the users' languages: served from the store,
+        # translated through the LLM on first use or in bulk by
+        # translate_curated_answers (ANSWER_TRANSLATION=false turns it off)
+        self.answer_translations: Optional[AnswerTranslations] = None
+        if os.getenv("ANSWER_TRANSLATION", "true").lower() == "true":
+            self.answer_translations = AnswerTranslations(
+                os.getenv("ANSWER_TRANSLATIONS_PATH"),
+                flush_seconds=float(os.getenv("ANSWER_TRANSLATIONS_FLUSH_SECONDS", "1"))
+            )
+        
+        # Reload the FAQ, predefined and admin Q&A files, and the answer
+        # translations other workers wrote, when they change on disk;
+        # parsing and indexing happen on the watcher thread, which then
+        # brings the derived indexes up to date, and the new data is swapped
+        # in whole (HOT_RELOAD=false turns it off). Started once the
+        # derived indexes exist
+        self.file_watcher: Optional[FileWatcher] = None
+        if os.getenv("HOT_RELOAD", "true").lower() == "true":
+            self.file_watcher = FileWatcher(
+                float(os.getenv("HOT_RELOAD_INTERVAL_SECONDS", "2")),
+                after_reload=self._rebuild_indexes
+            )
+            self.file_watcher.watch(self.faq_service.faq_file_path, self.faq_service.reload_faqs)
+            self.file_watcher.watch(self.qa_service.qa_file_path, self.qa_service.reload_qa_data)
+            # With SQLite the file is imported again only over unedited pairs
+            self.file_watcher.watch(self.admin_qa_service.qa_file_path, self.admin_qa_service.reload)
+            if self.answer_translations is not None:
+                self.file_watcher.watch(self.answer_translations.file_path, self.answer_translations.reload)
+        
+        # Vocabulary of the curated questions and keywords; messages no tier
+        # matches are retried with misspelled words corrected against it
+        # (SPELLING_CORRECTION=false turns it off)
+        self.spelling_corrector: Optional[SpellingCorrector] = None
+        self._spelling_versions: Dict[str, int] = {}
+        if os.getenv("SPELLING_CORRECTION", "true").lower() == "true":
+            self.spelling_corrector = SpellingCorrector()
+        
+        # Curated answer tiers in priority order; each message is normalized
+        # once, looked up in the exact-question map of all stored questions
+        # and the memo of earlier outcomes, and otherwise matched against the
+        # tiers until one answers
+        self.matching_pipeline = MatchingPipeline(
+            version=lambda: self.knowledge_version,
+            memo_size=int(os.getenv("MATCH_MEMO_MAX_ENTRIES", "10000")),
+            corrector=self._correct_spelling if self.spelling_corrector else None
+        )
+        self.matching_pipeline.add_tier(
+            "admin", self.admin_qa_service.match, self.admin_qa_service.get_all_questions,
+            languages=self.admin_qa_service.get_languages
+        )
+        self.matching_pipeline.add_tier(
+            "faq", self.faq_service.match, languages=self.faq_service.get_languages
+        )
+        self.matching_pipeline.add_tier(
+            "predefined", self.qa_service.match, self.qa_service.get_all_questions,
+            languages=self.qa_service.get_languages
+        )
+        
+        # Local paraphrase matching against all curated questions, tried
+        # last before the LLM; opt-in (SEMANTIC_MATCHING=true), as it can
+        # take a question about another topic for a near-identical curated one
+        self.semantic_matcher: Optional[SemanticMatcher] = None
+        if os.getenv("SEMANTIC_MATCHING", "false").lower() == "true":
+            if numpy_available():
+                self.semantic_matcher = SemanticMatcher(
+                    self._semantic_documents,
+                    threshold=float(os.getenv("SEMANTIC_THRESHOLD", str(SEMANTIC_THRESHOLD)))
+                )
+                self.matching_pipeline.add_tier("semantic", self.semantic_matcher.match)
+            else:
+                logger.warning("numpy is not installed, semantic matching is disabled")
+        
+        # Indexes derived from the curated data (the spelling vocabulary,
+        # the semantic indexes and the exact-question map) are brought up to
+        # date with the knowledge version on the file watcher thread after
+        # reloads, or on a worker thread after admin edits, never inside a
+        # request; requests meanwhile match through the tiers and the
+        # previous derived indexes
+        self._indexes_version: Optional[Tuple[int, int, int]] = None
+        self._indexes_lock = threading.Lock()
+        self._indexes_rebuild: Optional[asyncio.Future] = None
+        self._rebuild_indexes()
+        if self.file_watcher is not None:
+            self.file_watcher.start()
+        
+        # Cache of LLM answers to first-turn questions; it is dropped
+        # whenever the admin, FAQ or predefined data changes
+        self.response_cache = ResponseCache(
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000")),
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600"))
+        )
+        
+        # Concurrent identical cacheable questions share one LLM call
+        self.llm_flights = SingleFlight()
+        
+        self.translation_languages = [
+            code.strip() for code in os.getenv("TRANSLATION_LANGUAGES", "hi,ta,te,ml,kn").split(",")
+            if code.strip() in LANGUAGE_NAMES and code.strip() != "en"
+        ]
+        # (language, answer) -> background translation in progress
+        self._translation_tasks: Dict[Tuple[str, str], asyncio.Task] = {}
+    
+    def _semantic_documents(self) -> List[Tuple[str, Dict, str]]:
+        """
+        Curated questions for the semantic tier, each with the answer it leads
+        to and its language. FAQs have no questions, so their topic and
+        keywords stand in.
+        """
+        documents = []
+        for qa in self.admin_qa_service.get_all_qa_pairs():
+            documents.append((qa["question"], {
+                "source": "admin",
+                "question": qa["question"],
+                "answer": qa["answer"]
+            }, entry_language(qa["question"], qa.get("language"))))
+        for topic, faq_data in self.faq_service.faqs.items():
+            keywords = faq_data.get("keywords", [])
+            text = " ".join([topic.replace("_", " ")] + keywords)
+            documents.append((text, {
+                "source": "faq",
+                "topic": topic,
+                "answer": faq_data.get("answer", "")
+            }, entry_language(" ".join(keywords), faq_data.get("language"))))
+        for qa in self.qa_service.qa_data:
+            documents.append((qa["question"], {
+                "source": "predefined",
+                "question": qa["question"],
+                "answer": qa["answer"]
+            }, entry_language(qa["question"], qa.get("language"))))
+        return documents
+    
+    def _correct_spelling(self, text: str) -> str:
+        """
+        Correct misspelled words of a normalized message against the curated vocabulary.
+        """
+        return self.spelling_corrector.correct_text(text)
+    
+    def _update_spelling(self) -> None:
+        """
+        Refresh the vocabulary of the sources that changed since the last
+        update; only their added and removed words are re-indexed.
+        """
+        sources = (
+            ("admin", self.admin_qa_service, self.admin_qa_service.get_all_questions),
+            ("faq", self.faq_service, lambda: [
+                keyword for faq_data in self.faq_service.faqs.values()
+                for keyword in faq_data.get("keywords", [])
+            ]),
+            ("predefined", self.qa_service, lambda: [
+                text for qa in self.qa_service.qa_data
+                for text in [qa["question"]] + qa.get("keywords", [])
+            ])
+        )
+        for name, service, texts in sources:
+            version = service.version
+            if self._spelling_versions.get(name) != version:
+                self.spelling_corrector.update_source(name, texts())
+                self._spelling_versions[name] = version
+    
+    def _rebuild_indexes(self) -> None:
+        """
+        Bring the derived indexes up to date with the knowledge version.
+        After admin edits only the exact-question map entries the edited
+        questions can affect are matched again; any other change rebuilds
+        the map. The semantic indexes only embed new question texts, and
+        the spelling vocabulary only re-indexes changed words. The map is
+        swapped in last, so its version tells that all of them are current.
+        Blocks, so it runs on the file watcher or a worker thread.
+        """
+        with self._indexes_lock:
+            while True:
+                version = self.knowledge_version
+                built = self._indexes_version
+                if version == built:
+                    return
+                
+                if self.spelling_corrector is not None:
+                    self._update_spelling()
+                if self.semantic_matcher is not None:
+                    self.semantic_matcher.rebuild()
+                changes = None
+                if built is not None and built[1:] == version[1:]:
+                    changes = self.admin_qa_service.changes_since(built[0], version[0])
+                if changes is None or not self.matching_pipeline.patch(version, "admin", *changes):
+                    self.matching_pipeline.rebuild(version)
+                self._indexes_version = version
+    
+    def _schedule_index_rebuild(self) -> None:
+        """
+        Start _refresh_indexes on a worker thread if other workers edited
+        admin pairs or the indexes are stale.
+        """
+        if self._indexes_version == self.knowledge_version and not self.admin_qa_service.is_stale():
+            return
+        if self._indexes_rebuild is not None and not self._indexes_rebuild.done():
+            # The running rebuild also picks up changes made since it started
+            return
+        self._indexes_rebuild = asyncio.get_running_loop().run_in_executor(None, self._refresh_indexes)
+        self._indexes_rebuild.add_done_callback(self._log_index_rebuild_error)
+    
+    def _refresh_indexes(self) -> None:
+        """
+        Catch up on admin edits made through other workers, which waits for
+        the cross-worker lock and may re-read the file, then bring the
+        derived indexes up to date. Blocks, so it runs on a worker thread.
+        """
+        self.admin_qa_service.refresh()
+        self._rebuild_indexes()
+    
+    @staticmethod
+    def _log_index_rebuild_error(future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Error rebuilding curated match indexes: {future.exception()}")
+    
+    @property
+    def knowledge_version(self) -> Tuple[int, int, int]:
+        """
+        Version of the curated knowledge; changes on any admin, FAQ or predefined update.
+        """
+        return (self.admin_qa_service.version, self.faq_service.version, self.qa_service.version)
+        
     def get_system_prompt(self, language: str = "en") -> str:
         """
         Get the system prompt for the chatbot based on language.
@@ -76,205 +369,684 @@ Always be helpful, knowledgeable, friendly, and represent K2 Communications' exc
         
         return base_prompt
     
-    async def process_message(
+    async def _match_curated(self, query: MatchQuery, language: str) -> Optional[Dict]:
+        """
+        Look for a curated answer in the admin, FAQ, predefined and semantic tiers.
+        
+        Returns:
+            The response for the highest-priority match, or None if no tier matched
+        """
+        # Admin edits made through other workers are caught up on in the
+        # background, like the derived indexes; checking is a shared-memory read
+        self._schedule_index_rebuild()
+        if self._match_in_thread:
+            result = await self.matching_pipeline.match_in_thread(query)
+        else:
+            result = self.matching_pipeline.match(query)
+        if result is None:
+            return None
+        
+        tier, match = result
+        response = self._curated_response(tier, match, query.text, language)
+        if "corrected_message" in match:
+            response["metadata"]["corrected_message"] = match["corrected_message"]
+        return self._localize(response, language)
+    
+    def _localize(self, response: Dict, language: str) -> Dict:
+        """
+        Replace a curated answer by its stored translation into the requested
+        language. Until the translation exists the answer goes out as is and
+        the translation is filled in the background.
+        """
+        if self.answer_translations is None or language not in self.translation_languages:
+            return response
+        
+        answer = response["message"]
+        translation = self.answer_translations.get(language, answer)
+        if translation is not None:
+            response["message"] = translation
+            response["metadata"]["translated"] = True
+        elif detect_language(answer, language) != language:
+            self._schedule_translation(language, answer)
+            response["metadata"]["translated"] = False
+        return response
+    
+    def _schedule_translation(self, language: str, answer: str) -> None:
+        """Translate an answer in the background, once even if it is requested again meanwhile."""
+        key = (language, answer)
+        if self.api_key_missing or key in self._translation_tasks:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._fill_translation(language, answer))
+        self._translation_tasks[key] = task
+        task.add_done_callback(lambda _: self._translation_tasks.pop(key, None))
+    
+    async def _fill_translation(self, language: str, answer: str) -> bool:
+        """
+        Translate an answer and store the translation.
+        
+        Returns:
+            True if the translation was stored
+        """
+        try:
+            translation = await self._translate(language, answer)
+        except Exception as e:
+            logger.warning(f"Could not translate a curated answer into {language}: {e}")
+            return False
+        self.answer_translations.put(language, answer, translation)
+        return True
+    
+    @asynccontextmanager
+    async def _llm_call(self) -> AsyncIterator[Callable[[], None]]:
+        """
+        Admit an LLM call made in the block: through the circuit breaker,
+        then a limiter slot. The block's outcome is recorded with the
+        breaker. Only errors LLMClient would retry (connection errors,
+        timeouts, 429 and 5xx) count as failures; other errors, such as a
+        400 for a malformed request, say nothing about the upstream's
+        health. A call that ends without an outcome (rejected by the
+        limiter, cancelled, or failed with such an error) gives its
+        half-open probe back instead of holding it until the reset timeout.
+        
+        A block that streams the answer calls the yielded function once the
+        stream has opened, which records the success with the latency so
+        far; time spent waiting on a slow client while streaming then does
+        not count against the breaker. An upstream error while streaming
+        still counts as a failure.
+        
+        Raises:
+            CircuitOpenError: If the LLM circuit is open
+            LLMOverloadedError: If the limiter does not admit the call
+        """
+        if not self.llm_breaker.allow_request():
+            raise CircuitOpenError("LLM circuit is open")
+        
+        recorded = False
+        try:
+            async with self.llm_limiter.slot():
+                started = time.monotonic()
+                
+                def responded() -> None:
+                    nonlocal recorded
+                    if not recorded:
+                        recorded = True
+                        self.llm_breaker.record_success(time.monotonic() - started)
+                
+                try:
+                    yield responded
+                except Exception as e:
+                    if is_retryable(e):
+                        recorded = True
+                        self.llm_breaker.record_failure()
+                    raise
+                responded()
+        finally:
+            if not recorded:
+                self.llm_breaker.release()
+    
+    async def _translate(self, language: str, answer: str) -> str:
+        """
+        Translate a curated answer through the LLM.
+        
+        Raises:
+            CircuitOpenError: If the LLM circuit is open
+            ValueError: If the translation was cut off or empty
+        """
+        messages = [
+            {
+                "role": "system",
+                "content": (
+                    f"Translate the user's text from English into {LANGUAGE_NAMES[language]}. "
+                    "Keep names, URLs, email addresses, numbers and line breaks unchanged. "
+                    "Reply with the translation only."
+                )
+            },
+            {"role": "user", "content": answer}
+        ]
+        async with self._llm_call():
+            response = await self.llm.create(
+                model=self.model,
+                messages=messages,
+                temperature=0,
+                max_tokens=self.max_tokens
+            )
+        
+        choice = response.choices[0]
+        translation = (choice.message.content or "").strip()
+        if choice.finish_reason == "length" or not translation:
+            raise ValueError("translation was cut off or empty")
+        return translation
+    
+    def _curated_answers(self) -> List[str]:
+        """
+        All current admin, FAQ and predefined answers.
+        """
+        answers = [qa["answer"] for qa in self.admin_qa_service.get_all_qa_pairs()]
+        answers.extend(faq_data.get("answer", "") for faq_data in self.faq_service.faqs.values())
+        answers.extend(qa["answer"] for qa in self.qa_service.qa_data)
+        return [answer for answer in answers if answer]
+    
+    async def translate_curated_answers(
         self,
-        message: str,
-        conversation_id: str,
-        language: str = "en",
-        context: Optional[Dict] = None
-    ) -> Dict:
+        languages: Optional[Iterable[str]] = None
+    ) -> Dict[str, object]:
         """
-        Process a user message and generate a response.
-        Priority order:
-        1. Admin Q&A (highest priority)
-        2. FAQ matches
-        3. Predefined Q&A
-        4. LLM fallback (lowest priority)
+        Translate every curated answer that has no translation yet, and drop
+        translations of answers that were edited or deleted. Meant to be run
+        after bulk edits so users never wait for a first-use translation.
+        
+        Args:
+            languages: Language codes; defaults to the configured translation languages
+        
+        Returns:
+            Dict with per-language 'translated' and 'failed' counts and the
+            number of 'pruned' translations
         """
-        # Initialize conversation history if needed
-        if conversation_id not in self.conversations:
-            self.conversations[conversation_id] = []
+        if self.answer_translations is None or self.api_key_missing:
+            return {"languages": {}, "pruned": 0}
         
-        # Add user message to history
-        self.conversations[conversation_id].append({
-            "role": "user",
-            "content": message,
-            "timestamp": datetime.now().isoformat()
-        })
+        answers = self._curated_answers()
+        pruned = await asyncio.to_thread(self.answer_translations.prune, answers)
+        semaphore = asyncio.Semaphore(TRANSLATION_BATCH_CONCURRENCY)
         
-        # STEP 1: Check for Admin Q&A match first (highest priority)
-        admin_match = self.admin_qa_service.find_matching_qa(message)
+        async def translate(language: str, answer: str) -> bool:
+            async with semaphore:
+                return await self._fill_translation(language, answer)
         
-        if admin_match:
+        results = {}
+        for language in languages or self.translation_languages:
+            if language not in LANGUAGE_NAMES:
+                continue
+            pending = [
+                answer for answer in self.answer_translations.missing(language, answers)
+                if detect_language(answer, language) != language
+            ]
+            stored = await asyncio.gather(*(translate(language, answer) for answer in pending))
+            results[language] = {"translated": sum(stored), "failed": len(stored) - sum(stored)}
+        
+        logger.info(f"Translated curated answers: {results}, pruned {pruned}")
+        return {"languages": results, "pruned": pruned}
+    
+    def _curated_response(self, tier: str, match: Dict, message: str, language: str) -> Dict:
+        """
+        Build the response for a curated match from the given tier.
+        """        
+        # STEP 1: Admin Q&A match (highest priority)
+        if tier == "admin":
             # Admin Q&A match found - return admin-curated answer
-            answer = admin_match["answer"]
-            
-            # Add assistant response to history
-            self.conversations[conversation_id].append({
-                "role": "assistant",
-                "content": answer,
-                "timestamp": datetime.now().isoformat()
-            })
-            
+            answer = match["answer"]
             return {
                 "message": answer,
                 "suggestions": self._generate_suggestions(message, answer),
                 "metadata": {
                     "source": "admin",
-                    "matched_question": admin_match["question"],
-                    "match_type": admin_match.get("match_type", "unknown"),
+                    "matched_question": match["question"],
+                    "match_type": match.get("match_type", "unknown"),
                     "language": language,
                     "timestamp": datetime.now().isoformat()
                 },
                 "answer_source": "admin"
             }
         
-        # STEP 2: Check for FAQ match
-        faq_match = self.faq_service.find_matching_faq(message)
-        
-        if faq_match:
+        # STEP 2: FAQ match
+        if tier == "faq":
             # FAQ match found - return predetermined answer
-            answer = faq_match["answer"]
-            
-            # Add assistant response to history
-            self.conversations[conversation_id].append({
-                "role": "assistant",
-                "content": answer,
-                "timestamp": datetime.now().isoformat()
-            })
-            
+            answer = match["answer"]
             return {
                 "message": answer,
                 "suggestions": self._generate_suggestions(message, answer),
                 "metadata": {
                     "language": language,
-                    "faq_topic": faq_match["topic"],
+                    "faq_topic": match["topic"],
                     "timestamp": datetime.now().isoformat()
                 },
                 "answer_source": "faq"
             }
         
-        # STEP 3: Try predefined Q&A
-        predefined_match = self.qa_service.find_answer(message)
-        
-        if predefined_match:
-            # Found a predefined answer - use it
-            assistant_message = predefined_match['answer']
-            
-            # Add assistant response to history
-            self.conversations[conversation_id].append({
-                "role": "assistant",
-                "content": assistant_message,
+        # STEP 3b: Paraphrase of a curated question
+        if tier == "semantic":
+            answer = match["answer"]
+            metadata = {
+                "source": "semantic",
+                "matched_source": match["source"],
+                "similarity": match["similarity"],
+                "language": language,
                 "timestamp": datetime.now().isoformat()
-            })
-            
-            # Generate suggestions based on the predefined answer
-            suggestions = self._generate_suggestions(message, assistant_message)
-            
-            return {
-                "message": assistant_message,
-                "suggestions": suggestions,
-                "metadata": {
-                    "source": "predefined",
-                    "matched_question": predefined_match['question'],
-                    "confidence": predefined_match['confidence'],
-                    "language": language,
-                    "timestamp": datetime.now().isoformat()
-                },
-                "answer_source": "predefined"
             }
-        
-        # STEP 4: No predefined answer found - use LLM
-        # Check if API key is missing
-        if self.api_key_missing:
-            missing_key_message = (
-                "I apologize, but the chatbot is not fully configured yet. "
-                "The OpenAI API key is missing. Please contact the administrator "
-                "to set up the OPENAI_API_KEY in the environment configuration. "
-                "In the meantime, you can reach out to K2 Communications directly "
-                "at https://www.k2communications.in/ for assistance."
-            )
+            if "question" in match:
+                metadata["matched_question"] = match["question"]
+            else:
+                metadata["faq_topic"] = match["topic"]
             return {
-                "message": missing_key_message,
-                "suggestions": ["Visit K2 Communications website", "Contact support"],
-                "metadata": {
-                    "source": "error",
-                    "error": "OPENAI_API_KEY not configured"
-                },
-                "answer_source": "ai"
+                "message": answer,
+                "suggestions": self._generate_suggestions(message, answer),
+                "metadata": metadata,
+                "answer_source": match["source"]
             }
         
-        # Prepare messages for OpenAI
-        messages = [
-            {"role": "system", "content": self.get_system_prompt(language)}
-        ]
+        # STEP 3: Predefined Q&A
+        # Found a predefined answer - use it
+        assistant_message = match['answer']
         
-        # Add conversation history
-        for msg in self.conversations[conversation_id]:
-            messages.append({
-                "role": msg["role"],
-                "content": msg["content"]
-            })
+        # Generate suggestions based on the predefined answer
+        suggestions = self._generate_suggestions(message, assistant_message)
         
-        try:
-            # Call OpenAI API
-            response = await self.client.chat.completions.create(
+        return {
+            "message": assistant_message,
+            "suggestions": suggestions,
+            "metadata": {
+                "source": "predefined",
+                "matched_question": match['question'],
+                "confidence": match['confidence'],
+                "language": language,
+                "timestamp": datetime.now().isoformat()
+            },
+            "answer_source": "predefined"
+        }
+    
+    def _missing_key_response(self) -> Dict:
+        """
+        Response used in place of the LLM when no API key is configured.
+        """
+        missing_key_message = (
+            "I apologize, but the chatbot is not fully configured yet. "
+            "The OpenAI API key is missing. Please contact the administrator "
+            "to set up the OPENAI_API_KEY in the environment configuration. "
+            "In the meantime, you can reach out to K2 Communications directly "
+            "at https://www.k2communications.in/ for assistance."
+        )
+        return {
+            "message": missing_key_message,
+            "suggestions": ["Visit K2 Communications website", "Contact support"],
+            "metadata": {
+                "source": "error",
+                "error": "OPENAI_API_KEY not configured"
+            },
+            "answer_source": "ai"
+        }
+    
+    def _degraded_match(self, query: MatchQuery) -> Optional[Tuple[str, Dict]]:
+        """
+        The closest admin or predefined match under relaxed matching. FAQ
+        topics have no looser level: matching keywords inside longer words
+        would answer wrong topics (e.g. "rate" in "corporate"), and whole
+        words already missed in the curated tiers.
+        
+        Returns:
+            Tuple of (source, match dict), or None if nothing matched
+        """
+        admin_match = self.admin_qa_service.match(
+            query, min_keyword_score=DEGRADED_MIN_KEYWORD_SCORE
+        )
+        if admin_match:
+            return "admin", admin_match
+        
+        predefined_match = self.qa_service.match(
+            query,
+            threshold=DEGRADED_MIN_PREDEFINED_SCORE,
+            ranker_threshold=DEGRADED_MIN_PREDEFINED_SCORE
+        )
+        if predefined_match:
+            return "predefined", predefined_match
+        return None
+    
+    async def _degraded_response(self, query: MatchQuery, language: str) -> Dict:
+        """
+        Response used in place of the LLM while its circuit is open: the
+        closest admin or predefined answer under relaxed matching, or
+        a canned reply.
+        """
+        message = query.text
+        metadata = {
+            "source": "degraded",
+            "language": language,
+            "timestamp": datetime.now().isoformat()
+        }
+        
+        if self._match_in_thread:
+            result = await asyncio.to_thread(self._degraded_match, query)
+        else:
+            result = self._degraded_match(query)
+        if result is not None:
+            source, match = result
+            answer = match["answer"]
+            metadata["matched_question"] = match["question"]
+            if source == "predefined":
+                metadata["confidence"] = match["confidence"]
+            return self._localize({
+                "message": answer,
+                "suggestions": self._generate_suggestions(message, answer),
+                "metadata": metadata,
+                "answer_source": source
+            }, language)
+        
+        unavailable_message = (
+            "I'm sorry, I can't answer that right now as our assistant is "
+            "temporarily unavailable. Please try again in a few minutes, or "
+            "reach out to K2 Communications directly at "
+            "https://www.k2communications.in/ for assistance."
+        )
+        return {
+            "message": unavailable_message,
+            "suggestions": ["Try again", "Contact us", "View services"],
+            "metadata": metadata,
+            "answer_source": "ai"
+        }
+    
+    def _llm_response(
+        self,
+        message: str,
+        language: str,
+        llm_result: Dict,
+        cache_hit: bool = False,
+        coalesced: bool = False
+    ) -> Dict:
+        """
+        Build the response for an answer generated by the LLM.
+        
+        Args:
+            message: The user message
+            language: Response language
+            llm_result: Dict with the answer 'message', 'prompt_tokens' and 'context_messages'
+            cache_hit: Whether the answer was served from the response cache
+            coalesced: Whether the answer came from a concurrent identical request
+        """
+        assistant_message = llm_result["message"]
+        
+        # Generate suggestions based on context
+        suggestions = self._generate_suggestions(message, assistant_message)
+        
+        return {
+            "message": assistant_message,
+            "suggestions": suggestions,
+            "metadata": {
+                "source": "llm",
+                "language": language,
+                "model": self.model,
+                "prompt_tokens": llm_result["prompt_tokens"],
+                "context_messages": llm_result["context_messages"],
+                "cache_hit": cache_hit,
+                "coalesced": coalesced,
+                "timestamp": datetime.now().isoformat()
+            },
+            "answer_source": "ai"
+        }
+    
+    def _llm_error_response(self, error: Exception) -> Dict:
+        """
+        Fallback response when the LLM call fails.
+        """
+        return {
+            "message": f"I apologize, but I'm experiencing technical difficulties. Please try again or contact us directly at K2 Communications. Error: {str(error)}",
+            "suggestions": ["Try again", "Contact us", "View services"],
+            "metadata": {
+                "source": "error",
+                "error": str(error)
+            },
+            "answer_source": "ai"
+        }
+    
+    async def _append_message(self, conversation_id: str, role: str, content: str) -> None:
+        """
+        Add a message to the conversation history.
+        """
+        await self.conversations.append(conversation_id, {
+            "role": role,
+            "content": content,
+            "timestamp": datetime.now().isoformat()
+        })
+    
+    def _build_llm_messages(self, history: List[Dict], language: str) -> Tuple[List[Dict], int]:
+        """
+        Prepare messages for OpenAI: system prompt plus as much recent
+        conversation history as fits in the prompt token budget.
+        
+        Returns:
+            Tuple of (messages, prompt token count)
+        """
+        return self.context_builder.build(self.get_system_prompt(language), history)
+    
+    async def _complete(
+        self,
+        messages: List[Dict],
+        prompt_tokens: int,
+        cache_key: Optional[Tuple[str, str, str]],
+        knowledge_version: Tuple[int, int, int]
+    ) -> Dict:
+        """
+        Call the LLM and cache the answer when the question is cacheable.
+        
+        Returns:
+            Dict with the answer 'message', 'prompt_tokens' and 'context_messages'
+        
+        Raises:
+            CircuitOpenError: If the LLM circuit is open
+        """
+        async with self._llm_call():
+            response = await self.llm.create(
                 model=self.model,
                 messages=messages,
                 temperature=self.temperature,
                 max_tokens=self.max_tokens
             )
-            
-            assistant_message = response.choices[0].message.content
-            
+        
+        llm_result = {
+            "message": response.choices[0].message.content,
+            "prompt_tokens": prompt_tokens,
+            "context_messages": len(messages) - 1
+        }
+        if cache_key is not None:
+            self.response_cache.put(cache_key, knowledge_version, llm_result)
+        return llm_result
+    
+    def _cache_key(
+        self,
+        message: str,
+        language: str,
+        history: List[Dict],
+        context: Optional[Dict]
+    ) -> Optional[Tuple[str, str, str]]:
+        """
+        Key for the LLM response cache.
+        
+        Returns:
+            The key, or None if the answer may depend on earlier turns or
+            request context and must not be cached
+        """
+        if not self.response_cache.enabled or context or len(history) != 1:
+            return None
+        return (normalize_message(message), language, self.model)
+    
+    async def process_message(
+        self,
+        message: str,
+        conversation_id: str,
+        language: str = "en",
+        context: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Process a user message and generate a response.
+        Priority order:
+        1. Admin Q&A (highest priority)
+        2. FAQ matches
+        3. Predefined Q&A
+        4. LLM fallback (lowest priority)
+        """
+        # Add user message to history (creates the conversation if needed)
+        await self._append_message(conversation_id, "user", message)
+        
+        # STEPS 1-3: Curated answers
+        query = MatchQuery(message, language)
+        curated_response = await self._match_curated(query, language)
+        
+        if curated_response:
             # Add assistant response to history
-            self.conversations[conversation_id].append({
-                "role": "assistant",
-                "content": assistant_message,
-                "timestamp": datetime.now().isoformat()
-            })
+            await self._append_message(conversation_id, "assistant", curated_response["message"])
+            return curated_response
+        
+        # STEP 4: No predefined answer found - use LLM
+        # Check if API key is missing
+        if self.api_key_missing:
+            return self._missing_key_response()
+        
+        history = await self.conversations.get(conversation_id)
+        knowledge_version = self.knowledge_version
+        
+        # First-turn, context-free questions can be answered from the cache
+        cache_key = self._cache_key(message, language, history, context)
+        if cache_key is not None:
+            cached_result = self.response_cache.get(cache_key, knowledge_version)
+            if cached_result is not None:
+                await self._append_message(conversation_id, "assistant", cached_result["message"])
+                return self._llm_response(message, language, cached_result, cache_hit=True)
+        
+        messages, prompt_tokens = self._build_llm_messages(history, language)
+        
+        try:
+            # Call OpenAI API; identical cacheable questions asked while a
+            # call is in flight wait for its answer instead of calling again
+            if cache_key is None:
+                llm_result = await self._complete(messages, prompt_tokens, None, knowledge_version)
+                coalesced = False
+            else:
+                llm_result, coalesced = await self.llm_flights.run(
+                    (cache_key, knowledge_version),
+                    lambda: self._complete(messages, prompt_tokens, cache_key, knowledge_version)
+                )
             
-            # Generate suggestions based on context
-            suggestions = self._generate_suggestions(message, assistant_message)
+            # Add assistant response to history
+            await self._append_message(conversation_id, "assistant", llm_result["message"])
             
-            return {
-                "message": assistant_message,
-                "suggestions": suggestions,
-                "metadata": {
-                    "source": "llm",
-                    "language": language,
-                    "model": self.model,
-                    "timestamp": datetime.now().isoformat()
-                },
-                "answer_source": "ai"
-            }
+            return self._llm_response(message, language, llm_result, coalesced=coalesced)
+        
+        except CircuitOpenError:
+            # Answer right away instead of waiting on a failing upstream
+            degraded_response = await self._degraded_response(query, language)
+            if degraded_response["answer_source"] != "ai":
+                await self._append_message(conversation_id, "assistant", degraded_response["message"])
+            return degraded_response
         
         except Exception as e:
             # Fallback response
-            return {
-                "message": f"I apologize, but I'm experiencing technical difficulties. Please try again or contact us directly at K2 Communications. Error: {str(e)}",
-                "suggestions": ["Try again", "Contact us", "View services"],
-                "metadata": {
-                    "source": "error",
-                    "error": str(e)
-                },
-                "answer_source": "ai"
-            }
+            return self._llm_error_response(e)
+    
+    async def process_message_stream(
+        self,
+        message: str,
+        conversation_id: str,
+        language: str = "en",
+        context: Optional[Dict] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Process a user message and stream the response as events.
+        Uses the same priority order as process_message.
+        
+        Yields:
+            Event dicts with 'event' and 'data':
+            - "message": a complete response (curated, cached or degraded answers, missing API key)
+            - "token": {"content": ...} for each piece of the LLM answer
+            - "done": the complete LLM response once the stream has finished
+            - "error": the fallback response if the LLM call fails
+        """
+        # Add user message to history (creates the conversation if needed)
+        await self._append_message(conversation_id, "user", message)
+        
+        # STEPS 1-3: Curated answers go out as a single event
+        query = MatchQuery(message, language)
+        curated_response = await self._match_curated(query, language)
+        
+        if curated_response:
+            await self._append_message(conversation_id, "assistant", curated_response["message"])
+            yield {"event": "message", "data": curated_response}
+            return
+        
+        # STEP 4: Stream the LLM answer
+        if self.api_key_missing:
+            yield {"event": "message", "data": self._missing_key_response()}
+            return
+        
+        history = await self.conversations.get(conversation_id)
+        knowledge_version = self.knowledge_version
+        
+        # Cached answers go out as a single event
+        cache_key = self._cache_key(message, language, history, context)
+        if cache_key is not None:
+            cached_result = self.response_cache.get(cache_key, knowledge_version)
+            if cached_result is not None:
+                await self._append_message(conversation_id, "assistant", cached_result["message"])
+                yield {
+                    "event": "message",
+                    "data": self._llm_response(message, language, cached_result, cache_hit=True)
+                }
+                return
+        
+        messages, prompt_tokens = self._build_llm_messages(history, language)
+        parts: List[str] = []
+        
+        try:
+            # The slot is held until the whole answer has been streamed
+            async with self._llm_call() as responded:
+                stream = await self.llm.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens,
+                    stream=True
+                )
+                # Breaker latency is measured to the stream opening, not
+                # to the end of an answer paced by the client reading it
+                responded()
+                
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    content = chunk.choices[0].delta.content
+                    if content:
+                        parts.append(content)
+                        yield {"event": "token", "data": {"content": content}}
+        
+        except CircuitOpenError:
+            degraded_response = await self._degraded_response(query, language)
+            if degraded_response["answer_source"] != "ai":
+                await self._append_message(conversation_id, "assistant", degraded_response["message"])
+            yield {"event": "message", "data": degraded_response}
+            return
+        
+        except Exception as e:
+            yield {"event": "error", "data": self._llm_error_response(e)}
+            return
+        
+        llm_result = {
+            "message": "".join(parts),
+            "prompt_tokens": prompt_tokens,
+            "context_messages": len(messages) - 1
+        }
+        if cache_key is not None:
+            self.response_cache.put(cache_key, knowledge_version, llm_result)
+        
+        # Add the assembled answer to history once the stream has ended
+        await self._append_message(conversation_id, "assistant", llm_result["message"])
+        
+        yield {"event": "done", "data": self._llm_response(message, language, llm_result)}
     
     def _generate_suggestions(self, user_message: str, assistant_response: str) -> List[str]:
         """
         Generate follow-up suggestions based on the conversation.
         """
         suggestions = []
+        user_message_lower = user_message.lower()
         
         # Default suggestions based on common topics
-        if "service" in user_message.lower() or "service" in assistant_response.lower():
+        if "service" in user_message_lower or "service" in assistant_response.lower():
             suggestions.extend(["Tell me more about PR consultancy", "What is crisis management?"])
         
-        if "price" in user_message.lower() or "cost" in user_message.lower():
+        if "price" in user_message_lower or "cost" in user_message_lower:
             suggestions.append("Schedule a consultation")
         
-        if "crisis" in user_message.lower():
+        if "crisis" in user_message_lower:
             suggestions.extend(["How to handle a PR crisis?", "24/7 support options"])
         
         # Always include these options
@@ -286,4 +1058,71 @@ Always be helpful, knowledgeable, friendly, and represent K2 Communications' exc
         """
         Retrieve conversation history for a given conversation ID.
         """
-        return self.conversations.get(conversation_id, [])
+        return await self.conversations.get(conversation_id)
+    
+    def get_cache_stats(self) -> Dict[str, int]:
+        """
+        Report LLM response cache size and hit/miss counters, and how many
+        LLM calls were saved by coalescing concurrent identical questions.
+        """
+        stats = self.response_cache.stats()
+        stats["coalesced"] = self.llm_flights.coalesced
+        return stats
+    
+    def get_llm_stats(self) -> Dict[str, float]:
+        """
+        Report LLM concurrency, queue depth and queue wait time, circuit
+        breaker state, and request, retry and hedging counters.
+        """
+        stats = self.llm_limiter.stats()
+        stats["circuit"] = self.llm_breaker.stats()
+        if self.llm is not None:
+            stats.update(self.llm.stats())
+        return stats
+    
+    def get_matching_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Report calls, matches and time spent per curated answer tier.
+        """
+        return self.matching_pipeline.stats()
+    
+    def get_translation_stats(self) -> Dict[str, object]:
+        """
+        Report stored curated answer translations per language and
+        translations in progress.
+        """
+        if self.answer_translations is None:
+            return {"enabled": False}
+        return {
+            "enabled": True,
+            "languages": self.answer_translations.stats(),
+            "pending": len(self._translation_tasks)
+        }
+    
+    def get_conversation_stats(self) -> Dict[str, int]:
+        """
+        Report conversation store size and eviction counters.
+        """
+        return self.conversations.stats()
+    
+    async def start(self) -> None:
+        """
+        Finish starting up off the event loop: load the prompt tokenizer,
+        which may download its encoding. Until then prompt tokens are
+        estimated.
+        """
+        await asyncio.to_thread(self.context_builder.load_tokenizer)
+    
+    async def close(self) -> None:
+        """
+        Flush buffered conversation writes and release resources.
+        """
+        if self.file_watcher is not None:
+            self.file_watcher.stop()
+        for task in list(self._translation_tasks.values()):
+            task.cancel()
+        if self.answer_translations is not None:
+            await asyncio.to_thread(self.answer_translations.close)
+        await self.conversations.close()
+        if self.llm is not None:
+            await self.llm.close()
@@ -0,0 +1,136 @@
+import time
+from typing import Callable, Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the upstream while the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for calls to an unreliable upstream.
+
+    closed:    calls go through; `failure_threshold` consecutive failures or
+               latency breaches open the circuit.
+    open:      calls are refused without touching the network until
+               `reset_timeout_seconds` have passed.
+    half_open: up to `half_open_max_calls` probe calls go through; a
+               successful probe closes the circuit, a failed one reopens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        latency_threshold_seconds: float = 15.0,
+        reset_timeout_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize a closed breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            latency_threshold_seconds: Successful calls slower than this count as failures
+            reset_timeout_seconds: How long the circuit stays open before probing
+            half_open_max_calls: Concurrent probe calls allowed while half open
+            clock: Monotonic time source, overridable for tests
+        """
+        self.failure_threshold = failure_threshold
+        self.latency_threshold_seconds = latency_threshold_seconds
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_started_at = 0.0
+
+        self.opened = 0
+        self.rejected = 0
+        self.latency_breaches = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout_seconds:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Whether a call may go to the upstream now. Every allowed call must be
+        followed by record_success, record_failure or release.
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN:
+            # A probe that never reported back (e.g. its caller went away)
+            # is given up on after the reset timeout
+            if (
+                self._probes >= self.half_open_max_calls
+                and self._clock() - self._probe_started_at >= self.reset_timeout_seconds
+            ):
+                self._probes = 0
+            if self._probes < self.half_open_max_calls:
+                self._probes += 1
+                self._probe_started_at = self._clock()
+                return True
+        self.rejected += 1
+        return False
+
+    def release(self) -> None:
+        """
+        Give back an allowed call that ended without an outcome, e.g. one
+        cancelled or refused before it reached the upstream, so a half-open
+        circuit can send another probe at once.
+        """
+        if self._state == self.HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def record_success(self, latency_seconds: float = 0.0) -> None:
+        """Record a completed call and how long it took."""
+        if latency_seconds > self.latency_threshold_seconds:
+            self.latency_breaches += 1
+            self.record_failure()
+            return
+        if self._state != self.CLOSED:
+            logger.info("Circuit breaker closed")
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._probes = 0
+
+    def record_failure(self) -> None:
+        """Record a failed call."""
+        self._consecutive_failures += 1
+        if self._state == self.HALF_OPEN or (
+            self._state == self.CLOSED and self._consecutive_failures >= self.failure_threshold
+        ):
+            self._trip()
+
+    def stats(self) -> Dict[str, object]:
+        """Report the breaker state and counters."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "latency_breaches": self.latency_breaches
+        }
+
+    def _trip(self) -> None:
+        logger.warning(f"Circuit breaker opened after {self._consecutive_failures} consecutive failures")
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        self._probes = 0
+        self.opened += 1
@@ -0,0 +1,149 @@
+import math
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Chat formatting overhead, as counted by OpenAI for chat completion models
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+
+# Calibrated estimate for English text when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+
+def _load_tokenizer(model: str) -> Optional[Callable[[str], int]]:
+    """
+    Return a token counter backed by tiktoken, or None if it is not
+    installed or its encoding cannot be loaded (tiktoken downloads
+    encodings on first use, which is slow and fails without network
+    access, so this blocks).
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        logger.warning("tiktoken is not installed; estimating prompt tokens")
+        return None
+
+    try:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"Could not load the tiktoken encoding ({e}); estimating prompt tokens")
+        return None
+    return lambda text: len(encoding.encode(text))
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of text without a tokenizer.
+
+    ASCII text averages about CHARS_PER_TOKEN characters per token. Other
+    characters, notably Indic scripts, take about one token each or more,
+    so each is counted as a token; dividing them by CHARS_PER_TOKEN would
+    undercount Hindi or Tamil several times over.
+    """
+    if text.isascii():
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    ascii_chars = sum(1 for ch in text if ch < "\x80")
+    return math.ceil(ascii_chars / CHARS_PER_TOKEN) + len(text) - ascii_chars
+
+
+class ContextBuilder:
+    """
+    Builds the message list sent to the LLM within a token budget.
+
+    The system prompt is always sent; conversation history is added newest
+    first until the budget is used up, so prompt size stays bounded however
+    long a conversation runs. Token counts are cached per message text so
+    each turn only counts the new messages.
+
+    Tokens are estimated until `load_tokenizer` has loaded tiktoken, which
+    may download its encoding and so is not done on construction.
+    """
+
+    def __init__(self, model: str, budget_tokens: int, cache_size: int = 10000):
+        """
+        Initialize the builder.
+
+        Args:
+            model: Model name, used to pick the tokenizer
+            budget_tokens: Maximum prompt tokens (system prompt plus history)
+            cache_size: Maximum number of cached message token counts
+        """
+        self.model = model
+        self.budget_tokens = budget_tokens
+        self.cache_size = cache_size
+
+        self._count: Callable[[str], int] = estimate_tokens
+        self._cache: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+
+    def load_tokenizer(self) -> bool:
+        """
+        Count tokens with tiktoken from now on. Blocks while the encoding
+        is loaded, so call it off the event loop.
+
+        Returns:
+            False if tiktoken could not be loaded; tokens stay estimated
+        """
+        count = _load_tokenizer(self.model)
+        if count is None:
+            return False
+        # Swap in the counter and drop the estimated counts in one step each
+        self._count = count
+        self._cache = OrderedDict()
+        return True
+
+    def count_message(self, role: str, content: str) -> int:
+        """
+        Count the tokens a message takes up in the prompt.
+
+        Args:
+            role: Message role
+            content: Message content
+
+        Returns:
+            Token count including per-message overhead
+        """
+        key = (role, content)
+        tokens = self._cache.get(key)
+        if tokens is not None:
+            self._cache.move_to_end(key)
+            return tokens
+
+        tokens = TOKENS_PER_MESSAGE + self._count(role) + self._count(content)
+        self._cache[key] = tokens
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return tokens
+
+    def build(self, system_prompt: str, history: List[Dict]) -> Tuple[List[Dict], int]:
+        """
+        Build the prompt messages for a turn.
+
+        Args:
+            system_prompt: The system prompt
+            history: Conversation messages oldest first; the last one is the
+                     current user message and is always included
+
+        Returns:
+            Tuple of (messages for the chat completion call, prompt token count)
+        """
+        total = TOKENS_PER_REPLY + self.count_message("system", system_prompt)
+
+        window: List[Dict] = []
+        for msg in reversed(history):
+            tokens = self.count_message(msg["role"], msg["content"])
+            if window and total + tokens > self.budget_tokens:
+                break
+            window.append({"role": msg["role"], "content": msg["content"]})
+            total += tokens
+
+        if len(window) < len(history):
+            logger.debug(f"Trimmed conversation history to {len(window)} of {len(history)} messages")
+
+        window.reverse()
+        return [{"role": "system", "content": system_prompt}] + window, total
@@ -0,0 +1,421 @@
+import asyncio
+import itertools
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from pathlib import Path
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationStore(ABC):
+    """
+    Interface for conversation history backends used by ChatbotService.
+    """
+
+    @abstractmethod
+    async def append(self, conversation_id: str, message: Dict) -> None:
+        """
+        Append a message to a conversation, creating it if needed.
+
+        Args:
+            conversation_id: The conversation to append to
+            message: Message dict with role, content and timestamp
+        """
+
+    @abstractmethod
+    async def get(self, conversation_id: str) -> List[Dict]:
+        """
+        Get the messages of a live conversation.
+
+        Args:
+            conversation_id: The conversation to read
+
+        Returns:
+            Messages oldest first, or an empty list if unknown or expired
+        """
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Report the store's size and counters."""
+
+    async def close(self) -> None:
+        """Flush pending work and release resources."""
+
+
+class InMemoryConversationStore(ConversationStore):
+    """
+    Bounded in-memory conversation history, local to one worker process.
+
+    Conversations are kept in least-recently-used order. The store holds at
+    most `max_conversations` conversations and `max_messages` messages per
+    conversation, and drops conversations that have been idle for longer
+    than `idle_ttl_seconds`.
+    """
+
+    def __init__(
+        self,
+        max_conversations: int = 10000,
+        max_messages: int = 50,
+        idle_ttl_seconds: float = 3600,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize an empty store.
+
+        Args:
+            max_conversations: Maximum number of conversations kept in memory
+            max_messages: Maximum number of messages kept per conversation;
+                          the oldest messages are dropped first
+            idle_ttl_seconds: Conversations idle for longer than this are evicted
+            clock: Monotonic time source, overridable for tests
+        """
+        self.max_conversations = max_conversations
+        self.max_messages = max_messages
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._clock = clock
+
+        # conversation_id -> (last access time, messages), oldest access first
+        self._conversations: "OrderedDict[str, List]" = OrderedDict()
+
+        self.evicted_lru = 0
+        self.evicted_idle = 0
+        self.trimmed_messages = 0
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    def __contains__(self, conversation_id: str) -> bool:
+        self._expire_idle()
+        return conversation_id in self._conversations
+
+    async def append(self, conversation_id: str, message: Dict) -> None:
+        self._expire_idle()
+
+        entry = self._conversations.get(conversation_id)
+        if entry is None:
+            entry = [0.0, deque(maxlen=self.max_messages)]
+            self._conversations[conversation_id] = entry
+            self._evict_lru()
+        else:
+            self._conversations.move_to_end(conversation_id)
+
+        messages: Deque[Dict] = entry[1]
+        if len(messages) == self.max_messages:
+            self.trimmed_messages += 1
+        messages.append(message)
+        entry[0] = self._clock()
+
+    async def get(self, conversation_id: str) -> List[Dict]:
+        self._expire_idle()
+
+        entry = self._conversations.get(conversation_id)
+        if entry is None:
+            return []
+
+        self._conversations.move_to_end(conversation_id)
+        entry[0] = self._clock()
+        return list(entry[1])
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "conversations": len(self._conversations),
+            "messages": sum(len(entry[1]) for entry in self._conversations.values()),
+            "evicted_lru": self.evicted_lru,
+            "evicted_idle": self.evicted_idle,
+            "trimmed_messages": self.trimmed_messages
+        }
+
+    def _expire_idle(self) -> None:
+        """Drop idle conversations; they sit at the front of the LRU order."""
+        deadline = self._clock() - self.idle_ttl_seconds
+        while self._conversations:
+            conversation_id, entry = next(iter(self._conversations.items()))
+            if entry[0] > deadline:
+                break
+            del self._conversations[conversation_id]
+            self.evicted_idle += 1
+
+    def _evict_lru(self) -> None:
+        """Drop least recently used conversations above the size limit."""
+        while len(self._conversations) > self.max_conversations:
+            conversation_id, _ = self._conversations.popitem(last=False)
+            self.evicted_lru += 1
+            logger.debug(f"Evicted conversation {conversation_id} (LRU)")
+
+
+class SQLiteConversationStore(ConversationStore):
+    """
+    Conversation history in a SQLite database shared by all workers.
+
+    The database runs in WAL mode so workers can read while another writes.
+    Appends are buffered and written in batches by a background task; reads
+    merge the buffered messages of this worker with the stored ones, so a
+    conversation always sees its own latest messages. Conversations without
+    a new message for `idle_ttl_seconds` are purged periodically.
+
+    Every message has a unique key, and writing a batch ignores messages
+    already stored, so a batch that is written again (e.g. after its
+    writer was cancelled mid-write) is not duplicated.
+    """
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS conversation_messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        conversation_id TEXT NOT NULL,
+        message_key TEXT NOT NULL,
+        role TEXT NOT NULL,
+        content TEXT NOT NULL,
+        timestamp TEXT,
+        created_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS conversation_messages_conversation
+        ON conversation_messages (conversation_id, id);
+    CREATE INDEX IF NOT EXISTS conversation_messages_created_at
+        ON conversation_messages (created_at);
+
+    CREATE TABLE IF NOT EXISTS conversations (
+        conversation_id TEXT PRIMARY KEY,
+        last_active REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS conversations_last_active
+        ON conversations (last_active);
+    """
+
+    # Created separately: databases written before it existed may hold
+    # duplicated batches that have to be removed first
+    _UNIQUE_KEY_INDEX = (
+        "CREATE UNIQUE INDEX IF NOT EXISTS conversation_messages_key "
+        "ON conversation_messages (message_key)"
+    )
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        max_messages: int = 50,
+        idle_ttl_seconds: float = 3600,
+        flush_interval_seconds: float = 0.05,
+        max_batch_size: int = 500,
+        purge_interval_seconds: float = 300
+    ):
+        """
+        Open (and if needed create) the database.
+
+        Args:
+            db_path: Path to the SQLite file. Defaults to the
+                     CONVERSATION_SQLITE_PATH env var, then
+                     backend/data/conversations.sqlite3
+            max_messages: Maximum number of recent messages returned per conversation
+            idle_ttl_seconds: Conversations idle for longer than this are purged
+            flush_interval_seconds: How long appends may wait before being written
+            max_batch_size: Buffered appends that trigger an immediate write
+            purge_interval_seconds: How often idle conversations are purged
+        """
+        if db_path is None:
+            db_path = os.getenv("CONVERSATION_SQLITE_PATH") or (
+                Path(__file__).parent.parent / "data" / "conversations.sqlite3"
+            )
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_messages = max_messages
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_batch_size = max_batch_size
+        self.purge_interval_seconds = purge_interval_seconds
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._create_schema()
+
+        # Message keys are unique per worker so buffered and stored copies
+        # of the same message can be told apart
+        self._key_prefix = uuid.uuid4().hex
+        self._key_counter = itertools.count()
+
+        # Appends not yet written, and the batch currently being written
+        self._pending: List[Tuple] = []
+        self._flushing: List[Tuple] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._last_purge = time.time()
+
+        self.flushed_batches = 0
+        self.flushed_messages = 0
+
+    async def append(self, conversation_id: str, message: Dict) -> None:
+        row = (
+            conversation_id,
+            f"{self._key_prefix}:{next(self._key_counter)}",
+            message["role"],
+            message["content"] or "",
+            message.get("timestamp"),
+            time.time()
+        )
+        self._pending.append(row)
+        self._ensure_flush_task()
+        if len(self._pending) >= self.max_batch_size:
+            self._wakeup.set()
+
+    async def get(self, conversation_id: str) -> List[Dict]:
+        # Snapshot buffered rows before reading so none can be missed if a
+        # batch is written while the query runs
+        buffered = [
+            row for row in self._flushing + self._pending if row[0] == conversation_id
+        ]
+        stored = await asyncio.to_thread(self._read, conversation_id)
+
+        stored_keys = {row[1] for row in stored}
+        rows = stored + [row for row in buffered if row[1] not in stored_keys]
+        return [
+            {"role": row[2], "content": row[3], "timestamp": row[4]}
+            for row in rows[-self.max_messages:]
+        ]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending_writes": len(self._pending) + len(self._flushing),
+            "flushed_batches": self.flushed_batches,
+            "flushed_messages": self.flushed_messages
+        }
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self._flush()
+        with self._lock:
+            self._conn.close()
+
+    def _ensure_flush_task(self) -> None:
+        """Start the background writer on the running event loop."""
+        if self._flush_task is None or self._flush_task.done():
+            self._wakeup = asyncio.Event()
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        """Write buffered appends every flush interval, or sooner when a batch fills up."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self._flush()
+            except Exception as e:
+                logger.error(f"Error writing conversation messages: {e}")
+
+    async def _flush(self) -> None:
+        """Write one batch of buffered appends in a single transaction."""
+        if not self._pending and not self._flushing:
+            return
+        if not self._flushing:
+            self._flushing, self._pending = self._pending, []
+
+        purge_before = None
+        if time.time() - self._last_purge >= self.purge_interval_seconds:
+            purge_before = time.time() - self.idle_ttl_seconds
+            self._last_purge = time.time()
+
+        # A failed batch stays in _flushing and is retried on the next flush
+        await asyncio.to_thread(self._write, self._flushing, purge_before)
+        self.flushed_batches += 1
+        self.flushed_messages += len(self._flushing)
+        self._flushing = []
+
+    def _create_schema(self) -> None:
+        """Create the tables, upgrading databases written by earlier versions."""
+        with self._lock, self._conn:
+            existing = {
+                row[0] for row in self._conn.execute("SELECT name FROM sqlite_master")
+            }
+            self._conn.executescript(self._SCHEMA)
+            if "conversations" not in existing:
+                # Conversations stored so far were last active with their newest message
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO conversations (conversation_id, last_active) "
+                    "SELECT conversation_id, MAX(created_at) FROM conversation_messages "
+                    "GROUP BY conversation_id"
+                )
+            if "conversation_messages_key" not in existing:
+                self._conn.execute(
+                    "DELETE FROM conversation_messages WHERE id NOT IN "
+                    "(SELECT MIN(id) FROM conversation_messages GROUP BY message_key)"
+                )
+                self._conn.execute(self._UNIQUE_KEY_INDEX)
+
+    def _write(self, rows: List[Tuple], purge_before: Optional[float]) -> None:
+        last_active: Dict[str, float] = {}
+        for row in rows:
+            last_active[row[0]] = max(last_active.get(row[0], 0.0), row[5])
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO conversation_messages "
+                "(conversation_id, message_key, role, content, timestamp, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.executemany(
+                "INSERT INTO conversations (conversation_id, last_active) VALUES (?, ?) "
+                "ON CONFLICT (conversation_id) DO UPDATE "
+                "SET last_active = MAX(last_active, excluded.last_active)",
+                list(last_active.items())
+            )
+            if purge_before is not None:
+                # Whole conversations go once idle, never the early turns of a live one
+                self._conn.execute(
+                    "DELETE FROM conversation_messages WHERE conversation_id IN "
+                    "(SELECT conversation_id FROM conversations WHERE last_active < ?)",
+                    (purge_before,)
+                )
+                self._conn.execute(
+                    "DELETE FROM conversations WHERE last_active < ?", (purge_before,)
+                )
+
+    def _read(self, conversation_id: str) -> List[Tuple]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT conversation_id, message_key, role, content, timestamp, created_at "
+                "FROM conversation_messages WHERE conversation_id = ? "
+                "ORDER BY id DESC LIMIT ?",
+                (conversation_id, self.max_messages)
+            ).fetchall()
+        rows.reverse()
+        return rows
+
+
+def create_conversation_store() -> ConversationStore:
+    """
+    Build the conversation store selected by the CONVERSATION_BACKEND env var
+    ("memory" by default, or "sqlite").
+    """
+    backend = os.getenv("CONVERSATION_BACKEND", "memory")
+    max_messages = int(os.getenv("CONVERSATION_MAX_MESSAGES", "50"))
+    idle_ttl_seconds = float(os.getenv("CONVERSATION_IDLE_TTL_SECONDS", "3600"))
+
+    if backend == "memory":
+        return InMemoryConversationStore(
+            max_conversations=int(os.getenv("CONVERSATION_MAX", "10000")),
+            max_messages=max_messages,
+            idle_ttl_seconds=idle_ttl_seconds
+        )
+    if backend == "sqlite":
+        return SQLiteConversationStore(
+            max_messages=max_messages,
+            idle_ttl_seconds=idle_ttl_seconds
+        )
+    raise ValueError(f"Unknown conversation backend: {backend}")
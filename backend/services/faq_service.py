@@ -1,15 +1,58 @@
 import json
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Set, Tuple
 from pathlib import Path
 import logging
-import re
+
+from .keyword_matcher import KeywordAutomaton
+from .matching_pipeline import MatchQuery
+from .text_language import entry_language, keyword_language, normalize_text
 
 logger = logging.getLogger(__name__)
 
+class _FAQIndex:
+    """
+    Immutable snapshot of the FAQ data with one keyword automaton per
+    language, each keyword going to the language of its own script. Each
+    keyword id maps back to the position of its topic so that matching can
+    keep the file's topic order.
+    """
+    
+    def __init__(self, faqs: Dict[str, Dict], version: int):
+        topics: List[str] = []
+        # language -> (keywords, topic position of each keyword)
+        partitions: Dict[str, Tuple[List[str], List[int]]] = {}
+        
+        for topic_index, (topic, faq_data) in enumerate(faqs.items()):
+            topics.append(topic)
+            keywords = faq_data.get("keywords", [])
+            language = entry_language(" ".join(keywords), faq_data.get("language"))
+            for keyword in keywords:
+                partition_keywords, keyword_topics = partitions.setdefault(
+                    keyword_language(keyword, language), ([], [])
+                )
+                partition_keywords.append(normalize_text(keyword))
+                keyword_topics.append(topic_index)
+        
+        self.faqs = faqs
+        self.version = version
+        self.topics = topics
+        # language -> (keyword automaton, topic position of each keyword id)
+        self.partitions: Dict[str, Tuple[KeywordAutomaton, List[int]]] = {
+            language: (KeywordAutomaton(keywords), keyword_topics)
+            for language, (keywords, keyword_topics) in partitions.items()
+        }
+        self.languages = frozenset(partitions)
+
+
 class FAQService:
     """
     Service to load and match predetermined FAQ answers.
     Provides case-insensitive keyword matching for user queries.
+    
+    The FAQs and their keyword automaton live in one immutable snapshot;
+    a reload builds a complete new snapshot and swaps it in with a single
+    assignment, so lookups running meanwhile see either the old or the new
+    data, never a mix.
     """
     
     def __init__(self, faq_file_path: Optional[str] = None):
@@ -25,38 +68,58 @@ class FAQService:
             faq_file_path = backend_dir / "private_faq" / "faqs.json"
         
         self.faq_file_path = Path(faq_file_path)
-        self.faqs: Dict[str, Dict] = {}
+        self._index = _FAQIndex({}, 0)
         self.load_faqs()
     
-    def load_faqs(self) -> None:
+    @property
+    def faqs(self) -> Dict[str, Dict]:
+        return self._index.faqs
+    
+    @property
+    def version(self) -> int:
+        """Bumped whenever new FAQ data is loaded."""
+        return self._index.version
+    
+    def load_faqs(self) -> bool:
         """
         Load FAQs from the JSON file into memory.
-        Called on initialization and can be called again to reload.
+        Called on initialization and can be called again to reload; if the
+        file is missing or malformed the current FAQs are kept.
+        
+        Returns:
+            True if new FAQ data was loaded
         """
         try:
-            if not self.faq_file_path.exists():
-                logger.warning(f"FAQ file not found at {self.faq_file_path}. FAQ matching will be disabled.")
-                self.faqs = {}
-                return
-            
             with open(self.faq_file_path, 'r', encoding='utf-8') as f:
-                self.faqs = json.load(f)
-            
-            logger.info(f"Loaded {len(self.faqs)} FAQ entries from {self.faq_file_path}")
-        except json.JSONDecodeError as e:
-            logger.error(f"Error parsing FAQ JSON file: {e}")
-            self.faqs = {}
+                faqs = json.load(f)
+            if not isinstance(faqs, dict):
+                raise ValueError("expected an object of FAQ topics")
+            index = _FAQIndex(faqs, self.version + 1)
+        except FileNotFoundError:
+            logger.warning(f"FAQ file not found at {self.faq_file_path}. Keeping {len(self.faqs)} current FAQ entries.")
+            return False
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.error(f"Error parsing FAQ JSON file: {e}. Keeping {len(self.faqs)} current FAQ entries.")
+            return False
         except Exception as e:
-            logger.error(f"Error loading FAQ file: {e}")
-            self.faqs = {}
+            logger.error(f"Error loading FAQ file: {e}. Keeping {len(self.faqs)} current FAQ entries.")
+            return False
+        
+        # Swap in the new data and automaton together
+        self._index = index
+        logger.info(f"Loaded {len(faqs)} FAQ entries from {self.faq_file_path}")
+        return True
     
-    def reload_faqs(self) -> None:
+    def reload_faqs(self) -> bool:
         """
         Reload FAQs from the file.
         Useful for hot-reloading when the FAQ file is updated.
+        
+        Returns:
+            True if new FAQ data was loaded
         """
         logger.info("Reloading FAQs...")
-        self.load_faqs()
+        return self.load_faqs()
     
     def find_matching_faq(self, user_message: str) -> Optional[Dict[str, str]]:
         """
@@ -69,28 +132,39 @@ class FAQService:
         Returns:
             Dictionary with 'topic' and 'answer' if match found, None otherwise
         """
-        if not self.faqs:
+        return self.match(MatchQuery(user_message))
+    
+    def match(self, query: MatchQuery) -> Optional[Dict[str, str]]:
+        """
+        Search for a matching FAQ for an already normalized message.
+        See find_matching_faq.
+        """
+        index = self._index
+        if not index.faqs:
             return None
         
-        # Normalize user message to lowercase for matching
-        normalized_message = user_message.lower()
+        normalized_message = query.lower
+        languages = index.partitions.keys() if query.languages is None else query.languages
         
-        # Check each FAQ entry
-        for topic, faq_data in self.faqs.items():
-            keywords = faq_data.get("keywords", [])
-            
-            # Check if any keyword matches in the user message
-            for keyword in keywords:
-                # Use word boundary regex for more precise matching
-                # \b ensures we match whole words, not substrings
-                pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
-                if re.search(pattern, normalized_message):
-                    return {
-                        "topic": topic,
-                        "answer": faq_data.get("answer", "")
-                    }
+        # Find every keyword hit in one pass per language of the message;
+        # word boundaries are checked by the automaton so only whole-word
+        # matches are reported
+        matched_topics = [
+            keyword_topics[k]
+            for automaton, keyword_topics in (
+                index.partitions[language] for language in languages if language in index.partitions
+            )
+            for k in automaton.search(normalized_message, whole_word=True)
+        ]
+        if not matched_topics:
+            return None
         
-        return None
+        # The earliest topic in file order wins, as before
+        topic = index.topics[min(matched_topics)]
+        return {
+            "topic": topic,
+            "answer": index.faqs[topic].get("answer", "")
+        }
     
     def get_all_topics(self) -> List[str]:
         """
@@ -101,6 +175,15 @@ class FAQService:
         """
         return list(self.faqs.keys())
     
+    def get_languages(self) -> Set[str]:
+        """
+        Get the languages of the FAQ keywords.
+        
+        Returns:
+            Set of language codes
+        """
+        return self._index.languages
+    
     def get_faq_by_topic(self, topic: str) -> Optional[Dict]:
         """
         Get FAQ data for a specific topic.
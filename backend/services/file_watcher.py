@@ -0,0 +1,126 @@
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (mtime in ns, size, inode) of a file, or None while it does not exist
+FileStamp = Optional[Tuple[int, int, int]]
+
+
+def file_stamp(path: Path) -> FileStamp:
+    """Stamp that changes whenever the file is rewritten or replaced."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+class FileWatcher:
+    """
+    Polls files for changes on a background thread and runs a reload
+    function for each changed file.
+
+    Changes are detected by stat polling (mtime, size and inode, so atomic
+    rename-over writes are seen too), which works the same on every
+    platform and filesystem. The reload functions run on the watcher
+    thread, so parsing and index building stay off the event loop; they
+    are expected to swap in their new data with a single assignment.
+
+    A file that disappears is not reported until it exists again. A
+    reload that fails is not retried until the file changes again.
+
+    After a poll that reloaded files, `after_reload` runs on the watcher
+    thread too, e.g. to rebuild indexes derived from several files once.
+    """
+
+    def __init__(self, interval_seconds: float = 2.0, after_reload: Optional[Callable[[], object]] = None):
+        """
+        Initialize a watcher without files.
+
+        Args:
+            interval_seconds: Time between polls
+            after_reload: Called without arguments after a poll that reloaded files
+        """
+        self.interval_seconds = interval_seconds
+        self._after_reload = after_reload
+        self._watches: List[Tuple[Path, Callable[[], object], str]] = []
+        self._stamps: Dict[Path, FileStamp] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.reloads = 0
+        self.failures = 0
+
+    def watch(self, path: Path, reload: Callable[[], object], name: Optional[str] = None) -> None:
+        """
+        Watch a file; its current content counts as already loaded.
+
+        Args:
+            path: File to watch
+            reload: Called without arguments after the file changed
+            name: Name used in logs; defaults to the file name
+        """
+        path = Path(path)
+        self._watches.append((path, reload, name or path.name))
+        self._stamps[path] = file_stamp(path)
+
+    def check(self) -> int:
+        """
+        Poll every watched file once and reload the changed ones.
+
+        Returns:
+            Number of reloads run
+        """
+        reloaded = 0
+        for path, reload, name in self._watches:
+            stamp = file_stamp(path)
+            if stamp is None or stamp == self._stamps.get(path):
+                continue
+            self._stamps[path] = stamp
+
+            logger.info(f"{name} changed, reloading")
+            try:
+                reload()
+                self.reloads += 1
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Error reloading {name}: {e}")
+            reloaded += 1
+
+        if reloaded and self._after_reload is not None:
+            try:
+                self._after_reload()
+            except Exception as e:
+                logger.error(f"Error after reloading files: {e}")
+        return reloaded
+
+    def start(self) -> None:
+        """Start polling on a daemon thread."""
+        if self._thread is not None or not self._watches:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="file-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop polling and wait for a reload in progress to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> Dict[str, int]:
+        """Report watched files and reload counters."""
+        return {
+            "files": len(self._watches),
+            "reloads": self.reloads,
+            "failures": self.failures
+        }
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.check()
@@ -0,0 +1,86 @@
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: increments are only serialized within the process
+    fcntl = None
+
+_COUNTER = struct.Struct("<Q")
+
+
+class GenerationCounter:
+    """
+    A counter shared by every worker process on the host.
+
+    The counter is 8 bytes in a small file that every process maps into
+    memory, so reading it is a load from shared memory with no system call
+    and can be done on every request. Writers bump it after publishing a
+    change; readers that see a new value know their in-memory copy is stale.
+
+    `locked()` takes an exclusive lock on the file (flock where available),
+    which serializes the bump and the change it publishes across workers.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open or create the counter file.
+
+        Args:
+            path: Counter file, e.g. next to the data it versions
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if os.fstat(self._fd).st_size < _COUNTER.size:
+            with self.locked():
+                if os.fstat(self._fd).st_size < _COUNTER.size:
+                    os.ftruncate(self._fd, _COUNTER.size)
+        self._map = mmap.mmap(self._fd, _COUNTER.size)
+
+    def value(self) -> int:
+        """
+        Current generation. A read racing a bump may see a stale value,
+        which is picked up on the next read.
+        """
+        return _COUNTER.unpack_from(self._map)[0]
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Hold the counter exclusively across processes and threads."""
+        with self._thread_lock:
+            # Re-entrant: only the outermost holder takes and drops the flock
+            self._depth += 1
+            if self._depth == 1 and fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0 and fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def bump(self) -> int:
+        """
+        Increment the generation.
+
+        Returns:
+            The new generation
+        """
+        with self.locked():
+            generation = self.value() + 1
+            _COUNTER.pack_into(self._map, 0, generation)
+            return generation
+
+    def close(self) -> None:
+        """Unmap and close the counter file."""
+        self._map.close()
+        os.close(self._fd)
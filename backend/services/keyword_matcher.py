@@ -0,0 +1,103 @@
+from collections import deque
+from typing import Dict, List, Set
+
+
+def _is_word_char(ch: str) -> bool:
+    """Mirror text_language.WORD_RE: `\\w` plus Indic vowel signs and viramas."""
+    return ch.isalnum() or ch == '_' or '\u0900' <= ch <= '\u0963' or '\u0966' <= ch <= '\u0dff'
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a fixed list of keywords.
+    Finds every keyword occurrence in a single pass over the text,
+    regardless of how many keywords were compiled in.
+    """
+
+    def __init__(self, keywords: List[str]):
+        """
+        Build the automaton.
+
+        Args:
+            keywords: Keywords to search for. Matching is case-sensitive, so
+                      callers should lowercase both keywords and text.
+                      The position of a keyword in this list is its id.
+        """
+        self.keywords = list(keywords)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for keyword_id, keyword in enumerate(self.keywords):
+            if not keyword:
+                continue
+            state = 0
+            for ch in keyword:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(keyword_id)
+
+        # Breadth-first pass to compute failure links and merge outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def search(self, text: str, whole_word: bool = False) -> Set[int]:
+        """
+        Find the ids of all keywords occurring in the text.
+
+        Args:
+            text: Text to scan
+            whole_word: If True, only report occurrences that sit on word
+                        boundaries, with the same semantics as wrapping the
+                        keyword in `\\b...\\b`
+
+        Returns:
+            Set of keyword ids found in the text
+        """
+        found: Set[int] = set()
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+
+        for end, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+
+            for keyword_id in output[state]:
+                if keyword_id in found:
+                    continue
+                if whole_word and not self._on_word_boundaries(text, end, self.keywords[keyword_id]):
+                    continue
+                found.add(keyword_id)
+
+        return found
+
+    @staticmethod
+    def _on_word_boundaries(text: str, end: int, keyword: str) -> bool:
+        """Check `\\b` at both ends of a keyword occurrence ending at `end`."""
+        start = end - len(keyword) + 1
+        before = start > 0 and _is_word_char(text[start - 1])
+        after = end + 1 < len(text) and _is_word_char(text[end + 1])
+        return (
+            before != _is_word_char(keyword[0])
+            and after != _is_word_char(keyword[-1])
+        )
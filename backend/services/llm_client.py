@@ -0,0 +1,230 @@
+import asyncio
+import math
+import os
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+import httpx
+import openai
+from openai import AsyncOpenAI
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying besides 5xx: timeouts, conflicts, rate limits
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether a failed LLM call may succeed if sent again."""
+    if isinstance(error, openai.APIConnectionError):
+        # Also covers APITimeoutError
+        return True
+    if isinstance(error, httpx.TransportError):
+        # Connection errors and timeouts while reading a stream reach the
+        # caller unwrapped
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return False
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Build the HTTP client shared by all OpenAI calls, with an explicit
+    connection pool, keep-alive and per-phase timeouts taken from the
+    LLM_HTTP_* env vars.
+    """
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS", "30"))
+        ),
+        timeout=httpx.Timeout(
+            connect=float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT_SECONDS", "5")),
+            read=float(os.getenv("LLM_HTTP_READ_TIMEOUT_SECONDS", "30")),
+            write=float(os.getenv("LLM_HTTP_WRITE_TIMEOUT_SECONDS", "10")),
+            pool=float(os.getenv("LLM_HTTP_POOL_TIMEOUT_SECONDS", "5"))
+        )
+    )
+
+
+def create_openai_client(api_key: str, http_client: Optional[httpx.AsyncClient] = None) -> AsyncOpenAI:
+    """
+    Build the OpenAI client on the shared HTTP client. The SDK's own retries
+    are disabled; LLMClient retries instead. OPENAI_BASE_URL points it at
+    another server, e.g. a local stub.
+    """
+    http_client = http_client or create_http_client()
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=os.getenv("OPENAI_BASE_URL") or None,
+        http_client=http_client,
+        timeout=http_client.timeout,
+        max_retries=0
+    )
+
+
+class LatencyTracker:
+    """Recent call latencies, for percentile estimates."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """The q-th quantile (0..1) of recent latencies, or None without samples."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+
+class LLMClient:
+    """
+    Chat completion calls with retries and optional hedging.
+
+    Retryable failures (connection errors, timeouts, 408/409/429 and 5xx)
+    are retried with full-jitter exponential backoff. With hedging enabled,
+    a non-streaming call that has not answered within the recent p95
+    latency gets a second, identical request; the first answer wins and
+    the other request is cancelled.
+    """
+
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        max_retries: int = 2,
+        retry_base_delay: float = 0.25,
+        retry_max_delay: float = 4.0,
+        hedge: bool = False,
+        hedge_percentile: float = 0.95,
+        hedge_min_samples: int = 20,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        rng: Optional[random.Random] = None
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            client: OpenAI client to send requests with
+            max_retries: Retries after the first attempt
+            retry_base_delay: Backoff cap for the first retry, doubled per retry
+            retry_max_delay: Upper limit for the backoff cap
+            hedge: Send a hedged request for slow non-streaming calls
+            hedge_percentile: Latency quantile after which to hedge
+            hedge_min_samples: Latency samples needed before hedging starts
+            clock: Monotonic time source, overridable for tests
+            sleep: Sleep function, overridable for tests
+            rng: Random source for jitter, overridable for tests
+        """
+        self.client = client
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+
+        self.latencies = LatencyTracker()
+
+        self.requests = 0
+        self.retries = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    async def create(self, **kwargs) -> Any:
+        """
+        Create a chat completion, retrying retryable failures.
+
+        Takes the arguments of `chat.completions.create`. Streaming calls are
+        only retried until the stream is opened and are never hedged.
+        """
+        attempt = 0
+        while True:
+            try:
+                if kwargs.get("stream"):
+                    return await self._send(kwargs)
+                return await self._send_hedged(kwargs)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = self.backoff(attempt)
+                attempt += 1
+                self.retries += 1
+                logger.warning(f"LLM call failed ({e}); retry {attempt} in {delay:.2f}s")
+                await self._sleep(delay)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter backoff before retry number attempt + 1."""
+        cap = min(self.retry_max_delay, self.retry_base_delay * (2 ** attempt))
+        return self._rng.uniform(0, cap)
+
+    def hedge_delay(self) -> Optional[float]:
+        """How long to wait before hedging, or None if hedging is off or unwarmed."""
+        if not self.hedge or len(self.latencies) < self.hedge_min_samples:
+            return None
+        return self.latencies.percentile(self.hedge_percentile)
+
+    def stats(self) -> Dict[str, float]:
+        """Report request, retry and hedging counters and latency percentiles."""
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "p50_seconds": self.latencies.percentile(0.5) or 0.0,
+            "p95_seconds": self.latencies.percentile(0.95) or 0.0
+        }
+
+    async def close(self) -> None:
+        """Close the underlying connections."""
+        await self.client.close()
+
+    async def _send(self, kwargs: Dict) -> Any:
+        self.requests += 1
+        started = self._clock()
+        response = await self.client.chat.completions.create(**kwargs)
+        if not kwargs.get("stream"):
+            self.latencies.record(self._clock() - started)
+        return response
+
+    async def _send_hedged(self, kwargs: Dict) -> Any:
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._send(kwargs)
+
+        primary = asyncio.ensure_future(self._send(kwargs))
+        pending = {primary}
+        error: Optional[BaseException] = None
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                self.hedged += 1
+                hedge = asyncio.ensure_future(self._send(kwargs))
+                pending.add(hedge)
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = error or task.exception()
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
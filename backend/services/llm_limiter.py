@@ -0,0 +1,140 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Deque, Dict
+
+
+class LLMOverloadedError(Exception):
+    """Raised when an LLM call is not admitted because the service is saturated."""
+
+
+class ConcurrencyLimiter:
+    """
+    Caps the number of concurrent LLM calls.
+
+    Up to `max_concurrency` calls run at once. Further calls wait in a FIFO
+    queue of at most `max_queue` entries, for at most `queue_timeout_seconds`.
+    A call that finds the queue full, or whose wait runs past the deadline,
+    is rejected with LLMOverloadedError instead of piling onto an upstream
+    that is already rate limiting us.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 10,
+        max_queue: int = 50,
+        queue_timeout_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            max_concurrency: Maximum number of calls running at once
+            max_queue: Maximum number of calls waiting for a slot
+            queue_timeout_seconds: Longest a call may wait for a slot
+            clock: Monotonic time source, overridable for tests
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self._clock = clock
+
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.max_queue_depth = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block."""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self) -> None:
+        """
+        Wait for a slot.
+
+        Raises:
+            LLMOverloadedError: If the queue is full or the wait timed out
+        """
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            self._admit(0.0)
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise LLMOverloadedError("Too many pending requests to the language model")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        started = self._clock()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                # A slot was handed over just as the deadline passed
+                self._admit(self._clock() - started)
+                return
+            self._abandon(waiter)
+            self.rejected_timeout += 1
+            raise LLMOverloadedError("Timed out waiting for the language model") from None
+        except asyncio.CancelledError:
+            if waiter.done():
+                # Pass on the slot we were handed but will not use
+                self.release()
+            else:
+                self._abandon(waiter)
+            raise
+
+        self._admit(self._clock() - started)
+
+    def release(self) -> None:
+        """Release a slot, handing it straight to the next waiter if any."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, float]:
+        """Report concurrency, queue depth and wait time metrics."""
+        return {
+            "active": self.active,
+            "queue_depth": len(self._waiters),
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "avg_wait_seconds": self.wait_seconds_total / self.admitted if self.admitted else 0.0,
+            "max_wait_seconds": self.wait_seconds_max
+        }
+
+    def _admit(self, waited: float) -> None:
+        self.admitted += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
@@ -0,0 +1,409 @@
+import asyncio
+import math
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+import logging
+
+from .response_cache import ResponseCache
+from .text_language import LANGUAGE_SCRIPTS, SCRIPT_LANGUAGES, WORD_RE, message_languages, normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Memo value recording that no tier matched
+_NO_MATCH = ("", {})
+
+
+class MatchQuery:
+    """
+    A user message normalized once for all matching tiers.
+
+    Attributes:
+        text: The message as received
+        lower: NFKC-normalized, casefolded message without surrounding whitespace
+        words: Set of words in the normalized message
+        language: Language the client says the message is in, if any
+        languages: Knowledge partitions the message can match, from the
+                   scripts it is written in, or None for any partition
+        script_languages: Whether languages are those of the scripts alone,
+                          as for a message with no requested language
+    """
+
+    def __init__(self, text: str, language: Optional[str] = None):
+        self.text = text
+        self.lower = normalize_text(text).strip()
+        self.words = set(WORD_RE.findall(self.lower))
+        self.language = language
+        self.languages = message_languages(self.lower, language)
+        # A requested language only replaces the default language of its
+        # script, e.g. Marathi for Devanagari, if the message uses the script
+        self.script_languages = (
+            self.languages is None
+            or language not in self.languages
+            or SCRIPT_LANGUAGES.get(LANGUAGE_SCRIPTS.get(language)) == language
+        )
+
+
+class MatchingPipeline:
+    """
+    Runs a message through the curated answer tiers in priority order.
+
+    Each tier is a function taking a MatchQuery and returning a match dict
+    or None; the first tier that matches wins. Time spent in each tier is
+    recorded so slow tiers show up in the metrics.
+
+    Messages that are verbatim copies of a stored question (e.g. a clicked
+    suggestion) are answered from an exact-question map before any tier
+    runs. The map holds, for every question a tier stores, the result the
+    full tier scan gives for it, so tier priority is kept. It is built by
+    `rebuild`, or updated for a few changed questions by `patch`, off the
+    request path, and swapped in whole; until the map for the current
+    knowledge version is in place, messages go through the tiers. The map
+    holds results for the default language of each script, so messages
+    whose requested language replaces it (e.g. Marathi for Devanagari) go
+    through the tiers too.
+
+    Other messages are memoized: the outcome of the tier scan, including
+    "no match", is kept in a bounded LRU tagged with the knowledge version,
+    so repeated messages skip matching until the knowledge changes. The tag
+    also holds the version the map was built for: the map is swapped in
+    last, after the other indexes derived from the knowledge, so outcomes
+    found while those lagged behind are not served once they caught up.
+
+    Tiers report the languages of their entries, which they keep in
+    per-language partitions; a tier with no entries in the languages of a
+    message's script is skipped, so e.g. a message in Tamil script never
+    scans an English-only tier.
+
+    With a spelling corrector, a message no tier matches is scanned once
+    more with its misspelled words corrected; such matches carry the
+    corrected text under 'corrected_message'.
+
+    Tiers that block on I/O, such as SQLite queries, are scanned on a
+    worker thread by `match_in_thread`; the map and the memo are still
+    used on the calling thread.
+    """
+
+    EXACT = "exact"
+    MEMO = "memo"
+
+    def __init__(
+        self,
+        version: Optional[Callable[[], Hashable]] = None,
+        memo_size: int = 10000,
+        corrector: Optional[Callable[[str], str]] = None
+    ):
+        """
+        Initialize an empty pipeline.
+
+        Args:
+            version: Returns the current knowledge version; without it the
+                     exact-question map and the memo are not used
+            memo_size: Maximum number of memoized messages; 0 disables the memo
+            corrector: Returns normalized text with misspelled words corrected
+        """
+        self._version = version
+        self._corrector = corrector
+        self._memo = ResponseCache(max_entries=memo_size, ttl_seconds=math.inf)
+        self._tiers: List[Tuple[str, Callable[[MatchQuery], Optional[Dict]]]] = []
+        self._question_sources: List[Callable[[], Iterable[str]]] = []
+        self._language_sources: Dict[str, Callable[[], Iterable[str]]] = {}
+
+        # (knowledge version, normalized question -> (tier name, match dict)),
+        # replaced whole
+        self._built: Tuple[Hashable, Dict[str, Tuple[str, Dict]]] = (None, {})
+
+        # Held while building; the structures below are only used by builds
+        self._build_lock = threading.Lock()
+        # normalized question -> number of times the tiers store it
+        self._question_counts: Counter = Counter()
+        # word -> normalized questions containing it
+        self._word_questions: Dict[str, Set[str]] = {}
+
+        # tier name -> {"calls", "matches", "total_seconds", "max_seconds"},
+        # updated under the lock as scans may run on worker threads
+        self._timings: Dict[str, Dict[str, float]] = {}
+        self._timings_lock = threading.Lock()
+        self._add_timing(self.EXACT)
+        self._add_timing(self.MEMO)
+
+    @property
+    def tier_names(self) -> List[str]:
+        return [name for name, _ in self._tiers]
+
+    def add_tier(
+        self,
+        name: str,
+        matcher: Callable[[MatchQuery], Optional[Dict]],
+        questions: Optional[Callable[[], Iterable[str]]] = None,
+        languages: Optional[Callable[[], Iterable[str]]] = None
+    ) -> None:
+        """
+        Append a tier; tiers added earlier take priority.
+
+        Args:
+            name: Tier name, used in results and timings
+            matcher: Function returning a match dict for the query, or None
+            questions: Returns the questions the tier stores, for the exact-question map
+            languages: Returns the languages of the tier's entries, cheaply
+                       as it is called for every message; without it the
+                       tier is tried for messages in any language
+        """
+        self._tiers.append((name, matcher))
+        if questions is not None:
+            self._question_sources.append(questions)
+        if languages is not None:
+            self._language_sources[name] = languages
+        self._add_timing(name)
+        self._built = (None, {})
+        self._memo.clear()
+
+    def match(self, query: MatchQuery) -> Optional[Tuple[str, Dict]]:
+        """
+        Find the highest-priority tier matching the query.
+
+        Returns:
+            Tuple of (tier name, match dict), or None if no tier matched
+        """
+        found, result, memo = self._lookup(query)
+        if not found:
+            result = self._scan_all(query)
+            self._remember(memo, result)
+        return result
+
+    async def match_in_thread(self, query: MatchQuery) -> Optional[Tuple[str, Dict]]:
+        """
+        Like match, but scans the tiers on a worker thread so tiers that
+        block on I/O do not hold up the event loop. See match.
+        """
+        found, result, memo = self._lookup(query)
+        if not found:
+            result = await asyncio.to_thread(self._scan_all, query)
+            self._remember(memo, result)
+        return result
+
+    def _lookup(self, query: MatchQuery) -> Tuple[bool, Optional[Tuple[str, Dict]], Optional[Tuple]]:
+        """
+        Look the query up in the exact-question map and the memo.
+
+        Returns:
+            (whether it was found, the result if so, the memo key and version
+            to store the scanned result under, or None without a version)
+        """
+        if self._version is None:
+            return False, None, None
+        version = self._version()
+        built_version, exact = self._built
+        if built_version == version and query.script_languages:
+            started = time.perf_counter()
+            result = exact.get(query.lower)
+            self._record(self.EXACT, time.perf_counter() - started, result is not None)
+            if result is not None:
+                return True, result, None
+
+        memo_key = (query.lower, query.languages)
+        memo_version = (version, built_version)
+        if self._memo.enabled:
+            started = time.perf_counter()
+            result = self._memo.get(memo_key, memo_version)
+            self._record(self.MEMO, time.perf_counter() - started, result is not None)
+            if result is not None:
+                return True, None if result is _NO_MATCH else result, None
+        return False, None, (memo_key, memo_version)
+
+    def _remember(self, memo: Optional[Tuple], result: Optional[Tuple[str, Dict]]) -> None:
+        """Memoize a scanned result under the key and version _lookup gave."""
+        if memo is not None:
+            memo_key, memo_version = memo
+            self._memo.put(memo_key, memo_version, result or _NO_MATCH)
+
+    def _scan_all(self, query: MatchQuery) -> Optional[Tuple[str, Dict]]:
+        """Scan the tiers, then once more with misspelled words corrected."""
+        result = self._scan(query)
+        if result is None and self._corrector is not None:
+            result = self._scan_corrected(query)
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Report calls, matches and average/maximum time per tier."""
+        with self._timings_lock:
+            stats = {
+                name: {
+                    "calls": timing["calls"],
+                    "matches": timing["matches"],
+                    "avg_ms": timing["total_seconds"] * 1000 / timing["calls"] if timing["calls"] else 0.0,
+                    "max_ms": timing["max_seconds"] * 1000
+                }
+                for name, timing in self._timings.items()
+            }
+        stats[self.EXACT]["entries"] = len(self._built[1])
+        stats[self.MEMO]["entries"] = self._memo.stats()["entries"]
+        return stats
+
+    def is_built(self, version: Hashable) -> bool:
+        """Whether the exact-question map is up to date with version."""
+        return self._built[0] == version
+
+    def rebuild(self, version: Hashable) -> None:
+        """
+        Build the exact-question map from scratch and swap it in. Runs every stored question through the tiers, so
+        call it off the event loop.
+
+        Args:
+            version: Knowledge version read before reading the tiers' data
+        """
+        with self._build_lock:
+            counts: Counter = Counter()
+            for questions in self._question_sources:
+                counts.update(MatchQuery(question).lower for question in questions())
+
+            word_questions: Dict[str, Set[str]] = {}
+            exact: Dict[str, Tuple[str, Dict]] = {}
+            for question_lower in counts:
+                query = MatchQuery(question_lower)
+                for word in query.words:
+                    word_questions.setdefault(word, set()).add(question_lower)
+                result = self._scan_tiers(query, 0)
+                if result is not None:
+                    exact[question_lower] = result
+
+            self._question_counts = counts
+            self._word_questions = word_questions
+            # Swap in the complete map in one step
+            self._built = (version, exact)
+            logger.debug(f"Rebuilt exact-question map with {len(exact)} questions")
+
+    def patch(
+        self,
+        version: Hashable,
+        tier: str,
+        removed: Iterable[str],
+        added: Iterable[str]
+    ) -> bool:
+        """
+        Update the exact-question map for questions one tier removed and
+        added (an edited question is both), and swap it in.
+
+        Only stored questions sharing a word with a changed question can
+        have their result changed, so only those are matched again, and
+        only from the changed tier on; results from higher-priority tiers
+        are kept.
+
+        Args:
+            version: Knowledge version read before reading the tier's changes
+            tier: Name of the changed tier
+            removed: Questions the tier no longer stores
+            added: Questions the tier stores since
+
+        Returns:
+            False if there is no map to patch yet; call rebuild instead
+        """
+        with self._build_lock:
+            built_version, built_exact = self._built
+            if built_version is None:
+                return False
+            positions = {name: position for position, name in enumerate(self.tier_names)}
+            position = positions[tier]
+
+            changed: Set[str] = set()
+            for question in removed:
+                question_lower = MatchQuery(question).lower
+                self._question_counts[question_lower] -= 1
+                changed.add(question_lower)
+            for question in added:
+                question_lower = MatchQuery(question).lower
+                self._question_counts[question_lower] += 1
+                changed.add(question_lower)
+
+            affected = set(changed)
+            for question_lower in changed:
+                for word in MatchQuery(question_lower).words:
+                    affected.update(self._word_questions.get(word, ()))
+
+            exact = dict(built_exact)
+            for question_lower in affected:
+                query = MatchQuery(question_lower)
+                if self._question_counts[question_lower] <= 0:
+                    # No tier stores the question any more
+                    del self._question_counts[question_lower]
+                    exact.pop(question_lower, None)
+                    for word in query.words:
+                        questions = self._word_questions.get(word)
+                        if questions is not None:
+                            questions.discard(question_lower)
+                            if not questions:
+                                del self._word_questions[word]
+                    continue
+                for word in query.words:
+                    self._word_questions.setdefault(word, set()).add(question_lower)
+
+                previous = exact.get(question_lower)
+                if previous is None:
+                    # New, or matched by no tier before
+                    result = self._scan_tiers(query, 0)
+                else:
+                    previous_position = positions[previous[0]]
+                    if previous_position < position:
+                        continue
+                    result = self._scan_tiers(query, position, position + 1)
+                    if result is None:
+                        if previous_position > position:
+                            continue
+                        result = self._scan_tiers(query, position + 1)
+                if result is None:
+                    exact.pop(question_lower, None)
+                else:
+                    exact[question_lower] = result
+
+            self._built = (version, exact)
+            logger.debug(f"Patched exact-question map for {len(affected)} of {len(exact)} questions")
+            return True
+
+    def _scan_tiers(self, query: MatchQuery, start: int, stop: Optional[int] = None) -> Optional[Tuple[str, Dict]]:
+        """First match among tiers[start:stop], without timings or language checks."""
+        for name, matcher in self._tiers[start:stop]:
+            match = matcher(query)
+            if match:
+                return name, match
+        return None
+
+    def _scan(self, query: MatchQuery) -> Optional[Tuple[str, Dict]]:
+        """Run the tiers in priority order until one matches."""
+        for name, matcher in self._tiers:
+            languages = self._language_sources.get(name)
+            if query.languages is not None and languages is not None and query.languages.isdisjoint(languages()):
+                continue
+            started = time.perf_counter()
+            match = matcher(query)
+            elapsed = time.perf_counter() - started
+            self._record(name, elapsed, bool(match))
+
+            if match:
+                logger.debug(f"Matched tier {name} in {elapsed * 1000:.2f} ms")
+                return name, match
+        return None
+
+    def _scan_corrected(self, query: MatchQuery) -> Optional[Tuple[str, Dict]]:
+        """Scan the tiers again with misspelled words corrected."""
+        corrected = self._corrector(query.lower)
+        if corrected == query.lower:
+            return None
+        result = self._scan(MatchQuery(corrected, query.language))
+        if result is None:
+            return None
+        name, match = result
+        logger.debug(f"Matched tier {name} after correcting {query.lower!r} to {corrected!r}")
+        return name, dict(match, corrected_message=corrected)
+
+    def _add_timing(self, name: str) -> None:
+        self._timings[name] = {"calls": 0, "matches": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+
+    def _record(self, name: str, elapsed: float, matched: bool) -> None:
+        with self._timings_lock:
+            timing = self._timings[name]
+            timing["calls"] += 1
+            timing["total_seconds"] += elapsed
+            timing["max_seconds"] = max(timing["max_seconds"], elapsed)
+            if matched:
+                timing["matches"] += 1
@@ -1,13 +1,58 @@
 import json
 import os
-from typing import Optional, Dict, List
+from collections import Counter
+from typing import Optional, Dict, List, Set, Tuple
 from pathlib import Path
 
+from .keyword_matcher import KeywordAutomaton
+from .matching_pipeline import MatchQuery
+from .sqlite_qa_store import SQLitePredefinedQAStore
+from .text_language import entry_language, keyword_language, normalize_text
+from .tfidf_ranker import TfidfRanker, numpy_available
+
+
+class _QAPartition:
+    """
+    Match indexes over the entries of one language: exact questions,
+    keyword postings with their automaton, and the TF-IDF ranker when
+    enabled. Entry ids are positions in the whole file. An entry whose
+    keywords are written in several scripts is in the partition of each.
+    """
+    
+    def __init__(self):
+        self.entry_ids: List[int] = []
+        self.tfidf_ranker: Optional[TfidfRanker] = None
+        self.exact_questions: Dict[str, int] = {}
+        self.keyword_entries: List[List[int]] = []
+        self.always_matched: Dict[int, int] = {}
+        self.keyword_automaton = KeywordAutomaton([])
+
+
+class _QAIndex:
+    """
+    Immutable snapshot of the predefined Q&A entries and their match
+    indexes, with one partition per language.
+    """
+    
+    def __init__(self, qa_data: List[Dict], version: int):
+        self.qa_data = qa_data
+        self.version = version
+        self.keyword_counts: List[int] = []
+        self.partitions: Dict[str, _QAPartition] = {}
+    
+    @property
+    def languages(self) -> Set[str]:
+        return set(self.partitions)
+
 
 class QAService:
     """
     Service for handling predefined Q&A pairs.
     Provides fuzzy matching for user questions against a curated set of FAQs.
+    
+    The entries and their indexes live in one immutable snapshot; a reload
+    builds a complete new snapshot and swaps it in with a single assignment,
+    so lookups running meanwhile never see a half-built index.
     """
     
     # Scoring algorithm constants
@@ -15,13 +60,26 @@ class QAService:
     MAX_KEYWORD_SCORE = 0.6  # Maximum additional score from keyword matching
     KEYWORD_MATCH_CEILING = 0.9  # Maximum total score from keyword matching
     
-    def __init__(self, qa_file_path: Optional[str] = None):
+    def __init__(
+        self,
+        qa_file_path: Optional[str] = None,
+        backend: Optional[str] = None,
+        ranker: Optional[str] = None
+    ):
         """
         Initialize the QA service with predefined questions and answers.
         
         Args:
             qa_file_path: Path to the JSON file containing Q&A pairs.
                          Defaults to backend/data/predefined_qa.json
+            backend: "json" matches against in-memory indexes, "sqlite"
+                    mirrors the file into a shared SQLite database and
+                    matches with indexed queries. Defaults to the QA_BACKEND
+                    env var, then "json"
+            ranker: "keyword" scores entries by matched keyword ratio,
+                   "tfidf" ranks questions and keywords by TF-IDF cosine
+                   similarity (requires numpy). Defaults to the QA_RANKER
+                   env var, then "keyword"
         """
         if qa_file_path is None:
             # Default path relative to the backend directory
@@ -29,93 +87,254 @@ class QAService:
             qa_file_path = backend_dir / "data" / "predefined_qa.json"
         
         self.qa_file_path = qa_file_path
-        self.qa_data = self._load_qa_data()
+        
+        self.backend = backend or os.getenv("QA_BACKEND", "json")
+        if self.backend == "sqlite":
+            self._store: Optional[SQLitePredefinedQAStore] = SQLitePredefinedQAStore()
+        elif self.backend == "json":
+            self._store = None
+        else:
+            raise ValueError(f"Unknown Q&A backend: {self.backend}")
+        
+        self.ranker = ranker or os.getenv("QA_RANKER", "keyword")
+        if self.ranker not in ("keyword", "tfidf"):
+            raise ValueError(f"Unknown Q&A ranker: {self.ranker}")
+        if self.ranker == "tfidf" and not numpy_available():
+            print("Warning: numpy is not installed, falling back to keyword ranking")
+            self.ranker = "keyword"
+        # Minimum cosine similarity for a TF-IDF match
+        self.ranker_threshold = float(os.getenv("QA_RANKER_THRESHOLD", "0.3"))
+        
+        self._index = self._build_index(self._load_qa_data() or [], 1)
     
-    def _load_qa_data(self) -> List[Dict]:
+    @property
+    def qa_data(self) -> List[Dict]:
+        return self._index.qa_data
+    
+    @property
+    def version(self) -> int:
+        """Bumped whenever the Q&A data is (re)loaded."""
+        return self._index.version
+    
+    def _load_qa_data(self) -> Optional[List[Dict]]:
         """
         Load Q&A data from JSON file.
         
         Returns:
-            List of Q&A dictionaries
+            List of Q&A dictionaries, or None if the file is missing or malformed
         """
         try:
             with open(self.qa_file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-                return data.get('questions', [])
+            questions = data.get('questions', [])
+            if not isinstance(questions, list):
+                raise ValueError("'questions' must be a list")
+            return questions
         except FileNotFoundError:
             print(f"Warning: Q&A file not found at {self.qa_file_path}")
-            return []
-        except json.JSONDecodeError as e:
+            return None
+        except (json.JSONDecodeError, ValueError, AttributeError) as e:
             print(f"Warning: Error parsing Q&A file: {e}")
-            return []
+            return None
+    
+    def _build_index(self, qa_data: List[Dict], version: int) -> _QAIndex:
+        """
+        Build a snapshot with an inverted keyword index per language over
+        qa_data, each keyword indexed under the language of its own script.
+        Questions and keywords are normalized once here so that lookups only
+        score entries sharing at least one keyword in the message's
+        languages with it.
+        With the SQLite backend the entries are synced into the database instead.
+        The entries' languages and the TF-IDF rankers, when enabled, are
+        built here for either backend.
+        """
+        index = _QAIndex(qa_data, version)
+        # entry id -> (language of its question, language of each of its keywords)
+        entry_languages: List[Tuple[str, List[str]]] = []
+        for entry_id, qa_entry in enumerate(qa_data):
+            language = entry_language(qa_entry['question'], qa_entry.get('language'))
+            keywords = qa_entry.get('keywords', [])
+            languages = [keyword_language(keyword, language) for keyword in keywords]
+            entry_languages.append((language, languages))
+            # An entry belongs to its question's partition and to the
+            # partition of every script its keywords are written in
+            for partition_language in dict.fromkeys([language] + languages):
+                index.partitions.setdefault(partition_language, _QAPartition()).entry_ids.append(entry_id)
+            index.keyword_counts.append(len(keywords))
+        
+        if self.ranker == "tfidf":
+            for partition in index.partitions.values():
+                partition.tfidf_ranker = TfidfRanker([
+                    " ".join([qa_data[entry_id]['question']] + qa_data[entry_id].get('keywords', []))
+                    for entry_id in partition.entry_ids
+                ])
+        
+        if self._store is not None:
+            try:
+                stat = os.stat(self.qa_file_path)
+                source_stamp = f"{self.qa_file_path}:{stat.st_mtime_ns}:{stat.st_size}"
+            except OSError:
+                source_stamp = f"{self.qa_file_path}:missing"
+            self._store.sync(qa_data, source_stamp)
+            return index
+        
+        # language -> keyword -> keyword id in that language's partition
+        keyword_ids: Dict[str, Dict[str, int]] = {language: {} for language in index.partitions}
+        for entry_id, qa_entry in enumerate(qa_data):
+            language, languages = entry_languages[entry_id]
+            index.partitions[language].exact_questions.setdefault(
+                normalize_text(qa_entry['question']).strip(), entry_id
+            )
+            for keyword, keyword_lang in zip(qa_entry.get('keywords', []), languages):
+                partition = index.partitions[keyword_lang]
+                keyword_lower = normalize_text(keyword)
+                if not keyword_lower:
+                    # An empty keyword is a substring of every message
+                    partition.always_matched[entry_id] = partition.always_matched.get(entry_id, 0) + 1
+                    continue
+                partition_ids = keyword_ids[keyword_lang]
+                if keyword_lower not in partition_ids:
+                    partition_ids[keyword_lower] = len(partition.keyword_entries)
+                    partition.keyword_entries.append([])
+                # Duplicate keywords within an entry are kept so they count twice, as before
+                partition.keyword_entries[partition_ids[keyword_lower]].append(entry_id)
+        for language, partition in index.partitions.items():
+            partition.keyword_automaton = KeywordAutomaton(list(keyword_ids[language]))
+        return index
     
-    def _calculate_similarity_score(self, user_message: str, qa_entry: Dict) -> float:
+    def _partitions(self, index: _QAIndex, query: MatchQuery) -> List[_QAPartition]:
+        """The partitions of the languages the message can match."""
+        if query.languages is None:
+            return list(index.partitions.values())
+        return [index.partitions[language] for language in query.languages if language in index.partitions]
+    
+    def _keyword_score(self, matched_keywords: int, total_keywords: int) -> float:
         """
-        Calculate a similarity score between user message and a Q&A entry.
-        Uses keyword matching for simplicity and performance.
+        Score an entry from its number of matched keywords.
         
         Args:
-            user_message: The user's question (normalized to lowercase)
-            qa_entry: Dictionary containing question, answer, and keywords
+            matched_keywords: Number of the entry's keywords found in the message
+            total_keywords: Total number of keywords on the entry
         
         Returns:
-            Similarity score (0.0 to 1.0)
+            Similarity score (0.0 to KEYWORD_MATCH_CEILING)
         """
-        user_message_lower = user_message.lower().strip()
-        question_lower = qa_entry['question'].lower().strip()
-        score = 0.0
+        if matched_keywords > 0 and total_keywords > 0:
+            keyword_ratio = matched_keywords / total_keywords
+            return min(
+                self.KEYWORD_MATCH_CEILING,
+                self.BASE_SCORE + (keyword_ratio * self.MAX_KEYWORD_SCORE)
+            )
+        return 0.0
+    
+    def _find_exact(self, index: _QAIndex, query: MatchQuery) -> Optional[Dict]:
+        """First entry in file order whose normalized question equals the message."""
+        if self._store is not None:
+            return self._store.find_exact(query.lower, query.languages)
         
-        # Check for exact question match (highest score)
-        # Use equality check instead of substring to avoid partial matches
-        if user_message_lower == question_lower:
-            return 1.0
+        exact_ids = [
+            partition.exact_questions[query.lower]
+            for partition in self._partitions(index, query)
+            if query.lower in partition.exact_questions
+        ]
+        return index.qa_data[min(exact_ids)] if exact_ids else None
+    
+    def _keyword_candidates(self, index: _QAIndex, query: MatchQuery) -> List[Tuple[Dict, int, int]]:
+        """
+        Find entries sharing at least one keyword with the message.
         
-        # Check keyword matches
-        keywords = qa_entry.get('keywords', [])
-        matched_keywords = 0
+        Args:
+            index: Snapshot to search
+            query: The normalized user message
         
-        for keyword in keywords:
-            if keyword.lower() in user_message_lower:
-                matched_keywords += 1
+        Returns:
+            (entry, matched keyword count, total keyword count) tuples in file order
+        """
+        if self._store is not None:
+            return self._store.keyword_matches(query.lower, query.languages)
         
-        # Calculate score based on keyword matches
-        if matched_keywords > 0 and len(keywords) > 0:
-            keyword_ratio = matched_keywords / len(keywords)
-            score = min(
-                self.KEYWORD_MATCH_CEILING,
-                self.BASE_SCORE + (keyword_ratio * self.MAX_KEYWORD_SCORE)
-            )
+        matched_counts: Counter = Counter()
+        for partition in self._partitions(index, query):
+            matched_counts.update(partition.always_matched)
+            for keyword_id in partition.keyword_automaton.search(query.lower):
+                matched_counts.update(partition.keyword_entries[keyword_id])
         
-        return score
+        return [
+            (index.qa_data[entry_id], matched_counts[entry_id], index.keyword_counts[entry_id])
+            for entry_id in sorted(matched_counts)
+        ]
+    
+    def _rank(self, index: _QAIndex, query: MatchQuery) -> Optional[Tuple[int, float]]:
+        """Entry id and cosine similarity of the best TF-IDF match, ties going to the first entry."""
+        best: Optional[Tuple[int, float]] = None
+        for partition in self._partitions(index, query):
+            for local_id, score in partition.tfidf_ranker.top_k(query.lower, 1):
+                entry_id = partition.entry_ids[local_id]
+                if best is None or score > best[1] or (score == best[1] and entry_id < best[0]):
+                    best = (entry_id, score)
+        return best
     
-    def find_answer(self, user_message: str, threshold: float = 0.3) -> Optional[Dict]:
+    def find_answer(
+        self,
+        user_message: str,
+        threshold: float = 0.3,
+        ranker_threshold: Optional[float] = None
+    ) -> Optional[Dict]:
         """
         Find a predefined answer for the user's question using fuzzy matching.
         
         Args:
             user_message: The user's question
             threshold: Minimum similarity score to consider a match (0.0 to 1.0)
-                      Default is 0.3 to allow single keyword matches
+                      Default is 0.3 to allow single keyword matches.
+            ranker_threshold: Minimum cosine similarity for the TF-IDF ranker.
+                             Defaults to self.ranker_threshold
         
         Returns:
             Dictionary with 'answer', 'question', and 'confidence' if match found,
             None otherwise
         """
-        if not user_message or not self.qa_data:
+        return self.match(MatchQuery(user_message), threshold, ranker_threshold)
+    
+    def match(
+        self,
+        query: MatchQuery,
+        threshold: float = 0.3,
+        ranker_threshold: Optional[float] = None
+    ) -> Optional[Dict]:
+        """
+        Find a predefined answer for an already normalized message.
+        See find_answer.
+        """
+        index = self._index
+        if not query.text or not index.qa_data:
             return None
         
         best_match = None
         best_score = 0.0
         
-        for qa_entry in self.qa_data:
-            score = self._calculate_similarity_score(user_message, qa_entry)
-            
-            if score > best_score:
-                best_score = score
-                best_match = qa_entry
+        # An exact question match outscores any keyword match
+        exact_match = self._find_exact(index, query)
+        if exact_match is not None:
+            best_match = exact_match
+            best_score = 1.0
+        elif self.ranker == "tfidf":
+            ranked = self._rank(index, query)
+            if ranked is not None:
+                entry_id, best_score = ranked
+                best_match = index.qa_data[entry_id]
+            threshold = self.ranker_threshold if ranker_threshold is None else ranker_threshold
+        else:
+            # Candidates come in file order so ties keep going to the first entry
+            for qa_entry, matched_keywords, total_keywords in self._keyword_candidates(index, query):
+                score = self._keyword_score(matched_keywords, total_keywords)
+                
+                if score > best_score:
+                    best_score = score
+                    best_match = qa_entry
         
         # Only return a match if it meets the threshold
-        if best_score >= threshold:
+        if best_match is not None and best_score >= threshold:
             return {
                 'answer': best_match['answer'],
                 'question': best_match['question'],
@@ -127,17 +346,25 @@ class QAService:
     def reload_qa_data(self) -> bool:
         """
         Reload Q&A data from the file.
-        Useful for updating Q&A without restarting the server.
+        Useful for updating Q&A without restarting the server. The new
+        indexes are built before being swapped in; if the file is missing or
+        malformed the current data is kept.
         
         Returns:
             True if reload was successful, False otherwise
         """
         try:
-            self.qa_data = self._load_qa_data()
-            return True
+            qa_data = self._load_qa_data()
+            if qa_data is None:
+                return False
+            index = self._build_index(qa_data, self.version + 1)
         except Exception as e:
             print(f"Error reloading Q&A data: {e}")
             return False
+        
+        # Swap in the new entries and indexes together
+        self._index = index
+        return True
     
     def get_all_questions(self) -> List[str]:
         """
@@ -147,3 +374,12 @@ class QAService:
             List of question strings
         """
         return [qa['question'] for qa in self.qa_data]
+    
+    def get_languages(self) -> Set[str]:
+        """
+        Get the languages of the predefined questions.
+        
+        Returns:
+            Set of language codes
+        """
+        return self._index.languages
@@ -0,0 +1,121 @@
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Punctuation that does not change the meaning of a question
+_EDGE_PUNCTUATION = " \t\n?!.,;:"
+
+
+def normalize_message(message: str) -> str:
+    """
+    Normalize a message for cache lookups, so that questions differing
+    only in case, spacing or trailing punctuation share an entry.
+    """
+    return _WHITESPACE_RE.sub(' ', message.casefold()).strip(_EDGE_PUNCTUATION)
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache with per-entry TTL, tied to a knowledge version.
+
+    Every lookup passes the current knowledge version; when it differs from
+    the version the cached entries were built against, the whole cache is
+    dropped, so answers are never served across a data change.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 3600,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_entries: Maximum number of cached entries; 0 disables the cache
+            ttl_seconds: How long an entry may be served after it was stored
+            clock: Monotonic time source, overridable for tests
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._version: Hashable = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: Hashable, version: Hashable) -> Optional[Any]:
+        """
+        Look up a cached value.
+
+        Args:
+            key: Cache key
+            version: Current knowledge version
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        self._check_version(version)
+
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self._clock():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, version: Hashable, value: Any) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            version: Knowledge version the value was computed against
+            value: Value to cache
+        """
+        if not self.enabled or version != self._version:
+            # Computed against data that has changed since; never cache it
+            return
+
+        self._entries[key] = (self._clock() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Report the cache's size and counters."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+    def _check_version(self, version: Hashable) -> None:
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
@@ -0,0 +1,309 @@
+import math
+import threading
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .matching_pipeline import MatchQuery
+from .text_language import WORD_RE, normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Minimum cosine similarity for a match. Character n-grams cannot tell
+# "CFO" from "CEO": questions one or two letters apart score up to about
+# 0.8, so the threshold only lets near-verbatim paraphrases through
+# (e.g. "What service do you offer?" at 0.87)
+DEFAULT_THRESHOLD = 0.85
+
+# Character n-gram sizes hashed into each embedding
+NGRAM_SIZES = (3, 4, 5)
+
+# Share of a partition's vectors that must carry over from the previous
+# index for its k-means centroids to be reused
+CENTROID_REUSE_FRACTION = 0.9
+
+
+def numpy_available() -> bool:
+    """Whether the optional NumPy dependency of the semantic tier is installed."""
+    return np is not None
+
+
+def _ngram_features(text: str, dim: int) -> Tuple[List[int], List[float]]:
+    """Hashed buckets and signs of the character n-grams of normalized text."""
+    padded = " " + " ".join(WORD_RE.findall(normalize_text(text))) + " "
+    buckets: List[int] = []
+    signs: List[float] = []
+    for n in NGRAM_SIZES:
+        for start in range(len(padded) - n + 1):
+            # crc32 is stable across processes, unlike hash()
+            h = zlib.crc32(padded[start:start + n].encode('utf-8'))
+            buckets.append(h % dim)
+            signs.append(1.0 if h & 0x80000000 else -1.0)
+    return buckets, signs
+
+
+def embed_texts(texts: List[str], dim: int = 512) -> "np.ndarray":
+    """
+    Embed texts as L2-normalized hashed character n-gram vectors.
+
+    Args:
+        texts: Texts to embed
+        dim: Embedding size
+
+    Returns:
+        Contiguous float32 array of shape (len(texts), dim)
+    """
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        buckets, signs = _ngram_features(text, dim)
+        if buckets:
+            vectors[row] = np.bincount(buckets, weights=signs, minlength=dim)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    vectors /= norms
+    return vectors
+
+
+class ANNIndex:
+    """
+    Approximate nearest-neighbour index over unit vectors (inner product).
+
+    Small collections are searched exhaustively with one matrix-vector
+    product. Larger ones use an inverted-file index: vectors are clustered
+    with spherical k-means, stored contiguously grouped by cluster, and a
+    query only scans the `n_probe` clusters whose centroids are closest.
+    """
+
+    def __init__(
+        self,
+        vectors: "np.ndarray",
+        exact_below: int = 2048,
+        n_probe: int = 16,
+        centroids: Optional["np.ndarray"] = None
+    ):
+        """
+        Build the index.
+
+        Args:
+            vectors: float32 array of unit vectors, one row per item
+            exact_below: Collections smaller than this are searched exhaustively
+            n_probe: Clusters scanned per query
+            centroids: Cluster centroids to reuse (e.g. from the previous
+                       index over mostly the same vectors) instead of
+                       running k-means
+        """
+        self.size = len(vectors)
+        self.n_probe = n_probe
+        self._centroids: Optional["np.ndarray"] = None
+
+        if self.size < exact_below:
+            self._vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+            self._ids = np.arange(self.size)
+            return
+
+        n_lists = max(1, int(math.sqrt(self.size)))
+        if centroids is None:
+            centroids = self._kmeans(vectors, n_lists)
+        n_lists = len(centroids)
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+
+        order = np.argsort(assignments, kind='stable')
+        self._vectors = np.ascontiguousarray(vectors[order], dtype=np.float32)
+        self._ids = order
+        self._offsets = np.searchsorted(assignments[order], np.arange(n_lists + 1))
+        self._centroids = centroids
+
+    @property
+    def centroids(self) -> Optional["np.ndarray"]:
+        """Cluster centroids, or None for an exhaustive index."""
+        return self._centroids
+
+    def item_vectors(self) -> "np.ndarray":
+        """The indexed vectors, one row per item in item order."""
+        vectors = np.empty_like(self._vectors)
+        vectors[self._ids] = self._vectors
+        return vectors
+
+    @staticmethod
+    def _kmeans(vectors: "np.ndarray", n_lists: int, iterations: int = 8) -> "np.ndarray":
+        """Spherical k-means on a sample of the vectors; deterministic."""
+        rng = np.random.default_rng(0)
+        sample_size = min(len(vectors), n_lists * 40)
+        sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Clusters that lost all members keep their previous centroid
+            filled = norms[:, 0] > 0
+            centroids[filled] = sums[filled] / norms[filled]
+        return centroids
+
+    def search(self, vector: "np.ndarray", k: int = 1) -> List[Tuple[int, float]]:
+        """
+        Find the items most similar to a unit vector.
+
+        Returns:
+            (item index, cosine similarity) pairs, most similar first
+        """
+        if not self.size:
+            return []
+
+        if self._centroids is None:
+            similarities = self._vectors @ vector
+            ids = self._ids
+        else:
+            centroid_similarities = self._centroids @ vector
+            n_probe = min(self.n_probe, len(self._centroids))
+            probed = np.argpartition(-centroid_similarities, n_probe - 1)[:n_probe]
+            ranges = [(self._offsets[c], self._offsets[c + 1]) for c in probed]
+            similarities = np.concatenate([self._vectors[start:end] @ vector for start, end in ranges])
+            ids = np.concatenate([self._ids[start:end] for start, end in ranges])
+
+        if len(similarities) > k:
+            top = np.argpartition(-similarities, k - 1)[:k]
+        else:
+            top = np.arange(len(similarities))
+        top = top[np.argsort(-similarities[top], kind='stable')]
+        return [(int(ids[i]), float(similarities[i])) for i in top]
+
+
+class _Partition:
+    """The ANN index over one language's questions, with their texts and match dicts."""
+
+    def __init__(self, index: ANNIndex, texts: List[str], matches: List[Dict]):
+        self.index = index
+        self.texts = texts
+        self.matches = matches
+
+
+class SemanticMatcher:
+    """
+    Matching tier that catches paraphrases of curated questions.
+
+    Every curated question is embedded as a hashed character n-gram vector
+    (fully local: no network, no model files) and indexed for approximate
+    nearest-neighbour search, with one index per language. A message is
+    searched only in the indexes of its languages and matches the most
+    similar question if their cosine similarity reaches `threshold`.
+
+    The indexes are built by `rebuild`, off the request path, and swapped
+    in whole; messages are matched against the previous indexes until
+    then. A rebuild only embeds questions whose text is new, and keeps the
+    k-means clustering of an index whose vectors mostly carried over.
+    """
+
+    def __init__(
+        self,
+        documents: Callable[[], List[Tuple[str, Dict, str]]],
+        threshold: float = DEFAULT_THRESHOLD,
+        dim: int = 512
+    ):
+        """
+        Initialize the tier; it matches nothing until the first rebuild.
+
+        Args:
+            documents: Returns (question text, match dict, language) triples
+                       to index; the match dict of the closest question is returned
+            threshold: Minimum cosine similarity for a match
+            dim: Embedding size
+        """
+        if np is None:
+            raise ImportError("SemanticMatcher requires numpy")
+
+        self._documents = documents
+        self.threshold = threshold
+        self.dim = dim
+
+        # language -> partition, replaced whole
+        self._partitions: Dict[str, _Partition] = {}
+        self._build_lock = threading.Lock()
+
+    def match(self, query: MatchQuery) -> Optional[Dict]:
+        """
+        Find the curated question closest to the message.
+
+        Returns:
+            The question's match dict plus 'similarity', or None below the threshold
+        """
+        all_partitions = self._partitions
+        languages = all_partitions.keys() if query.languages is None else query.languages
+        partitions = [all_partitions[language] for language in languages if language in all_partitions]
+        if not partitions:
+            return None
+
+        vector = embed_texts([query.lower], self.dim)[0]
+        best: Optional[Dict] = None
+        best_similarity = -math.inf
+        for partition in partitions:
+            for doc_id, similarity in partition.index.search(vector, 1):
+                if similarity > best_similarity:
+                    best, best_similarity = partition.matches[doc_id], similarity
+        if best is None or best_similarity < self.threshold:
+            return None
+        return dict(best, similarity=best_similarity)
+
+    def rebuild(self) -> None:
+        """
+        Index the current curated questions and swap the new indexes in.
+        Embedding and clustering take a while on large collections, so
+        call it off the event loop.
+        """
+        with self._build_lock:
+            documents = self._documents()
+            grouped: Dict[str, List[Tuple[str, Dict]]] = {}
+            for text, match, language in documents:
+                grouped.setdefault(language, []).append((text, match))
+
+            partitions = {}
+            embedded = 0
+            for language, group in grouped.items():
+                texts = [text for text, _ in group]
+                vectors, reused = self._vectors_for(self._partitions.get(language), texts)
+                embedded += len(texts) - reused
+
+                previous = self._partitions.get(language)
+                centroids = None
+                if previous is not None and reused >= CENTROID_REUSE_FRACTION * len(texts):
+                    centroids = previous.index.centroids
+                partitions[language] = _Partition(
+                    ANNIndex(vectors, centroids=centroids), texts, [match for _, match in group]
+                )
+
+            # Swap in the new indexes and their matches together
+            self._partitions = partitions
+            logger.info(
+                f"Built semantic indexes over {len(documents)} curated questions "
+                f"in {len(partitions)} languages ({embedded} embedded)"
+            )
+
+    def _vectors_for(self, previous: Optional[_Partition], texts: List[str]) -> Tuple["np.ndarray", int]:
+        """
+        Embeddings of texts, copied from the previous partition where it
+        has the same text.
+
+        Returns:
+            Tuple of (float32 array with one row per text, number of rows copied)
+        """
+        vectors = np.empty((len(texts), self.dim), dtype=np.float32)
+        missing = list(range(len(texts)))
+        if previous is not None:
+            previous_rows = {text: row for row, text in enumerate(previous.texts)}
+            previous_vectors = previous.index.item_vectors()
+            missing = []
+            for row, text in enumerate(texts):
+                previous_row = previous_rows.get(text)
+                if previous_row is None:
+                    missing.append(row)
+                else:
+                    vectors[row] = previous_vectors[previous_row]
+        if missing:
+            vectors[missing] = embed_texts([texts[row] for row in missing], self.dim)
+        return vectors, len(texts) - len(missing)
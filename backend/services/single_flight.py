@@ -0,0 +1,65 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one in-flight call.
+
+    The first caller for a key starts the call as a task; callers arriving
+    while it runs await the same task instead of starting their own. The
+    task is shielded from its callers, so a caller that goes away (e.g. a
+    disconnected client) does not cancel the call for the others. Results
+    and errors are shared by every caller of the flight.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Task] = {}
+
+        self.calls = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def run(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """
+        Run fn, or join the call already in flight for key.
+
+        Args:
+            key: Key identifying equivalent calls
+            fn: Coroutine function to call when no call is in flight
+
+        Returns:
+            Tuple of (result, whether it came from another caller's call)
+        """
+        task = self._flights.get(key)
+        shared = task is not None
+        if shared:
+            self.coalesced += 1
+        else:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._flights[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+
+        return await asyncio.shield(task), shared
+
+    def stats(self) -> Dict[str, int]:
+        """Report in-flight calls and counters."""
+        return {
+            "in_flight": len(self._flights),
+            "calls": self.calls,
+            "coalesced": self.coalesced
+        }
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        if not task.cancelled():
+            # Mark the error as retrieved even if every caller went away
+            task.exception()
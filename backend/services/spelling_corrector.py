@@ -0,0 +1,162 @@
+import re
+import threading
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, Optional, Set
+
+from .text_language import WORD_RE, normalize_text
+
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    """All strings obtained by deleting up to `distance` characters from word."""
+    results = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        results |= frontier
+    return results
+
+
+def damerau_levenshtein(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance between a and b (insertions,
+    deletions, substitutions and adjacent transpositions).
+
+    Returns:
+        The distance, or limit + 1 if it exceeds limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        # Later cells only build on this row and the one before it
+        if min(current) > limit and min(previous) > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+class SpellingCorrector:
+    """
+    Maps misspelled words to known vocabulary words (symmetric delete).
+
+    Every vocabulary word is indexed under all strings obtained by deleting
+    up to `max_edit_distance` characters from it. A misspelled word is
+    looked up under its own deletes, which finds every vocabulary word
+    within that edit distance in a handful of dict lookups; candidates are
+    then verified with the exact Damerau-Levenshtein distance.
+
+    The vocabulary is kept per source (e.g. "admin", "faq") with word
+    counts, so replacing one source's words only re-indexes the words that
+    were added or dropped.
+
+    Updates may run on another thread while messages are corrected: they
+    replace the delete index's word sets instead of modifying them, so a
+    lookup never sees a set change under it.
+    """
+
+    def __init__(self, max_edit_distance: int = 2, min_word_length: int = 4):
+        """
+        Initialize an empty corrector.
+
+        Args:
+            max_edit_distance: Largest edit distance corrected; words shorter
+                               than 8 characters are corrected by at most 1
+            min_word_length: Shorter words are never corrected
+        """
+        self.max_edit_distance = max_edit_distance
+        self.min_word_length = min_word_length
+
+        self._sources: Dict[str, Counter] = {}
+        # word -> number of occurrences across all sources
+        self._vocabulary: Counter = Counter()
+        # delete variant -> vocabulary words it was derived from
+        self._delete_index: Dict[str, FrozenSet[str]] = {}
+        # Serializes updates
+        self._update_lock = threading.Lock()
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._vocabulary
+
+    def update_source(self, source: str, words: Iterable[str]) -> None:
+        """
+        Replace the vocabulary contributed by a source.
+
+        Args:
+            source: Source name
+            words: Texts whose words make up the source's vocabulary
+        """
+        new_counts = Counter(
+            word for text in words for word in WORD_RE.findall(normalize_text(text))
+        )
+        with self._update_lock:
+            old_counts = self._sources.get(source, Counter())
+            self._sources[source] = new_counts
+
+            for word in old_counts.keys() - new_counts.keys():
+                self._remove(word, old_counts[word])
+            for word, count in new_counts.items():
+                difference = count - old_counts.get(word, 0)
+                if difference > 0:
+                    self._add(word, difference)
+                elif difference < 0:
+                    self._remove(word, -difference)
+
+    def correct(self, word: str) -> Optional[str]:
+        """
+        Find the closest vocabulary word.
+
+        Returns:
+            The word itself if known, the closest vocabulary word within the
+            allowed edit distance, or None
+        """
+        if word in self._vocabulary:
+            return word
+        if len(word) < self.min_word_length or word.isdigit():
+            return None
+
+        limit = 1 if len(word) < 8 else self.max_edit_distance
+        best: Optional[str] = None
+        best_key = None
+        for variant in _deletes(word, limit):
+            for candidate in self._delete_index.get(variant, ()):
+                distance = damerau_levenshtein(word, candidate, limit)
+                if distance > limit:
+                    continue
+                # Closest first, then most frequent, then alphabetical
+                key = (distance, -self._vocabulary[candidate], candidate)
+                if best_key is None or key < best_key:
+                    best, best_key = candidate, key
+        return best
+
+    def correct_text(self, text: str) -> str:
+        """Replace each misspelled word of normalized text by its correction."""
+        def replace(match: "re.Match") -> str:
+            return self.correct(match.group()) or match.group()
+        return WORD_RE.sub(replace, text)
+
+    def _add(self, word: str, count: int) -> None:
+        if word not in self._vocabulary and len(word) >= self.min_word_length - self.max_edit_distance:
+            for variant in _deletes(word, self.max_edit_distance):
+                self._delete_index[variant] = self._delete_index.get(variant, frozenset()) | {word}
+        self._vocabulary[word] += count
+
+    def _remove(self, word: str, count: int) -> None:
+        self._vocabulary[word] -= count
+        if self._vocabulary[word] > 0:
+            return
+        del self._vocabulary[word]
+        for variant in _deletes(word, self.max_edit_distance):
+            words = self._delete_index.get(variant)
+            if words is not None:
+                words = words - {word}
+                if words:
+                    self._delete_index[variant] = words
+                else:
+                    del self._delete_index[variant]
@@ -0,0 +1,548 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional, Dict, FrozenSet, Iterator, List, Set, Tuple
+from pathlib import Path
+import logging
+
+from .keyword_matcher import KeywordAutomaton
+from .text_language import WORD_RE, entry_language, keyword_language, normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Keep IN (...) lists under SQLite's host parameter limit
+_MAX_PARAMS = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS admin_qa (
+    id INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    question_lower TEXT NOT NULL,
+    language TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS admin_qa_question_lower ON admin_qa (question_lower, position);
+CREATE INDEX IF NOT EXISTS admin_qa_position ON admin_qa (position);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS admin_qa_fts USING fts5 (
+    question_lower,
+    content = 'admin_qa',
+    content_rowid = 'id',
+    tokenize = "unicode61 remove_diacritics 0 tokenchars '_'"
+);
+CREATE TRIGGER IF NOT EXISTS admin_qa_ai AFTER INSERT ON admin_qa BEGIN
+    INSERT INTO admin_qa_fts (rowid, question_lower) VALUES (new.id, new.question_lower);
+END;
+CREATE TRIGGER IF NOT EXISTS admin_qa_ad AFTER DELETE ON admin_qa BEGIN
+    INSERT INTO admin_qa_fts (admin_qa_fts, rowid, question_lower) VALUES ('delete', old.id, old.question_lower);
+END;
+CREATE TRIGGER IF NOT EXISTS admin_qa_au AFTER UPDATE ON admin_qa BEGIN
+    INSERT INTO admin_qa_fts (admin_qa_fts, rowid, question_lower) VALUES ('delete', old.id, old.question_lower);
+    INSERT INTO admin_qa_fts (rowid, question_lower) VALUES (new.id, new.question_lower);
+END;
+
+-- Languages an admin pair is matched in: its question's, and that of each
+-- script its words are written in
+CREATE TABLE IF NOT EXISTS admin_qa_languages (
+    qa_id INTEGER NOT NULL,
+    language TEXT NOT NULL,
+    PRIMARY KEY (qa_id, language)
+);
+CREATE INDEX IF NOT EXISTS admin_qa_languages_language ON admin_qa_languages (language, qa_id);
+CREATE TRIGGER IF NOT EXISTS admin_qa_languages_ad AFTER DELETE ON admin_qa BEGIN
+    DELETE FROM admin_qa_languages WHERE qa_id = old.id;
+END;
+
+CREATE TABLE IF NOT EXISTS predefined_qa (
+    id INTEGER PRIMARY KEY,
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    question_lower TEXT NOT NULL,
+    keyword_count INTEGER NOT NULL,
+    language TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS predefined_qa_question_lower ON predefined_qa (question_lower, id);
+
+-- fragment is no longer used; the column stays so existing databases still open
+CREATE TABLE IF NOT EXISTS predefined_keywords (
+    entry_id INTEGER NOT NULL,
+    keyword TEXT NOT NULL,
+    fragment TEXT NOT NULL DEFAULT '',
+    language TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS predefined_keywords_keyword ON predefined_keywords (keyword);
+"""
+
+# Run once the language columns exist, which databases created before them lack
+_LANGUAGE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS admin_qa_language ON admin_qa (language, question_lower, position)",
+    "CREATE INDEX IF NOT EXISTS predefined_qa_language ON predefined_qa (language, question_lower, id)",
+)
+
+
+def default_db_path() -> Path:
+    """Database path from the QA_SQLITE_PATH env var, defaulting to backend/data/qa.sqlite3."""
+    db_path = os.getenv("QA_SQLITE_PATH")
+    if db_path:
+        return Path(db_path)
+    return Path(__file__).parent.parent / "data" / "qa.sqlite3"
+
+
+def _pairs_stamp(qa_pairs: List[Dict], next_id: int) -> str:
+    """Content hash of admin pairs as stored in the JSON file."""
+    data = json.dumps({"qa_pairs": qa_pairs, "next_id": next_id}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def _language_filter(languages: Optional[FrozenSet[str]], column: str = "language") -> Tuple[str, Tuple]:
+    """SQL condition and parameters restricting rows to the languages, or none for any language."""
+    if languages is None:
+        return "", ()
+    return f" AND {column} IN ({', '.join('?' * len(languages))})", tuple(sorted(languages))
+
+
+def _pair_languages(question: str, language: str) -> Set[str]:
+    """Languages an admin pair is matched in: its question's and that of each script its words are written in."""
+    words = WORD_RE.findall(normalize_text(question))
+    return {language} | {keyword_language(word, language) for word in words}
+
+
+def _match_expression(words: Set[str]) -> str:
+    """Build an FTS5 query matching rows that contain any of the words."""
+    return " OR ".join('"' + word.replace('"', '""') + '"' for word in sorted(words))
+
+
+class _SQLiteStore:
+    """
+    Shared connection handling for the SQLite stores.
+    The database runs in WAL mode so several uvicorn workers can read while
+    one of them writes.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Open (and if needed create) the database.
+
+        Args:
+            db_path: Path to the SQLite file. Defaults to default_db_path()
+        """
+        self.db_path = Path(db_path) if db_path is not None else default_db_path()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        # Autocommit mode; writes use explicit BEGIN IMMEDIATE transactions
+        self._conn = sqlite3.connect(
+            str(self.db_path), isolation_level=None, check_same_thread=False
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        # Every statement is idempotent, so concurrent workers can all run it
+        self._conn.executescript(_SCHEMA)
+        self._add_language_columns()
+
+    def _add_language_columns(self) -> None:
+        """
+        Add the language column to tables created before it existed. Admin
+        pairs are tagged in place; predefined entries and keywords are tagged
+        by forcing their next sync. Admin pairs stored before their word
+        languages were are added to admin_qa_languages.
+        """
+        with self._transaction() as conn:
+            for table in ('admin_qa', 'predefined_qa', 'predefined_keywords'):
+                columns = {row['name'] for row in conn.execute(f"PRAGMA table_info({table})")}
+                if 'language' in columns:
+                    continue
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN language TEXT NOT NULL DEFAULT ''")
+                if table == 'admin_qa':
+                    rows = conn.execute("SELECT id, question FROM admin_qa").fetchall()
+                    conn.executemany(
+                        "UPDATE admin_qa SET language = ? WHERE id = ?",
+                        [(entry_language(row['question']), row['id']) for row in rows]
+                    )
+                else:
+                    conn.execute("DELETE FROM meta WHERE key = 'predefined_source'")
+            for statement in _LANGUAGE_INDEXES:
+                conn.execute(statement)
+            rows = conn.execute(
+                "SELECT id, question, language FROM admin_qa "
+                "WHERE id NOT IN (SELECT qa_id FROM admin_qa_languages)"
+            ).fetchall()
+            for row in rows:
+                self._set_pair_languages(conn, row['id'], row['question'], row['language'])
+
+    @staticmethod
+    def _set_pair_languages(conn: sqlite3.Connection, qa_id: int, question: str, language: str) -> None:
+        """Record the languages an admin pair is matched in, replacing earlier ones."""
+        conn.execute("DELETE FROM admin_qa_languages WHERE qa_id = ?", (qa_id,))
+        conn.executemany(
+            "INSERT INTO admin_qa_languages (qa_id, language) VALUES (?, ?)",
+            [(qa_id, pair_language) for pair_language in sorted(_pair_languages(question, language))]
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a write transaction that holds the database write lock from the start."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[sqlite3.Row]:
+        """Run a read query."""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        rows = self._query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0]['value'] if rows else None
+
+    def _set_meta(self, conn: sqlite3.Connection, key: str, value: str) -> None:
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def _split_params(values: List) -> Iterator[List]:
+    for start in range(0, len(values), _MAX_PARAMS):
+        yield values[start:start + _MAX_PARAMS]
+
+
+class SQLiteAdminQAStore(_SQLiteStore):
+    """
+    Admin Q&A pairs kept as rows, with an FTS5 index over the normalized
+    questions. Every write is a single transaction, so all workers sharing
+    the database see the same pairs.
+
+    The table is seeded from the JSON file. Once seeded the database is the
+    source of truth: a later change to the file is imported again only if
+    no pair was edited through the API since the last import or export,
+    otherwise the file is ignored with a warning so API edits are never lost.
+    """
+
+    @staticmethod
+    def _pair(row: sqlite3.Row) -> Dict:
+        return {'id': row['id'], 'question': row['question'], 'answer': row['answer']}
+
+    def import_pairs(self, qa_pairs: List[Dict], next_id: int = 1) -> bool:
+        """
+        Seed the table from the JSON file, or replace its pairs when the file
+        changed since it was last imported or exported and no pair has been
+        edited since.
+
+        Args:
+            qa_pairs: Q&A pairs in list order
+            next_id: Persisted next ID from the JSON file
+
+        Returns:
+            True if the pairs were imported, False if the database was kept
+        """
+        source = _pairs_stamp(qa_pairs, next_id)
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'admin_imported'").fetchone():
+                row = conn.execute("SELECT value FROM meta WHERE key = 'admin_source'").fetchone()
+                if row is None:
+                    # Seeded before the file was tracked; take it as the baseline
+                    self._set_meta(conn, 'admin_source', source)
+                    return False
+                if row['value'] == source:
+                    return False
+                edited = conn.execute("SELECT value FROM meta WHERE key = 'admin_edited'").fetchone()
+                if edited is not None and edited['value'] == '1':
+                    logger.warning(
+                        f"Admin Q&A file changed, but pairs in {self.db_path} were edited since it "
+                        "was imported; keeping the database. Export the pairs before editing the file."
+                    )
+                    return False
+                next_id = max(next_id, int(conn.execute(
+                    "SELECT value FROM meta WHERE key = 'admin_next_id'"
+                ).fetchone()['value']))
+                conn.execute("DELETE FROM admin_qa")
+            for position, qa in enumerate(qa_pairs, start=1):
+                language = entry_language(qa['question'], qa.get('language'))
+                conn.execute(
+                    "INSERT INTO admin_qa (id, position, question, answer, question_lower, language) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (qa['id'], position, qa['question'], qa['answer'], normalize_text(qa['question']).strip(),
+                     language)
+                )
+                self._set_pair_languages(conn, qa['id'], qa['question'], language)
+            next_id = max([next_id] + [qa['id'] + 1 for qa in qa_pairs])
+            self._set_meta(conn, 'admin_next_id', str(next_id))
+            self._set_meta(conn, 'admin_imported', '1')
+            self._set_meta(conn, 'admin_source', source)
+            self._set_meta(conn, 'admin_edited', '0')
+        logger.info(f"Imported {len(qa_pairs)} admin Q&A pairs into {self.db_path}")
+        return True
+
+    def export_pairs(self, write: Callable[[Dict], None]) -> int:
+        """
+        Write all pairs in the JSON file format; the written file then
+        counts as the imported source, so it is not imported back.
+
+        Args:
+            write: Called with {"qa_pairs": ..., "next_id": ...} while the
+                   database is locked for writing; if it raises, nothing is recorded
+
+        Returns:
+            Number of pairs written
+        """
+        with self._transaction() as conn:
+            rows = conn.execute("SELECT id, question, answer FROM admin_qa ORDER BY position").fetchall()
+            qa_pairs = [self._pair(row) for row in rows]
+            next_id = int(conn.execute("SELECT value FROM meta WHERE key = 'admin_next_id'").fetchone()['value'])
+            write({"qa_pairs": qa_pairs, "next_id": next_id})
+            self._set_meta(conn, 'admin_source', _pairs_stamp(qa_pairs, next_id))
+            self._set_meta(conn, 'admin_edited', '0')
+        return len(qa_pairs)
+
+    @property
+    def next_id(self) -> int:
+        """The next ID the allocator will hand out."""
+        return int(self._get_meta('admin_next_id') or 1)
+
+    def count(self) -> int:
+        return self._query("SELECT COUNT(*) AS n FROM admin_qa")[0]['n']
+
+    def all_pairs(self) -> List[Dict]:
+        rows = self._query("SELECT id, question, answer FROM admin_qa ORDER BY position")
+        return [self._pair(row) for row in rows]
+
+    def languages(self) -> Set[str]:
+        """Languages of the stored pairs' questions and of the scripts their words are written in."""
+        return {row['language'] for row in self._query("SELECT DISTINCT language FROM admin_qa_languages")}
+
+    def get(self, qa_id: int) -> Optional[Dict]:
+        rows = self._query("SELECT id, question, answer FROM admin_qa WHERE id = ?", (qa_id,))
+        return self._pair(rows[0]) if rows else None
+
+    def add(self, question: str, answer: str) -> Dict:
+        with self._transaction() as conn:
+            qa_id = int(conn.execute(
+                "SELECT value FROM meta WHERE key = 'admin_next_id'"
+            ).fetchone()['value'])
+            position = conn.execute(
+                "SELECT COALESCE(MAX(position), 0) + 1 AS position FROM admin_qa"
+            ).fetchone()['position']
+            language = entry_language(question)
+            conn.execute(
+                "INSERT INTO admin_qa (id, position, question, answer, question_lower, language) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (qa_id, position, question, answer, normalize_text(question).strip(), language)
+            )
+            self._set_pair_languages(conn, qa_id, question, language)
+            self._set_meta(conn, 'admin_next_id', str(qa_id + 1))
+            self._set_meta(conn, 'admin_edited', '1')
+        return {'id': qa_id, 'question': question, 'answer': answer}
+
+    def update(self, qa_id: int, question: str, answer: str) -> Optional[Dict]:
+        language = entry_language(question)
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE admin_qa SET question = ?, answer = ?, question_lower = ?, language = ? WHERE id = ?",
+                (question, answer, normalize_text(question).strip(), language, qa_id)
+            )
+            if cursor.rowcount:
+                self._set_pair_languages(conn, qa_id, question, language)
+                self._set_meta(conn, 'admin_edited', '1')
+        if cursor.rowcount == 0:
+            return None
+        return {'id': qa_id, 'question': question, 'answer': answer}
+
+    def delete(self, qa_id: int) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute("DELETE FROM admin_qa WHERE id = ?", (qa_id,))
+            if cursor.rowcount:
+                self._set_meta(conn, 'admin_edited', '1')
+        return cursor.rowcount > 0
+
+    def find_exact(self, question_lower: str, languages: Optional[FrozenSet[str]] = None) -> Optional[Dict]:
+        """
+        First pair in list order whose normalized question equals the given
+        text, among pairs in the languages (any language if None).
+        """
+        condition, params = _language_filter(languages)
+        rows = self._query(
+            f"SELECT id, question, answer FROM admin_qa WHERE question_lower = ?{condition} "
+            "ORDER BY position LIMIT 1",
+            (question_lower,) + params
+        )
+        return self._pair(rows[0]) if rows else None
+
+    def find_candidates(self, words: Set[str], languages: Optional[FrozenSet[str]] = None) -> List[Dict]:
+        """
+        Pairs whose question shares at least one word with the given set.
+
+        Args:
+            words: Words of the normalized user message
+            languages: Languages to search, or None for any language; a pair
+                       is searched in its question's language and in that of
+                       each script its words are written in
+
+        Returns:
+            Entries with 'question_lower', 'question_words' and 'qa', in list order
+        """
+        if not words:
+            return []
+        condition, params = _language_filter(languages)
+        if condition:
+            condition = f" AND a.id IN (SELECT qa_id FROM admin_qa_languages WHERE 1{condition})"
+        rows = self._query(
+            "SELECT a.id, a.question, a.answer, a.question_lower FROM admin_qa_fts "
+            "JOIN admin_qa a ON a.id = admin_qa_fts.rowid "
+            f"WHERE admin_qa_fts MATCH ?{condition} ORDER BY a.position",
+            (_match_expression(words),) + params
+        )
+        return [
+            {
+                'question_lower': row['question_lower'],
+                'question_words': frozenset(WORD_RE.findall(row['question_lower'])),
+                'qa': self._pair(row)
+            }
+            for row in rows
+        ]
+
+
+class SQLitePredefinedQAStore(_SQLiteStore):
+    """
+    Predefined Q&A entries mirrored from predefined_qa.json.
+
+    Keywords match as substrings of the message, which token-based full-text
+    search cannot reproduce. Instead each worker compiles the distinct
+    stored keywords into a KeywordAutomaton, which finds the keywords in a
+    message in one pass; only the keywords found are looked up, by an
+    indexed IN query, to get their entries. The automaton is rebuilt when
+    the entries were resynced, also by another worker. Keywords are
+    filtered by their language column, the language of the script each is
+    written in, so a message only matches keywords in its languages.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        super().__init__(db_path)
+        # (source stamp the automaton was built for, automaton over the keywords)
+        self._automaton: Tuple[Optional[str], KeywordAutomaton] = (None, KeywordAutomaton([]))
+
+    def sync(self, qa_data: List[Dict], source_stamp: str) -> bool:
+        """
+        Replace the stored entries when the source file has changed.
+
+        Args:
+            qa_data: Entries parsed from the JSON file, in file order
+            source_stamp: Identifies the file version (path, mtime and size)
+
+        Returns:
+            True if the entries were rewritten, False if they were already current
+        """
+        with self._transaction() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'predefined_source'").fetchone()
+            if row is not None and row['value'] == source_stamp:
+                return False
+
+            conn.execute("DELETE FROM predefined_keywords")
+            conn.execute("DELETE FROM predefined_qa")
+            for entry_id, qa_entry in enumerate(qa_data):
+                keywords = qa_entry.get('keywords', [])
+                language = entry_language(qa_entry['question'], qa_entry.get('language'))
+                conn.execute(
+                    "INSERT INTO predefined_qa (id, question, answer, question_lower, keyword_count, language) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (entry_id, qa_entry['question'], qa_entry['answer'],
+                     normalize_text(qa_entry['question']).strip(), len(keywords), language)
+                )
+                for keyword in keywords:
+                    conn.execute(
+                        "INSERT INTO predefined_keywords (entry_id, keyword, language) VALUES (?, ?, ?)",
+                        (entry_id, normalize_text(keyword), keyword_language(keyword, language))
+                    )
+            self._set_meta(conn, 'predefined_source', source_stamp)
+        logger.info(f"Synced {len(qa_data)} predefined Q&A entries into {self.db_path}")
+        return True
+
+    def find_exact(self, question_lower: str, languages: Optional[FrozenSet[str]] = None) -> Optional[Dict]:
+        """
+        First entry in file order whose normalized question equals the given
+        text, among entries in the languages (any language if None).
+        """
+        condition, params = _language_filter(languages)
+        rows = self._query(
+            f"SELECT question, answer FROM predefined_qa WHERE question_lower = ?{condition} ORDER BY id LIMIT 1",
+            (question_lower,) + params
+        )
+        return dict(rows[0]) if rows else None
+
+    def keyword_matches(
+        self,
+        message_lower: str,
+        languages: Optional[FrozenSet[str]] = None
+    ) -> List[Tuple[Dict, int, int]]:
+        """
+        Entries with at least one keyword occurring in the message.
+
+        Args:
+            message_lower: The normalized user message
+            languages: Languages of the keywords to match, or None for any
+                       language; each keyword has the language of its own script
+
+        Returns:
+            (entry, matched keyword count, total keyword count) tuples in file order
+        """
+        automaton = self._keyword_automaton()
+        # An empty keyword is a substring of every message
+        keywords = [''] + [automaton.keywords[k] for k in automaton.search(message_lower)]
+
+        condition, params = _language_filter(languages)
+        matched_counts: Dict[int, int] = {}
+        for chunk in _split_params(keywords):
+            rows = self._query(
+                "SELECT entry_id FROM predefined_keywords WHERE keyword IN "
+                f"({', '.join('?' * len(chunk))}){condition}",
+                tuple(chunk) + params
+            )
+            for row in rows:
+                matched_counts[row['entry_id']] = matched_counts.get(row['entry_id'], 0) + 1
+
+        matches = []
+        for chunk in _split_params(sorted(matched_counts)):
+            rows = self._query(
+                "SELECT id, question, answer, keyword_count FROM predefined_qa WHERE id IN "
+                f"({', '.join('?' * len(chunk))}) ORDER BY id",
+                tuple(chunk)
+            )
+            for row in rows:
+                entry = {'question': row['question'], 'answer': row['answer']}
+                matches.append((entry, matched_counts[row['id']], row['keyword_count']))
+        return matches
+
+    def _keyword_automaton(self) -> KeywordAutomaton:
+        """Automaton over the distinct stored keywords, rebuilt if the entries were resynced."""
+        source = self._get_meta('predefined_source')
+        built_for, automaton = self._automaton
+        if source != built_for:
+            rows = self._query("SELECT DISTINCT keyword FROM predefined_keywords WHERE keyword != ''")
+            automaton = KeywordAutomaton([row['keyword'] for row in rows])
+            self._automaton = (source, automaton)
+        return automaton
+
+    def all_questions(self) -> List[str]:
+        return [row['question'] for row in self._query("SELECT question FROM predefined_qa ORDER BY id")]
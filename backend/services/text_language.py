@@ -0,0 +1,163 @@
+import re
+import unicodedata
+from typing import Dict, FrozenSet, Optional
+
+# Words, including the vowel signs and viramas of Indic scripts, which are
+# combining marks that \w alone would split words at (dandas excluded)
+WORD_RE = re.compile(r'[\w\u0900-\u0963\u0966-\u0dff]+')
+
+LATIN = "latin"
+
+# Indic Unicode blocks, 128 code points each from U+0900, in order
+_INDIC_SCRIPTS = (
+    "devanagari", "bengali", "gurmukhi", "gujarati", "oriya",
+    "tamil", "telugu", "kannada", "malayalam", "sinhala"
+)
+_INDIC_START = 0x0900
+_INDIC_END = 0x0E00
+
+# Language code -> script it is written in
+LANGUAGE_SCRIPTS: Dict[str, str] = {
+    "en": LATIN,
+    "hi": "devanagari",
+    "mr": "devanagari",
+    "ne": "devanagari",
+    "bn": "bengali",
+    "as": "bengali",
+    "pa": "gurmukhi",
+    "gu": "gujarati",
+    "or": "oriya",
+    "ta": "tamil",
+    "te": "telugu",
+    "kn": "kannada",
+    "ml": "malayalam",
+    "si": "sinhala",
+}
+
+# Language code -> English name, for prompts
+LANGUAGE_NAMES: Dict[str, str] = {
+    "en": "English",
+    "hi": "Hindi",
+    "mr": "Marathi",
+    "ne": "Nepali",
+    "bn": "Bengali",
+    "as": "Assamese",
+    "pa": "Punjabi",
+    "gu": "Gujarati",
+    "or": "Odia",
+    "ta": "Tamil",
+    "te": "Telugu",
+    "kn": "Kannada",
+    "ml": "Malayalam",
+    "si": "Sinhala",
+}
+
+# Script -> language assumed when the requested language does not use it
+SCRIPT_LANGUAGES: Dict[str, str] = {
+    LATIN: "en",
+    "devanagari": "hi",
+    "bengali": "bn",
+    "gurmukhi": "pa",
+    "gujarati": "gu",
+    "oriya": "or",
+    "tamil": "ta",
+    "telugu": "te",
+    "kannada": "kn",
+    "malayalam": "ml",
+    "sinhala": "si",
+}
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for matching: NFKC folds compatibility forms (full-width
+    letters, ligatures, composed/decomposed accents) and casefold lowercases
+    beyond ASCII. Stored questions and messages go through the same function.
+    """
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+def script_counts(text: str) -> Dict[str, int]:
+    """
+    Count the letters of text per script (Latin and the Indic scripts);
+    digits, punctuation and other scripts are not counted.
+    """
+    if text.isascii():
+        letters = sum(1 for ch in text if ch.isalpha())
+        return {LATIN: letters} if letters else {}
+
+    counts: Dict[str, int] = {}
+    for ch in text:
+        code = ord(ch)
+        if _INDIC_START <= code < _INDIC_END:
+            script = _INDIC_SCRIPTS[(code - _INDIC_START) >> 7]
+        elif code < 0x0250 and ch.isalpha():
+            # ASCII, Latin-1 and Latin Extended letters
+            script = LATIN
+        else:
+            continue
+        counts[script] = counts.get(script, 0) + 1
+    return counts
+
+
+def _language_for(script: str, requested: Optional[str]) -> str:
+    if requested and LANGUAGE_SCRIPTS.get(requested) == script:
+        return requested
+    return SCRIPT_LANGUAGES[script]
+
+
+def detect_language(text: str, requested: Optional[str] = None) -> Optional[str]:
+    """
+    Language of the dominant script of text.
+
+    Args:
+        text: Text to inspect
+        requested: Language the text is said to be in; kept if it is
+                   written in the dominant script
+
+    Returns:
+        Language code, or None if text has no Latin or Indic letters
+    """
+    counts = script_counts(text)
+    if not counts:
+        return None
+    return _language_for(max(counts, key=counts.get), requested)
+
+
+def message_languages(text: str, requested: Optional[str] = None) -> Optional[FrozenSet[str]]:
+    """
+    Knowledge partitions a message can match: one language per script its
+    letters are written in, so mixed messages (e.g. Hindi with an English
+    brand name) search every partition they could match.
+
+    Args:
+        text: The message
+        requested: Language the client says the message is in; used for a
+                   script only if that language is written in it
+
+    Returns:
+        Set of language codes, or None if the message has no Latin or Indic
+        letters and may match any partition
+    """
+    counts = script_counts(text)
+    if not counts:
+        return None
+    return frozenset(_language_for(script, requested) for script in counts)
+
+
+def entry_language(text: str, declared: Optional[str] = None) -> str:
+    """
+    Knowledge partition of a curated entry: its declared language if it has
+    one, else the language of the script its text is written in, else English.
+    """
+    return declared or detect_language(text) or "en"
+
+
+def keyword_language(keyword: str, entry_lang: str) -> str:
+    """
+    Knowledge partition of one keyword (or question word) of a curated
+    entry: the language of its own script, so a keyword written in another
+    script than its entry is still searched for messages in that script.
+    Keywords with no Latin or Indic letters stay in the entry's partition.
+    """
+    return detect_language(keyword, entry_lang) or entry_lang
@@ -0,0 +1,142 @@
+import math
+from collections import Counter
+from typing import Dict, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .text_language import WORD_RE, normalize_text
+
+
+def numpy_available() -> bool:
+    """Whether the optional NumPy dependency of TfidfRanker is installed."""
+    return np is not None
+
+
+class TfidfRanker:
+    """
+    Ranks documents against a query by TF-IDF cosine similarity.
+
+    The term-document matrix is built once, stored column-wise per term
+    (CSC layout: indptr, doc indices, weights) with L2-normalized document
+    vectors. A query is scored against every document with one sparse
+    dot product: the posting slices of the query's terms are scaled and
+    summed with a single bincount. Scores are cosine similarities in
+    0..1; query words unknown to the corpus count towards the query norm,
+    so off-topic words lower the score.
+    """
+
+    def __init__(self, documents: List[str]):
+        """
+        Build the term matrix.
+
+        Args:
+            documents: Document texts; results refer to documents by list index
+        """
+        if np is None:
+            raise ImportError("TfidfRanker requires numpy")
+
+        self.num_documents = len(documents)
+
+        doc_terms = [Counter(WORD_RE.findall(normalize_text(doc))) for doc in documents]
+        document_frequency: Counter = Counter()
+        for terms in doc_terms:
+            document_frequency.update(terms.keys())
+
+        self._term_ids: Dict[str, int] = {
+            term: term_id for term_id, term in enumerate(sorted(document_frequency))
+        }
+        self._idf = np.array(
+            [self._smoothed_idf(document_frequency[term]) for term in sorted(document_frequency)],
+            dtype=np.float64
+        )
+        self._unknown_idf = self._smoothed_idf(0)
+
+        # Postings grouped by term, each holding (doc index, normalized weight)
+        postings: List[List[Tuple[int, float]]] = [[] for _ in self._term_ids]
+        for doc_id, terms in enumerate(doc_terms):
+            weights = {
+                term: (1 + math.log(count)) * self._idf[self._term_ids[term]]
+                for term, count in terms.items()
+            }
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for term, weight in weights.items():
+                postings[self._term_ids[term]].append((doc_id, weight / norm))
+
+        lengths = [len(p) for p in postings]
+        self._indptr = np.zeros(len(postings) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self._indptr[1:])
+        self._indices = np.fromiter(
+            (doc_id for p in postings for doc_id, _ in p), dtype=np.int32, count=int(self._indptr[-1])
+        )
+        self._data = np.fromiter(
+            (weight for p in postings for _, weight in p), dtype=np.float64, count=int(self._indptr[-1])
+        )
+
+    def _smoothed_idf(self, document_frequency: int) -> float:
+        return math.log((1 + self.num_documents) / (1 + document_frequency)) + 1
+
+    def _score(self, text: str) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Cosine similarity of the text to the documents sharing a term with it.
+
+        Returns:
+            Tuple of (doc indices in ascending order, their scores)
+        """
+        empty = (np.zeros(0, dtype=np.int64), np.zeros(0))
+        query_terms = Counter(WORD_RE.findall(normalize_text(text)))
+        if not query_terms:
+            return empty
+
+        slices_indices = []
+        slices_data = []
+        squared_norm = 0.0
+        for term, count in query_terms.items():
+            term_id = self._term_ids.get(term)
+            idf = self._unknown_idf if term_id is None else self._idf[term_id]
+            weight = (1 + math.log(count)) * idf
+            squared_norm += weight * weight
+            if term_id is not None:
+                start, end = self._indptr[term_id], self._indptr[term_id + 1]
+                slices_indices.append(self._indices[start:end])
+                slices_data.append(self._data[start:end] * weight)
+
+        if not slices_indices:
+            return empty
+
+        # Sum the scaled postings per document; only touched documents are
+        # materialized, so the cost follows the postings, not the corpus size
+        doc_ids, positions = np.unique(np.concatenate(slices_indices), return_inverse=True)
+        doc_scores = np.bincount(positions, weights=np.concatenate(slices_data))
+        return doc_ids, doc_scores / math.sqrt(squared_norm)
+
+    def scores(self, text: str) -> "np.ndarray":
+        """
+        Cosine similarity of the text to every document.
+
+        Returns:
+            Array of scores indexed by document
+        """
+        scores = np.zeros(self.num_documents)
+        doc_ids, doc_scores = self._score(text)
+        scores[doc_ids] = doc_scores
+        return scores
+
+    def top_k(self, text: str, k: int = 1) -> List[Tuple[int, float]]:
+        """
+        The k best matching documents.
+
+        Returns:
+            (doc index, score) pairs, best first; equal scores keep document order.
+            Documents sharing no term with the text are left out.
+        """
+        doc_ids, doc_scores = self._score(text)
+        if len(doc_ids) > k:
+            kth_score = doc_scores[np.argpartition(-doc_scores, k - 1)[k - 1]]
+            # Keep documents tied with the k-th score so ties resolve by order
+            keep = doc_scores >= kth_score
+            doc_ids, doc_scores = doc_ids[keep], doc_scores[keep]
+        order = np.lexsort((doc_ids, -doc_scores))[:k]
+        return [(int(doc_ids[i]), float(doc_scores[i])) for i in order]
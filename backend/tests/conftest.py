@@ -0,0 +1,115 @@
+import asyncio
+import functools
+import shutil
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from backend.services import chatbot_service as chatbot_module
+from backend.services.admin_qa_service import AdminQAService
+from backend.services.chatbot_service import ChatbotService
+from backend.services.llm_client import LLMClient
+
+# A question none of the curated tiers answers, so it goes to the LLM
+LLM_QUESTION = "Write a haiku about autumn leaves"
+
+
+class FakeOpenAI:
+    """
+    Stand-in for AsyncOpenAI's chat completions API.
+
+    Answers every call with `answer`, streamed in `chunks` when the call
+    asks for a stream. Calls wait on `gate` while it is set, and raise
+    `error` instead of answering while it is set. Per call, in order,
+    `delays` holds seconds to take and `failures` errors to raise first.
+    """
+
+    def __init__(self, answer: str = "Crisp leaves drift down", chunks: int = 3):
+        self.answer = answer
+        self.chunks = chunks
+        self.error: Optional[Exception] = None
+        self.gate: Optional[asyncio.Event] = None
+        self.delays: List[float] = []
+        self.failures: List[Exception] = []
+        self.calls: List[Dict[str, Any]] = []
+        self.cancelled = 0
+        self.closed = False
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs) -> Any:
+        self.calls.append(kwargs)
+        try:
+            if self.delays:
+                await asyncio.sleep(self.delays.pop(0))
+            if self.gate is not None:
+                await self.gate.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.failures:
+            raise self.failures.pop(0)
+        if self.error is not None:
+            raise self.error
+        if kwargs.get("stream"):
+            return self._stream()
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.answer))])
+
+    async def _stream(self):
+        size = -(-len(self.answer) // self.chunks)
+        for start in range(0, len(self.answer), size):
+            delta = SimpleNamespace(content=self.answer[start:start + size])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def fake_openai() -> FakeOpenAI:
+    return FakeOpenAI()
+
+
+def make_chatbot_service(monkeypatch, fake_openai: FakeOpenAI, semantic_matching: Optional[bool] = False) -> ChatbotService:
+    """A ChatbotService whose LLM calls go to fake_openai."""
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("HOT_RELOAD", "false")
+    monkeypatch.setenv("ANSWER_TRANSLATION", "false")
+    if semantic_matching is None:
+        monkeypatch.delenv("SEMANTIC_MATCHING", raising=False)
+    else:
+        monkeypatch.setenv("SEMANTIC_MATCHING", str(semantic_matching).lower())
+    monkeypatch.setenv("CONVERSATION_BACKEND", "memory")
+    monkeypatch.setenv("LLM_BREAKER_FAILURES", "2")
+    service = ChatbotService()
+    service.client = fake_openai
+    service.llm = LLMClient(fake_openai, max_retries=0)
+    return service
+
+
+@pytest.fixture
+def chatbot_service(monkeypatch, fake_openai) -> ChatbotService:
+    """A ChatbotService whose LLM calls go to fake_openai, without the semantic tier."""
+    return make_chatbot_service(monkeypatch, fake_openai)
+
+
+@pytest.fixture
+def semantic_chatbot_service(monkeypatch, fake_openai) -> ChatbotService:
+    """A ChatbotService whose LLM calls go to fake_openai, with the opt-in semantic tier on."""
+    return make_chatbot_service(monkeypatch, fake_openai, semantic_matching=True)
+
+
+@pytest.fixture
+def admin_qa_file(monkeypatch, tmp_path) -> Path:
+    """
+    A copy of the admin Q&A file that ChatbotServices created afterwards
+    use, so tests can edit admin pairs; request it before chatbot_service.
+    """
+    admin_file = tmp_path / "admin_qa.json"
+    shutil.copy(Path(chatbot_module.__file__).parent.parent / "data" / "admin_qa.json", admin_file)
+    monkeypatch.setattr(
+        chatbot_module, "AdminQAService",
+        functools.partial(AdminQAService, qa_file_path=admin_file, backend="json", storage_mode="snapshot")
+    )
+    return admin_file
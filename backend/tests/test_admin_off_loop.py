@@ -0,0 +1,68 @@
+import asyncio
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.routes import chat
+from backend.routes.auth import ADMIN_PASSWORD
+from backend.services.admin_qa_service import AdminQAService
+from backend.services.matching_pipeline import MatchQuery
+
+HEADERS = {"Authorization": f"Bearer {ADMIN_PASSWORD}"}
+
+
+def on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def record_calls(monkeypatch, service, names):
+    """Wrap service methods to record (name, whether it ran on the event loop)."""
+    calls = []
+    for name in names:
+        def wrapper(*args, _method=getattr(service, name), _name=name, **kwargs):
+            calls.append((_name, on_event_loop()))
+            return _method(*args, **kwargs)
+        monkeypatch.setattr(service, name, wrapper)
+    return calls
+
+
+def test_admin_routes_edit_off_the_event_loop(tmp_path, monkeypatch):
+    admin = AdminQAService(qa_file_path=tmp_path / "admin_qa.json", backend="json", storage_mode="snapshot")
+    calls = record_calls(
+        monkeypatch, admin, ["refresh", "add_qa_pair", "update_qa_pair", "delete_qa_pair", "get_all_qa_pairs"]
+    )
+    monkeypatch.setattr(chat, "_chatbot_service", SimpleNamespace(admin_qa_service=admin))
+    client = TestClient(app)
+
+    created = client.post("/api/admin/qa", json={"question": "Who are you?", "answer": "K2"}, headers=HEADERS)
+    assert created.status_code == 200
+    qa_id = created.json()["id"]
+    updated = client.put(
+        f"/api/admin/qa/{qa_id}", json={"question": "Who are you?", "answer": "K2 Comms"}, headers=HEADERS
+    )
+    assert updated.json()["answer"] == "K2 Comms"
+    assert [qa["answer"] for qa in client.get("/api/admin/qa", headers=HEADERS).json()] == ["K2 Comms"]
+    assert client.delete(f"/api/admin/qa/{qa_id}", headers=HEADERS).json() == {"success": True, "id": qa_id}
+
+    assert {name for name, _ in calls} == {
+        "refresh", "add_qa_pair", "update_qa_pair", "delete_qa_pair", "get_all_qa_pairs"
+    }
+    assert not any(loop for _, loop in calls)
+
+
+def test_catching_up_on_other_workers_runs_off_the_event_loop(chatbot_service, monkeypatch):
+    admin = chatbot_service.admin_qa_service
+    monkeypatch.setattr(admin, "is_stale", lambda: True)
+    calls = record_calls(monkeypatch, admin, ["refresh"])
+
+    async def scenario():
+        await chatbot_service._match_curated(MatchQuery("hello there"), "en")
+        await chatbot_service._indexes_rebuild
+
+    asyncio.run(scenario())
+    assert calls == [("refresh", False)]
@@ -0,0 +1,94 @@
+import json
+import threading
+
+from backend.services.admin_qa_service import AdminQAService
+
+
+def put(qa_id, question, next_id=None):
+    record = {"op": "put", "qa": {"id": qa_id, "question": question, "answer": f"answer {qa_id}"}}
+    record["next_id"] = next_id or qa_id + 1
+    return json.dumps(record) + "\n"
+
+
+def write_snapshot(path, count):
+    path.write_text(json.dumps({"qa_pairs": [
+        {"id": i + 1, "question": f"question {i + 1}", "answer": f"answer {i + 1}"} for i in range(count)
+    ], "next_id": count + 1}), encoding="utf-8")
+
+
+def make_admin(path, monkeypatch, compact_every=500):
+    monkeypatch.setenv("ADMIN_QA_JOURNAL_COMPACT_EVERY", str(compact_every))
+    return AdminQAService(qa_file_path=path, backend="json", storage_mode="journal")
+
+
+def questions(admin):
+    return [qa["question"] for qa in admin.qa_pairs]
+
+
+def test_torn_tail_is_dropped_and_appends_continue(tmp_path, monkeypatch):
+    path = tmp_path / "admin_qa.json"
+    write_snapshot(path, 1)
+    journal = path.with_suffix(".journal")
+    journal.write_text(put(2, "question 2") + put(3, "question 3")[:20], encoding="utf-8")
+
+    admin = make_admin(path, monkeypatch)
+    assert questions(admin) == ["question 1", "question 2"]
+    assert journal.read_text(encoding="utf-8") == put(2, "question 2")
+
+    admin.add_qa_pair("question 3", "answer 3")
+    assert questions(make_admin(path, monkeypatch)) == ["question 1", "question 2", "question 3"]
+
+
+def test_replay_after_a_crash_during_compaction(tmp_path, monkeypatch):
+    path = tmp_path / "admin_qa.json"
+    write_snapshot(path, 1)
+    # Crashed after renaming the journal, before writing the snapshot;
+    # edits then went on in a fresh journal
+    compacting = path.with_suffix(".journal.compacting")
+    compacting.write_text(put(2, "question 2") + put(1, "question 1 edited", 3), encoding="utf-8")
+    path.with_suffix(".journal").write_text(put(3, "question 3"), encoding="utf-8")
+
+    admin = make_admin(path, monkeypatch)
+    expected = ["question 1 edited", "question 2", "question 3"]
+    assert questions(admin) == expected
+
+    assert admin.compact()
+    admin._journal.wait_for_compaction()
+    assert not compacting.exists()
+    assert not path.with_suffix(".journal").exists()
+    assert [qa["question"] for qa in json.loads(path.read_text(encoding="utf-8"))["qa_pairs"]] == expected
+
+    # Crashed after writing the snapshot, before dropping the folded records
+    compacting.write_text(put(2, "question 2"), encoding="utf-8")
+    assert questions(make_admin(path, monkeypatch)) == expected
+
+
+def test_concurrent_compactions_keep_every_workers_edits(tmp_path, monkeypatch):
+    path = tmp_path / "admin_qa.json"
+    write_snapshot(path, 0)
+    workers = [make_admin(path, monkeypatch, compact_every=3) for _ in range(3)]
+    errors = []
+
+    def edit(worker_id, admin):
+        try:
+            for i in range(30):
+                admin.add_qa_pair(f"worker {worker_id} question {i}", "answer")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=edit, args=item) for item in enumerate(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for admin in workers:
+        admin._journal.wait_for_compaction()
+
+    assert not errors
+    reloaded = make_admin(path, monkeypatch)
+    assert len(reloaded.qa_pairs) == 90
+    assert len({qa["id"] for qa in reloaded.qa_pairs}) == 90
+
+    assert reloaded.save_qa_pairs()
+    assert not path.with_suffix(".journal").exists()
+    assert len(json.loads(path.read_text(encoding="utf-8"))["qa_pairs"]) == 90
@@ -0,0 +1,98 @@
+import json
+import random
+import re
+
+import pytest
+
+from backend.services.admin_qa_service import AdminQAService
+
+
+def reference_match(message, qa_pairs):
+    """The exact, partial and Jaccard passes over every pair, as before the index."""
+    message = message.lower().strip()
+    if not qa_pairs or not message:
+        return None
+    result = lambda qa, match_type: {
+        'id': qa['id'], 'question': qa['question'], 'answer': qa['answer'], 'match_type': match_type
+    }
+    for qa in qa_pairs:
+        if message == qa['question'].lower().strip():
+            return result(qa, 'exact')
+    user_words = set(re.findall(r'\w+', message))
+    for qa in qa_pairs:
+        question = qa['question'].lower().strip()
+        question_words = set(re.findall(r'\w+', question))
+        if (question in message or message in question) and user_words and question_words:
+            if len(user_words & question_words) / min(len(user_words), len(question_words)) >= 0.5:
+                return result(qa, 'partial')
+    best_match, best_score = None, 0
+    for qa in qa_pairs:
+        question_words = set(re.findall(r'\w+', qa['question'].lower().strip()))
+        if user_words and question_words:
+            score = len(user_words & question_words) / len(user_words | question_words)
+            if score > best_score and score >= 0.3:
+                best_match, best_score = result(qa, 'keyword'), score
+    return best_match
+
+
+@pytest.fixture
+def admin_file(tmp_path):
+    path = tmp_path / "admin_qa.json"
+    path.write_text(json.dumps({"qa_pairs": []}), encoding="utf-8")
+    return path
+
+
+def test_indexed_matching_equals_scanning_every_pair(admin_file):
+    rng = random.Random(0)
+    words = ["what", "is", "your", "price", "web", "design", "app", "seo", "team", "logo", "cost", "how"]
+
+    def sentence():
+        return " ".join(rng.choice(words) for _ in range(rng.randint(1, 5)))
+
+    admin = AdminQAService(qa_file_path=admin_file)
+    for i in range(40):
+        admin.add_qa_pair(sentence(), f"answer {i}")
+    for _ in range(10):
+        qa = rng.choice(admin.get_all_qa_pairs())
+        if rng.random() < 0.5:
+            admin.update_qa_pair(qa['id'], sentence(), "updated")
+        else:
+            admin.delete_qa_pair(qa['id'])
+
+    qa_pairs = admin.get_all_qa_pairs()
+    messages = [sentence() for _ in range(300)] + [qa['question'].upper() for qa in qa_pairs[:10]]
+    for message in messages:
+        assert admin.find_matching_qa(message) == reference_match(message, qa_pairs), message
+
+    reloaded = AdminQAService(qa_file_path=admin_file)
+    for message in messages:
+        assert reloaded.find_matching_qa(message) == reference_match(message, qa_pairs), message
+
+
+def test_ids_are_never_reused_after_a_delete(admin_file):
+    admin = AdminQAService(qa_file_path=admin_file)
+    first = admin.add_qa_pair("first", "answer")
+    second = admin.add_qa_pair("second", "answer")
+    assert admin.delete_qa_pair(second['id'])
+
+    third = admin.add_qa_pair("third", "answer")
+    assert third['id'] == second['id'] + 1
+    assert admin.get_qa_pair(second['id']) is None
+    assert admin.get_qa_pair(third['id'])['question'] == "third"
+
+    # The counter is persisted, so a deleted last pair's id stays retired
+    assert admin.delete_qa_pair(third['id'])
+    reloaded = AdminQAService(qa_file_path=admin_file)
+    assert reloaded.add_qa_pair("fourth", "answer")['id'] == third['id'] + 1
+    assert [qa['question'] for qa in reloaded.get_all_qa_pairs()] == ["first", "fourth"]
+    assert first['id'] == 1
+
+
+def test_updates_keep_the_pair_position(admin_file):
+    admin = AdminQAService(qa_file_path=admin_file)
+    ids = [admin.add_qa_pair(f"question {i}", "answer")['id'] for i in range(3)]
+
+    assert admin.update_qa_pair(ids[0], "edited", "edited answer")['question'] == "edited"
+    assert admin.update_qa_pair(999, "missing", "answer") is None
+    assert not admin.delete_qa_pair(999)
+    assert [qa['question'] for qa in admin.get_all_qa_pairs()] == ["edited", "question 1", "question 2"]
@@ -0,0 +1,126 @@
+import json
+import random
+import threading
+
+from backend.services.admin_qa_service import AdminQAService, _AdminIndex
+from backend.services.matching_pipeline import MatchQuery
+from backend.services.spelling_corrector import SpellingCorrector
+
+
+def index_state(index):
+    return (
+        list(index.pairs_by_id.values()),
+        index.next_id,
+        sorted((qa_id, entry['seq']) for qa_id, entry in index.indexed.items()),
+        {
+            language: (partition.size, partition.exact_index, partition.token_index)
+            for language, partition in index.partitions.items()
+        },
+    )
+
+
+def make_admin(tmp_path, count=30):
+    admin_file = tmp_path / "admin_qa.json"
+    admin_file.write_text(json.dumps({"qa_pairs": [
+        {"id": i + 1, "question": f"what is topic {i % 7} number {i}", "answer": f"answer {i}"}
+        for i in range(count)
+    ], "next_id": count + 1}), encoding="utf-8")
+    return AdminQAService(qa_file_path=admin_file, backend="json", storage_mode="snapshot")
+
+
+def test_edited_snapshot_leaves_the_original_unchanged():
+    rng = random.Random(0)
+    pairs = [{"id": i + 1, "question": f"what about item {i % 5} {i}", "answer": str(i)} for i in range(40)]
+    original = _AdminIndex(pairs, 41)
+    before = index_state(_AdminIndex(pairs, 41))
+
+    index = original
+    for step in range(30):
+        ids = list(index.pairs_by_id)
+        if step % 3 == 0:
+            edited = index.edited(put=[{"id": index.next_id, "question": f"new item {step}", "answer": "new"}])
+        elif step % 3 == 1:
+            qa_id = rng.choice(ids)
+            edited = index.edited(put=[dict(index.pairs_by_id[qa_id], question=f"changed item {step}")])
+        else:
+            edited = index.edited(deleted=[rng.choice(ids)])
+        # Every snapshot equals one built from scratch over the same pairs,
+        # apart from the list positions freed by deletes
+        fresh = _AdminIndex(list(edited.pairs_by_id.values()), edited.next_id)
+        assert index_state(edited)[:2] == index_state(fresh)[:2]
+        assert index_state(edited)[3] == index_state(fresh)[3]
+        index = edited
+
+    assert index_state(original) == before
+
+
+def test_edits_do_not_touch_the_served_snapshot(tmp_path):
+    admin = make_admin(tmp_path)
+    served = admin._index
+    version = admin.version
+
+    updated = admin.update_qa_pair(1, "how do refunds work", "refund answer")
+    admin.delete_qa_pair(2)
+    admin.add_qa_pair("when do you open", "open answer")
+
+    assert served.pairs_by_id[1]["question"] == "what is topic 0 number 0"
+    assert 2 in served.pairs_by_id
+    assert updated is not served.pairs_by_id[1]
+    assert admin.match(MatchQuery("how do refunds work"))["answer"] == "refund answer"
+    assert admin.version == version + 3
+    assert admin.changes_since(version, version + 3) == (
+        ["what is topic 0 number 0", "what is topic 1 number 1"],
+        ["how do refunds work", "when do you open"],
+    )
+
+
+def test_reload_on_another_thread_during_edits(tmp_path):
+    admin = make_admin(tmp_path)
+    errors = []
+    done = threading.Event()
+
+    def reload_repeatedly():
+        try:
+            while not done.is_set():
+                admin.load_qa_pairs()
+                pairs = admin.qa_pairs
+                assert len({qa["id"] for qa in pairs}) == len(pairs)
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=reload_repeatedly)
+    thread.start()
+    try:
+        for i in range(50):
+            qa = admin.add_qa_pair(f"question added {i}", f"added {i}")
+            admin.update_qa_pair(qa["id"], f"question edited {i}", f"edited {i}")
+    finally:
+        done.set()
+        thread.join()
+
+    assert not errors
+    assert admin.match(MatchQuery("question edited 49"))["answer"] == "edited 49"
+    assert len(admin.qa_pairs) == 80
+
+
+def test_spelling_update_while_correcting():
+    corrector = SpellingCorrector()
+    words = [f"pricing{i}" for i in range(200)]
+    corrector.update_source("admin", words)
+    errors = []
+
+    def update_repeatedly():
+        try:
+            for i in range(30):
+                corrector.update_source("admin", words[i % 2::2] + [f"extra{i}"])
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=update_repeatedly)
+    thread.start()
+    while thread.is_alive():
+        corrector.correct_text("pricimg17 pricng3")
+    thread.join()
+
+    assert not errors
+    assert corrector.correct("pricng3") == "pricing3"
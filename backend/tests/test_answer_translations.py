@@ -0,0 +1,106 @@
+import json
+import threading
+
+from backend.services.answer_translations import AnswerTranslations
+
+
+def stored(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def test_puts_are_served_at_once_and_written_in_one_batch(tmp_path):
+    path = tmp_path / "answer_translations.json"
+    translations = AnswerTranslations(path, flush_seconds=60)
+
+    translations.put("hi", "Hello", "नमस्ते")
+    translations.put("ta", "Hello", "வணக்கம்")
+    assert translations.get("hi", "Hello") == "नमस्ते"
+    assert not path.exists()
+
+    assert translations.flush()
+    assert stored(path) == {"hi": {"Hello": "नमस्ते"}, "ta": {"Hello": "வணக்கம்"}}
+    translations.close()
+
+
+def test_workers_keep_each_others_entries(tmp_path):
+    path = tmp_path / "answer_translations.json"
+    workers = [AnswerTranslations(path, flush_seconds=60) for _ in range(4)]
+
+    def fill(worker_id, worker):
+        for i in range(25):
+            worker.put("hi", f"answer {worker_id}-{i}", f"translation {worker_id}-{i}")
+            worker.flush()
+
+    threads = [threading.Thread(target=fill, args=item) for item in enumerate(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(stored(path)["hi"]) == 100
+    for worker in workers:
+        worker.reload()
+        assert worker.stats() == {"hi": 100}
+        worker.close()
+
+
+def test_reload_keeps_buffered_translations(tmp_path):
+    path = tmp_path / "answer_translations.json"
+    first = AnswerTranslations(path, flush_seconds=60)
+    second = AnswerTranslations(path, flush_seconds=60)
+
+    first.put("hi", "Hello", "नमस्ते")
+    first.flush()
+    second.put("hi", "Bye", "अलविदा")
+    second.reload()
+    assert second.get("hi", "Hello") == "नमस्ते"
+    assert second.get("hi", "Bye") == "अलविदा"
+
+    second.close()
+    assert stored(path) == {"hi": {"Hello": "नमस्ते", "Bye": "अलविदा"}}
+    first.close()
+
+
+def test_background_flush(tmp_path):
+    path = tmp_path / "answer_translations.json"
+    translations = AnswerTranslations(path, flush_seconds=0.01)
+    translations.put("hi", "Hello", "नमस्ते")
+
+    timer = translations._flush_timer
+    timer.join(5)
+    assert stored(path) == {"hi": {"Hello": "नमस्ते"}}
+    translations.close()
+
+
+def test_prune_drops_retired_answers_from_the_file(tmp_path):
+    path = tmp_path / "answer_translations.json"
+    path.write_text(json.dumps({"hi": {"Old": "पुराना", "Hello": "नमस्ते"}}), encoding="utf-8")
+    translations = AnswerTranslations(path, flush_seconds=60)
+    translations.put("hi", "Gone", "गया")
+
+    assert translations.prune(["Hello"]) == 1
+    assert translations.get("hi", "Old") is None
+    assert translations.get("hi", "Gone") is None
+    translations.close()
+    assert stored(path) == {"hi": {"Hello": "नमस्ते"}}
+
+
+def test_unreadable_file_is_never_overwritten(tmp_path):
+    path = tmp_path / "answer_translations.json"
+    path.write_text(json.dumps({"hi": {"Hello": "नमस्ते"}}), encoding="utf-8")
+    translations = AnswerTranslations(path, flush_seconds=60)
+
+    # Caught half-written, or mid hand-edit
+    path.write_text('{"hi": {"Hello": "नम', encoding="utf-8")
+    translations.reload()
+    assert translations.get("hi", "Hello") == "नमस्ते"
+
+    translations.put("hi", "Bye", "अलविदा")
+    assert not translations.flush()
+    assert translations.prune(["Bye"]) == 0
+    assert path.read_text(encoding="utf-8") == '{"hi": {"Hello": "नम'
+
+    path.write_text(json.dumps({"hi": {"Hello": "नमस्ते"}}), encoding="utf-8")
+    assert translations.flush()
+    assert stored(path) == {"hi": {"Hello": "नमस्ते", "Bye": "अलविदा"}}
+    translations.close()
@@ -0,0 +1,69 @@
+import json
+from typing import Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.routes import chat
+from backend.routes.auth import ADMIN_PASSWORD
+from backend.tests.conftest import LLM_QUESTION
+
+
+@pytest.fixture
+def client(monkeypatch, chatbot_service) -> TestClient:
+    monkeypatch.setattr(chat, "_chatbot_service", chatbot_service)
+    return TestClient(app)
+
+
+def parse_sse(body: str) -> List[Dict]:
+    """Split a Server-Sent Events body into {'event', 'data'} dicts."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append({"event": fields["event"], "data": json.loads(fields["data"])})
+    return events
+
+
+def test_stream_sends_tokens_then_done(client, fake_openai):
+    response = client.post("/api/chat/stream", json={"message": LLM_QUESTION})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    assert [event["event"] for event in events] == ["token"] * fake_openai.chunks + ["done"]
+    assert "".join(event["data"]["content"] for event in events[:-1]) == fake_openai.answer
+    done = events[-1]["data"]
+    assert done["message"] == fake_openai.answer
+    assert done["conversation_id"]
+    assert fake_openai.calls[0]["stream"] is True
+
+
+def test_stream_sends_cached_answer_as_one_message(client, fake_openai):
+    client.post("/api/chat/stream", json={"message": LLM_QUESTION})
+    events = parse_sse(client.post("/api/chat/stream", json={"message": LLM_QUESTION}).text)
+
+    assert [event["event"] for event in events] == ["message"]
+    assert events[0]["data"]["metadata"]["cache_hit"] is True
+    assert len(fake_openai.calls) == 1
+
+
+def test_stream_sends_error_event_on_failure(client, fake_openai):
+    fake_openai.error = RuntimeError("upstream down")
+    events = parse_sse(client.post("/api/chat/stream", json={"message": LLM_QUESTION}).text)
+
+    assert [event["event"] for event in events] == ["error"]
+    assert events[0]["data"]["metadata"]["source"] == "error"
+
+
+def test_metrics_require_admin_token(client):
+    assert client.get("/api/chat/metrics").status_code == 401
+    assert client.get(
+        "/api/chat/metrics", headers={"Authorization": "Bearer wrong"}
+    ).status_code == 401
+
+    response = client.get(
+        "/api/chat/metrics", headers={"Authorization": f"Bearer {ADMIN_PASSWORD}"}
+    )
+    assert response.status_code == 200
+    assert set(response.json()) >= {"llm", "matching", "cache", "translations", "conversations"}
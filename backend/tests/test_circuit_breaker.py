@@ -0,0 +1,173 @@
+import asyncio
+
+import pytest
+
+from backend.services.circuit_breaker import CircuitBreaker
+from backend.services.llm_limiter import ConcurrencyLimiter
+from backend.tests.conftest import LLM_QUESTION
+from backend.tests.test_llm_client import status_error
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_consecutive_failures_open_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=3, clock=FakeClock())
+    for _ in range(2):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    breaker.record_success()
+    for _ in range(3):
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_half_open_probe_closes_or_reopens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=30, clock=clock)
+    breaker.allow_request()
+    breaker.record_failure()
+
+    clock.now = 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 60
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats()["opened"] == 2
+
+
+def test_slow_successes_count_as_failures():
+    breaker = CircuitBreaker(failure_threshold=2, latency_threshold_seconds=1, clock=FakeClock())
+    for _ in range(2):
+        breaker.allow_request()
+        breaker.record_success(latency_seconds=5)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.stats()["latency_breaches"] == 2
+
+
+def test_lost_probe_is_given_up_after_reset_timeout():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=30, clock=clock)
+    breaker.allow_request()
+    breaker.record_failure()
+
+    clock.now = 30
+    assert breaker.allow_request()
+    clock.now = 59
+    assert not breaker.allow_request()
+    clock.now = 60
+    assert breaker.allow_request()
+
+
+def test_open_circuit_stops_llm_calls(chatbot_service, fake_openai):
+    fake_openai.error = status_error(503)
+
+    async def scenario():
+        failures = [
+            await chatbot_service.process_message(f"{LLM_QUESTION} {i}", f"conversation-{i}")
+            for i in range(2)
+        ]
+        degraded = await chatbot_service.process_message(LLM_QUESTION, "conversation-3")
+        return failures, degraded
+
+    failures, degraded = asyncio.run(scenario())
+    assert [response["metadata"]["source"] for response in failures] == ["error", "error"]
+    assert degraded["metadata"]["source"] == "degraded"
+    assert len(fake_openai.calls) == 2
+    assert chatbot_service.get_llm_stats()["circuit"]["state"] == CircuitBreaker.OPEN
+
+
+def test_client_errors_leave_the_circuit_closed(chatbot_service, fake_openai):
+    fake_openai.error = status_error(400)
+
+    async def scenario():
+        return [
+            await chatbot_service.process_message(f"{LLM_QUESTION} {i}", f"conversation-{i}")
+            for i in range(4)
+        ]
+
+    responses = asyncio.run(scenario())
+    assert [response["metadata"]["source"] for response in responses] == ["error"] * 4
+    assert len(fake_openai.calls) == 4
+    circuit = chatbot_service.get_llm_stats()["circuit"]
+    assert (circuit["state"], circuit["consecutive_failures"]) == (CircuitBreaker.CLOSED, 0)
+
+
+@pytest.fixture
+def half_open_breaker(chatbot_service):
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=30, clock=clock)
+    breaker.allow_request()
+    breaker.record_failure()
+    clock.now = 30
+    chatbot_service.llm_breaker = breaker
+    return breaker
+
+
+def test_probe_refused_by_the_limiter_is_given_back(chatbot_service, fake_openai, half_open_breaker):
+    chatbot_service.llm_limiter = ConcurrencyLimiter(max_concurrency=0, max_queue=0)
+
+    response = asyncio.run(chatbot_service.process_message(LLM_QUESTION, "conversation-1"))
+    assert response["metadata"]["source"] == "error"
+    assert fake_openai.calls == []
+    assert half_open_breaker.state == CircuitBreaker.HALF_OPEN
+    assert half_open_breaker.allow_request()
+
+
+def test_probe_cancelled_while_queued_is_given_back(chatbot_service, fake_openai, half_open_breaker):
+    limiter = ConcurrencyLimiter(max_concurrency=0, max_queue=1, queue_timeout_seconds=60)
+    chatbot_service.llm_limiter = limiter
+
+    async def scenario():
+        task = asyncio.create_task(chatbot_service.process_message(LLM_QUESTION, "conversation-1"))
+        while limiter.queue_depth == 0:
+            await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert fake_openai.calls == []
+    assert half_open_breaker.allow_request()
+
+
+def test_slow_stream_consumer_does_not_trip_the_breaker(chatbot_service, fake_openai):
+    breaker = CircuitBreaker(failure_threshold=1, latency_threshold_seconds=0.05)
+    chatbot_service.llm_breaker = breaker
+
+    async def consume(message: str, conversation_id: str, pause: float):
+        events = []
+        async for event in chatbot_service.process_message_stream(message, conversation_id):
+            events.append(event["event"])
+            await asyncio.sleep(pause)
+        return events
+
+    async def scenario():
+        # Each answer takes three times the latency threshold to read
+        slow_reads = [await consume(f"{LLM_QUESTION} {i}", f"conversation-{i}", 0.05) for i in range(2)]
+        # An upstream slow to open the stream still counts
+        fake_openai.delays = [0.1]
+        slow_open = await consume(f"{LLM_QUESTION} 2", "conversation-2", 0)
+        return slow_reads, slow_open
+
+    slow_reads, slow_open = asyncio.run(scenario())
+    assert all(events[-1] == "done" for events in slow_reads)
+    assert slow_open[-1] == "done"
+    assert breaker.latency_breaches == 1
+    assert breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,92 @@
+import asyncio
+from types import SimpleNamespace
+
+from backend.services import context_builder
+from backend.services.chatbot_service import ChatbotService
+from backend.services.context_builder import TOKENS_PER_MESSAGE, TOKENS_PER_REPLY, ContextBuilder, estimate_tokens
+
+
+def turns(count, words=10):
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"turn {i} " + "word " * words}
+        for i in range(count)
+    ]
+
+
+def test_history_is_windowed_newest_first_within_the_budget():
+    history = turns(20)
+    builder = ContextBuilder("test-model", budget_tokens=100)
+
+    messages, total = builder.build("You are a helpful assistant.", history)
+
+    assert messages[0] == {"role": "system", "content": "You are a helpful assistant."}
+    window = messages[1:]
+    assert 1 < len(window) < len(history)
+    assert window == [{"role": m["role"], "content": m["content"]} for m in history[-len(window):]]
+    assert total <= 100
+    # One more turn would not have fit
+    assert total + builder.count_message(**history[-len(window) - 1]) > 100
+    assert total == TOKENS_PER_REPLY + sum(builder.count_message(m["role"], m["content"]) for m in messages)
+
+
+def test_system_prompt_and_current_message_are_always_sent():
+    system_prompt = "rules " * 200
+    history = turns(5)
+    builder = ContextBuilder("test-model", budget_tokens=50)
+
+    messages, total = builder.build(system_prompt, history)
+
+    # Over budget on their own: only the pinned messages go out
+    assert [m["role"] for m in messages] == ["system", "user"]
+    assert messages[-1]["content"] == history[-1]["content"]
+    assert total > 50
+
+
+def test_oversized_current_message_is_sent_alone():
+    history = turns(3) + [{"role": "user", "content": "question " * 500}]
+    builder = ContextBuilder("test-model", budget_tokens=200)
+
+    messages, total = builder.build("Be brief.", history)
+
+    assert messages[1:] == [history[-1]]
+    assert total == (
+        TOKENS_PER_REPLY + builder.count_message("system", "Be brief.")
+        + builder.count_message("user", history[-1]["content"])
+    )
+
+
+def test_indic_text_is_not_undercounted():
+    assert estimate_tokens("hello world!") == 3
+    # 12 Devanagari code points, one token each, and the space
+    assert estimate_tokens("नमस्ते दुनिया") == 13
+    builder = ContextBuilder("test-model", budget_tokens=100)
+    assert builder.count_message("user", "नमस्ते") == TOKENS_PER_MESSAGE + estimate_tokens("user") + 6
+
+
+def test_tokenizer_is_loaded_off_the_event_loop(monkeypatch):
+    calls = []
+
+    def load(model):
+        try:
+            asyncio.get_running_loop()
+            calls.append("on loop")
+        except RuntimeError:
+            calls.append("off loop")
+        return lambda text: 1
+
+    monkeypatch.setattr(context_builder, "_load_tokenizer", load)
+    builder = ContextBuilder("test-model", budget_tokens=100)
+    estimated = builder.count_message("user", "hello there, how are you?")
+    assert calls == []
+
+    asyncio.run(ChatbotService.start(SimpleNamespace(context_builder=builder)))
+
+    assert calls == ["off loop"]
+    assert builder.count_message("user", "hello there, how are you?") == TOKENS_PER_MESSAGE + 2 != estimated
+
+
+def test_estimates_are_kept_when_the_tokenizer_cannot_load(monkeypatch):
+    monkeypatch.setattr(context_builder, "_load_tokenizer", lambda model: None)
+    builder = ContextBuilder("test-model", budget_tokens=100)
+    assert not builder.load_tokenizer()
+    assert builder.count_message("user", "hello") == TOKENS_PER_MESSAGE + estimate_tokens("user") + estimate_tokens("hello")
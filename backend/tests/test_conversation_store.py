@@ -0,0 +1,175 @@
+import asyncio
+import time
+
+import pytest
+
+from backend.services.conversation_store import (
+    ConversationStore, InMemoryConversationStore, SQLiteConversationStore
+)
+
+
+def message(content, role="user"):
+    return {"role": role, "content": content, "timestamp": None}
+
+
+def contents(messages):
+    return [m["content"] for m in messages]
+
+
+def stored_count(store):
+    return store._conn.execute("SELECT COUNT(*) FROM conversation_messages").fetchone()[0]
+
+
+def test_store_interface_is_abstract():
+    with pytest.raises(TypeError):
+        ConversationStore()
+
+
+def test_appends_are_written_in_one_batch_and_read_back(tmp_path):
+    async def scenario():
+        store = SQLiteConversationStore(tmp_path / "conversations.sqlite3", flush_interval_seconds=60)
+        for i in range(5):
+            await store.append("a", message(f"turn {i}"))
+        # Buffered turns are served before they are written
+        assert contents(await store.get("a")) == [f"turn {i}" for i in range(5)]
+        assert store.stats()["pending_writes"] == 5
+
+        await store._flush()
+        assert store.stats() == {"pending_writes": 0, "flushed_batches": 1, "flushed_messages": 5}
+        assert contents(await store.get("a")) == [f"turn {i}" for i in range(5)]
+        await store.close()
+
+    asyncio.run(scenario())
+
+
+def test_full_batch_is_written_without_waiting(tmp_path):
+    async def scenario():
+        store = SQLiteConversationStore(
+            tmp_path / "conversations.sqlite3", flush_interval_seconds=60, max_batch_size=3
+        )
+        for i in range(3):
+            await store.append("a", message(f"turn {i}"))
+        for _ in range(100):
+            if store.flushed_messages == 3:
+                break
+            await asyncio.sleep(0.01)
+        assert store.flushed_batches == 1
+        await store.close()
+
+    asyncio.run(scenario())
+
+
+def test_close_writes_buffered_appends(tmp_path):
+    path = tmp_path / "conversations.sqlite3"
+
+    async def scenario():
+        store = SQLiteConversationStore(path, flush_interval_seconds=60)
+        await store.append("a", message("hello"))
+        await store.append("a", message("hi there", role="assistant"))
+        await store.close()
+
+        reopened = SQLiteConversationStore(path)
+        history = await reopened.get("a")
+        await reopened.close()
+        return history
+
+    assert asyncio.run(scenario()) == [message("hello"), message("hi there", role="assistant")]
+
+
+def test_batch_written_again_is_not_duplicated(tmp_path):
+    async def scenario():
+        store = SQLiteConversationStore(tmp_path / "conversations.sqlite3", flush_interval_seconds=60)
+        for i in range(3):
+            await store.append("a", message(f"turn {i}"))
+        batch = list(store._pending)
+        await store._flush()
+        # As if the writer had been cancelled after the rows were committed
+        store._flushing = batch
+        await store._flush()
+
+        assert stored_count(store) == 3
+        assert contents(await store.get("a")) == ["turn 0", "turn 1", "turn 2"]
+        await store.close()
+
+    asyncio.run(scenario())
+
+
+def test_idle_conversations_are_purged_whole(tmp_path):
+    async def scenario():
+        store = SQLiteConversationStore(
+            tmp_path / "conversations.sqlite3", idle_ttl_seconds=3600, flush_interval_seconds=60
+        )
+        for conversation_id in ("idle", "live"):
+            await store.append(conversation_id, message("first"))
+        await store._flush()
+
+        # "idle" has had no message for two hours; "live" started two hours
+        # ago but has just had another one
+        old = time.time() - 7200
+        with store._conn:
+            store._conn.execute("UPDATE conversation_messages SET created_at = ?", (old,))
+            store._conn.execute("UPDATE conversations SET last_active = ?", (old,))
+        await store.append("live", message("second"))
+        store._last_purge = 0
+        await store._flush()
+
+        assert await store.get("idle") == []
+        assert contents(await store.get("live")) == ["first", "second"]
+        await store.close()
+
+    asyncio.run(scenario())
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_least_recently_used_conversations_are_evicted_first():
+    async def scenario():
+        store = InMemoryConversationStore(max_conversations=2)
+        await store.append("a", message("first"))
+        await store.append("b", message("first"))
+        # Reading "a" makes "b" the least recently used
+        await store.get("a")
+        await store.append("c", message("first"))
+        return store, [await store.get(conversation_id) for conversation_id in ("a", "b", "c")]
+
+    store, histories = asyncio.run(scenario())
+    assert [contents(history) for history in histories] == [["first"], [], ["first"]]
+    assert store.stats()["evicted_lru"] == 1
+
+
+def test_long_conversations_keep_their_latest_messages():
+    async def scenario():
+        store = InMemoryConversationStore(max_messages=3)
+        for i in range(5):
+            await store.append("a", message(f"turn {i}"))
+        return store, await store.get("a")
+
+    store, history = asyncio.run(scenario())
+    assert contents(history) == ["turn 2", "turn 3", "turn 4"]
+    assert store.stats()["trimmed_messages"] == 2
+
+
+def test_idle_conversations_expire_and_reads_keep_them_alive():
+    clock = FakeClock()
+
+    async def scenario():
+        store = InMemoryConversationStore(idle_ttl_seconds=60, clock=clock)
+        await store.append("idle", message("first"))
+        await store.append("live", message("first"))
+        clock.now = 50
+        await store.get("live")
+        clock.now = 100
+        return store, await store.get("idle"), await store.get("live")
+
+    store, idle, live = asyncio.run(scenario())
+    assert idle == []
+    assert contents(live) == ["first"]
+    assert store.stats() == {
+        "conversations": 1, "messages": 1, "evicted_lru": 0, "evicted_idle": 1, "trimmed_messages": 0
+    }
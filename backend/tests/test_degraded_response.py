@@ -0,0 +1,66 @@
+import asyncio
+import json
+
+import pytest
+
+from backend.services.matching_pipeline import MatchQuery
+from backend.services.qa_service import QAService
+
+# Shares one of three words with the first question: a TF-IDF similarity
+# of about 0.3, just under the ranker threshold used below
+WEAK_MATCH = "redesign timing"
+
+
+@pytest.fixture
+def tfidf_qa_service(tmp_path) -> QAService:
+    qa_file = tmp_path / "predefined_qa.json"
+    qa_file.write_text(json.dumps({"questions": [
+        {
+            "question": "How long does a website redesign take?",
+            "answer": "About six weeks.",
+            "keywords": ["website redesign", "timeline"]
+        },
+        {
+            "question": "Do you run social media campaigns?",
+            "answer": "Yes, on every major platform.",
+            "keywords": ["social media", "campaign"]
+        }
+    ]}), encoding="utf-8")
+    service = QAService(qa_file_path=qa_file, backend="json", ranker="tfidf")
+    service.ranker_threshold = 0.35
+    return service
+
+
+def test_ranker_threshold_can_be_lowered_per_call(tfidf_qa_service):
+    query = MatchQuery(WEAK_MATCH)
+
+    assert tfidf_qa_service.match(query) is None
+    match = tfidf_qa_service.match(query, ranker_threshold=0.15)
+    assert match["answer"] == "About six weeks."
+
+
+def test_degraded_response_falls_back_to_weaker_predefined_match(chatbot_service, tfidf_qa_service):
+    chatbot_service.qa_service = tfidf_qa_service
+
+    response = asyncio.run(chatbot_service._degraded_response(MatchQuery(WEAK_MATCH, "en"), "en"))
+
+    assert response["answer_source"] == "predefined"
+    assert response["message"] == "About six weeks."
+    assert response["metadata"]["source"] == "degraded"
+
+
+def test_degraded_response_without_any_match_is_canned(chatbot_service, tfidf_qa_service):
+    chatbot_service.qa_service = tfidf_qa_service
+
+    response = asyncio.run(chatbot_service._degraded_response(MatchQuery("zzz qqq", "en"), "en"))
+
+    assert response["answer_source"] == "ai"
+    assert "temporarily unavailable" in response["message"]
+
+
+def test_degraded_response_does_not_match_faq_keywords_inside_words(chatbot_service):
+    # "rate" is a keyword of the fees topic
+    response = asyncio.run(chatbot_service._degraded_response(MatchQuery("corporate gifting", "en"), "en"))
+
+    assert response["answer_source"] == "ai"
+    assert "temporarily unavailable" in response["message"]
@@ -0,0 +1,71 @@
+import json
+import random
+import re
+
+from backend.services.faq_service import FAQService
+from backend.services.keyword_matcher import KeywordAutomaton
+
+FAQS = {
+    "apps": {"keywords": ["app", "mobile app"], "answer": "apps"},
+    "leadership": {"keywords": ["ceo", "chief executive"], "answer": "leadership"},
+    "pricing": {"keywords": ["price", "cost"], "answer": "pricing"},
+    "web": {"keywords": ["web design", "website", "app"], "answer": "web"},
+}
+
+
+def reference_topic(message, faqs):
+    """The first topic with a keyword matching as a whole word, as with one regex per keyword."""
+    for topic, faq_data in faqs.items():
+        for keyword in faq_data.get("keywords", []):
+            if re.search(r"\b" + re.escape(keyword.lower()) + r"\b", message.lower()):
+                return topic
+    return None
+
+
+def make_service(tmp_path, faqs=FAQS):
+    faq_file = tmp_path / "faqs.json"
+    faq_file.write_text(json.dumps(faqs), encoding="utf-8")
+    return FAQService(faq_file_path=faq_file)
+
+
+def topic(faq, message):
+    match = faq.find_matching_faq(message)
+    return match and match["topic"]
+
+
+def test_keywords_match_whole_words_only(tmp_path):
+    faq = make_service(tmp_path)
+
+    assert topic(faq, "Do you build an APP?") == "apps"
+    assert topic(faq, "I am happy with the approach") is None
+    assert topic(faq, "Who are the CEOs?") is None
+    assert topic(faq, "who is the ceo") == "leadership"
+    assert topic(faq, "our chief executive officer") == "leadership"
+    assert topic(faq, "websites and web designers") is None
+    assert topic(faq, "pricey costs") is None
+    assert topic(faq, "what does it cost?") == "pricing"
+
+
+def test_earliest_topic_in_file_order_wins(tmp_path):
+    faq = make_service(tmp_path)
+
+    assert topic(faq, "website or app, what is the price") == "apps"
+    assert topic(faq, "website price") == "pricing"
+    assert faq.find_matching_faq("web design") == {"topic": "web", "answer": "web"}
+
+
+def test_automaton_agrees_with_a_regex_per_keyword(tmp_path):
+    rng = random.Random(0)
+    words = ["app", "apps", "happy", "ceo", "web", "design", "website", "price", "cost", "costs", "chief", "executive"]
+    faq = make_service(tmp_path)
+    for _ in range(300):
+        message = rng.choice(["", " ", ", "]).join(rng.choice(words) for _ in range(rng.randint(1, 5)))
+        assert topic(faq, message) == reference_topic(message, FAQS), message
+
+
+def test_automaton_reports_overlapping_keywords():
+    automaton = KeywordAutomaton(["he", "she", "hers", "his"])
+
+    assert {automaton.keywords[k] for k in automaton.search("ushers")} == {"he", "hers", "she"}
+    assert automaton.search("ushers", whole_word=True) == set()
+    assert {automaton.keywords[k] for k in automaton.search("she and his", whole_word=True)} == {"his", "she"}
@@ -0,0 +1,47 @@
+import os
+
+from backend.services.file_watcher import FileWatcher
+
+
+def touch(path, content):
+    path.write_text(content, encoding="utf-8")
+    stat = os.stat(path)
+    # Make sure the stamp moves even on coarse mtime clocks
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_after_reload_runs_once_per_poll_with_reloads(tmp_path):
+    first = tmp_path / "first.json"
+    second = tmp_path / "second.json"
+    first.write_text("{}", encoding="utf-8")
+    second.write_text("{}", encoding="utf-8")
+
+    calls = []
+    watcher = FileWatcher(after_reload=lambda: calls.append("after"))
+    watcher.watch(first, lambda: calls.append("first"))
+    watcher.watch(second, lambda: calls.append("second"))
+
+    assert watcher.check() == 0
+    assert calls == []
+
+    touch(first, '{"a": 1}')
+    touch(second, '{"b": 1}')
+    assert watcher.check() == 2
+    assert calls == ["first", "second", "after"]
+
+
+def test_after_reload_errors_are_contained(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text("{}", encoding="utf-8")
+
+    def fail():
+        raise RuntimeError("rebuild failed")
+
+    reloads = []
+    watcher = FileWatcher(after_reload=fail)
+    watcher.watch(path, lambda: reloads.append(1))
+    touch(path, '{"a": 1}')
+
+    assert watcher.check() == 1
+    assert reloads == [1]
+    assert watcher.stats()["failures"] == 0
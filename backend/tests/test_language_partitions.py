@@ -0,0 +1,171 @@
+import json
+import sqlite3
+
+import pytest
+
+from backend.services.admin_qa_service import AdminQAService
+from backend.services.faq_service import FAQService
+from backend.services.matching_pipeline import MatchingPipeline, MatchQuery
+from backend.services.qa_service import QAService
+from backend.services.sqlite_qa_store import _SCHEMA, SQLiteAdminQAStore
+from backend.services.tfidf_ranker import numpy_available
+
+# Hindi and Marathi share the Devanagari script, so only the languages of
+# the partitions tell their entries apart; Marathi comes first in each file
+QUESTION = "फीस कितनी है"
+
+
+@pytest.fixture
+def sqlite_path(tmp_path, monkeypatch):
+    db_path = tmp_path / "qa.sqlite3"
+    monkeypatch.setenv("QA_SQLITE_PATH", str(db_path))
+    return db_path
+
+
+def test_faq_matches_only_the_message_languages(tmp_path):
+    faq_file = tmp_path / "faqs.json"
+    faq_file.write_text(json.dumps({
+        "fees_mr": {"keywords": ["फीस"], "answer": "mr", "language": "mr"},
+        "fees_hi": {"keywords": ["फीस"], "answer": "hi", "language": "hi"},
+        "fees_en": {"keywords": ["fees"], "answer": "en"},
+    }), encoding="utf-8")
+    faq = FAQService(faq_file_path=faq_file)
+
+    assert faq.match(MatchQuery(QUESTION, "hi"))["answer"] == "hi"
+    assert faq.match(MatchQuery(QUESTION, "mr"))["answer"] == "mr"
+    assert faq.match(MatchQuery("फीस fees"))["answer"] == "hi"
+    assert faq.match(MatchQuery("what are the fees"))["answer"] == "en"
+    assert faq.get_languages() == {"en", "hi", "mr"}
+
+
+@pytest.mark.parametrize("backend, ranker", [
+    ("json", "keyword"),
+    ("sqlite", "keyword"),
+    pytest.param("json", "tfidf", marks=pytest.mark.skipif(not numpy_available(), reason="needs numpy")),
+])
+def test_predefined_matches_only_the_message_languages(tmp_path, sqlite_path, backend, ranker):
+    qa_file = tmp_path / "predefined_qa.json"
+    qa_file.write_text(json.dumps({"questions": [
+        {"question": QUESTION, "answer": "mr", "keywords": ["फीस"], "language": "mr"},
+        {"question": QUESTION, "answer": "hi", "keywords": ["फीस"], "language": "hi"},
+        {"question": "What are the fees?", "answer": "en", "keywords": ["fees"]},
+    ]}), encoding="utf-8")
+    qa = QAService(qa_file_path=qa_file, backend=backend, ranker=ranker)
+
+    for message in (QUESTION, "फीस बताइए"):
+        assert qa.match(MatchQuery(message, "hi"))["answer"] == "hi"
+        assert qa.match(MatchQuery(message, "mr"))["answer"] == "mr"
+    assert qa.match(MatchQuery("fees please"))["answer"] == "en"
+    assert qa.get_languages() == {"en", "hi", "mr"}
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_admin_matches_only_the_message_languages(tmp_path, sqlite_path, backend):
+    admin_file = tmp_path / "admin_qa.json"
+    admin_file.write_text(json.dumps({"qa_pairs": [
+        {"id": 1, "question": QUESTION, "answer": "mr", "language": "mr"},
+        {"id": 2, "question": QUESTION, "answer": "hi", "language": "hi"},
+        {"id": 3, "question": "What are the fees?", "answer": "en"},
+    ], "next_id": 4}), encoding="utf-8")
+    admin = AdminQAService(qa_file_path=admin_file, backend=backend, storage_mode="snapshot")
+
+    assert admin.match(MatchQuery(QUESTION, "hi"))["answer"] == "hi"
+    assert admin.match(MatchQuery(QUESTION, "mr"))["answer"] == "mr"
+    assert admin.match(MatchQuery("फीस कितनी", "hi"))["answer"] == "hi"
+    assert admin.match(MatchQuery("what are the fees"))["answer"] == "en"
+    assert admin.get_languages() == {"en", "hi", "mr"}
+
+    admin.add_qa_pair("தொகை எவ்வளவு", "ta")
+    assert admin.get_languages() == {"en", "hi", "mr", "ta"}
+    assert admin.match(MatchQuery("தொகை எவ்வளவு"))["answer"] == "ta"
+    admin.delete_qa_pair(3)
+    assert admin.get_languages() == {"hi", "mr", "ta"}
+    assert admin.match(MatchQuery("what are the fees")) is None
+
+
+def test_exact_question_map_respects_the_requested_language(tmp_path):
+    admin_file = tmp_path / "admin_qa.json"
+    admin_file.write_text(json.dumps({"qa_pairs": [
+        {"id": 1, "question": QUESTION, "answer": "mr", "language": "mr"},
+        {"id": 2, "question": QUESTION, "answer": "hi", "language": "hi"},
+    ], "next_id": 3}), encoding="utf-8")
+    admin = AdminQAService(qa_file_path=admin_file, backend="json", storage_mode="snapshot")
+    pipeline = MatchingPipeline(version=lambda: admin.version)
+    pipeline.add_tier("admin", admin.match, admin.get_all_questions, languages=admin.get_languages)
+    pipeline.rebuild(admin.version)
+
+    assert pipeline.match(MatchQuery(QUESTION, "hi"))[1]["answer"] == "hi"
+    assert pipeline.stats()["exact"]["matches"] == 1
+    assert pipeline.match(MatchQuery(QUESTION, "mr"))[1]["answer"] == "mr"
+    assert pipeline.match(MatchQuery(QUESTION))[1]["answer"] == "hi"
+    assert pipeline.stats()["exact"]["matches"] == 2
+
+
+def test_sqlite_store_adds_language_column(sqlite_path):
+    # The schema as it was before the language columns
+    conn = sqlite3.connect(str(sqlite_path))
+    conn.executescript(_SCHEMA.replace(",\n    language TEXT NOT NULL DEFAULT ''", ""))
+    conn.execute("INSERT INTO admin_qa VALUES (1, 1, ?, 'hi', ?)", (QUESTION, QUESTION))
+    conn.execute("INSERT INTO meta VALUES ('predefined_source', 'old')")
+    conn.commit()
+    conn.close()
+
+    store = SQLiteAdminQAStore(sqlite_path)
+    assert store.languages() == {"hi"}
+    assert store.find_exact(QUESTION, frozenset({"hi"}))["answer"] == "hi"
+    assert store.find_exact(QUESTION, frozenset({"mr"})) is None
+    assert store.find_candidates({"फीस"}, frozenset({"hi"}))[0]['qa']['answer'] == "hi"
+    assert store._get_meta("predefined_source") is None
+    store.close()
+
+
+# Keywords in another script than the rest of their entry are searched for
+# messages in that script
+MIXED_MESSAGE = "आपकी कीमत क्या है"
+
+
+def test_faq_keywords_match_in_their_own_script(tmp_path):
+    faq_file = tmp_path / "faqs.json"
+    faq_file.write_text(json.dumps({
+        "fees": {"keywords": ["fees", "price", "कीमत", "शुल्क"], "answer": "fees"},
+    }), encoding="utf-8")
+    faq = FAQService(faq_file_path=faq_file)
+
+    assert faq.find_matching_faq(MIXED_MESSAGE)["topic"] == "fees"
+    assert faq.find_matching_faq("what is the price")["topic"] == "fees"
+    assert faq.get_languages() == {"en", "hi"}
+
+
+@pytest.mark.parametrize("backend, ranker", [
+    ("json", "keyword"),
+    ("sqlite", "keyword"),
+    pytest.param("json", "tfidf", marks=pytest.mark.skipif(not numpy_available(), reason="needs numpy")),
+])
+def test_predefined_keywords_match_in_their_own_script(tmp_path, sqlite_path, backend, ranker):
+    qa_file = tmp_path / "predefined_qa.json"
+    qa_file.write_text(json.dumps({"questions": [
+        {"question": "What are your fees?", "answer": "fees", "keywords": ["fees", "कीमत"]},
+    ]}), encoding="utf-8")
+    qa = QAService(qa_file_path=qa_file, backend=backend, ranker=ranker)
+
+    # One shared word out of several scores low under TF-IDF
+    assert qa.find_answer(MIXED_MESSAGE, ranker_threshold=0.1)["answer"] == "fees"
+    assert qa.find_answer("fees please")["answer"] == "fees"
+    assert qa.get_languages() == {"en", "hi"}
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_admin_question_words_match_in_their_own_script(tmp_path, sqlite_path, backend):
+    admin_file = tmp_path / "admin_qa.json"
+    admin_file.write_text(json.dumps({"qa_pairs": [
+        {"id": 1, "question": "What is the कीमत of the course?", "answer": "fees"},
+    ], "next_id": 2}), encoding="utf-8")
+    admin = AdminQAService(qa_file_path=admin_file, backend=backend, storage_mode="snapshot")
+
+    assert admin.get_languages() == {"en", "hi"}
+    assert admin.find_matching_qa("कीमत")["answer"] == "fees"
+    admin.update_qa_pair(1, "What is the course fee?", "fees")
+    assert admin.get_languages() == {"en"}
+    assert admin.find_matching_qa("कीमत") is None
+    admin.delete_qa_pair(1)
+    assert admin.get_languages() == set()
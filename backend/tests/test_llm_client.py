@@ -0,0 +1,254 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import openai
+import pytest
+
+from backend.services.llm_client import LLMClient, create_openai_client
+
+REQUEST = httpx.Request("POST", "http://stub/v1/chat/completions")
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+def status_error(status_code):
+    response = httpx.Response(status_code, request=REQUEST)
+    return openai.APIStatusError(f"status {status_code}", response=response, body=None)
+
+
+def make_client(fake_openai, **kwargs):
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    client = LLMClient(fake_openai, sleep=sleep, rng=random.Random(0), **kwargs)
+    return client, sleeps
+
+
+def answer(response):
+    return response.choices[0].message.content
+
+
+def test_rate_limits_and_server_errors_are_retried_with_backoff(fake_openai):
+    fake_openai.failures = [status_error(429), status_error(503), openai.APIConnectionError(request=REQUEST)]
+    client, sleeps = make_client(fake_openai, max_retries=3, retry_base_delay=0.25, retry_max_delay=0.4)
+
+    response = asyncio.run(client.create(model="m", messages=MESSAGES))
+
+    assert answer(response) == fake_openai.answer
+    assert len(fake_openai.calls) == 4
+    assert client.stats()["retries"] == 3
+    # Full jitter under a cap that doubles per retry, up to the maximum
+    assert len(sleeps) == 3
+    assert all(0 <= delay <= cap for delay, cap in zip(sleeps, [0.25, 0.4, 0.4]))
+
+
+def test_retries_give_up_after_max_retries(fake_openai):
+    fake_openai.failures = [status_error(500)] * 5
+    client, sleeps = make_client(fake_openai, max_retries=2)
+
+    with pytest.raises(openai.APIStatusError):
+        asyncio.run(client.create(model="m", messages=MESSAGES))
+    assert len(fake_openai.calls) == 3
+    assert len(sleeps) == 2
+
+
+def test_client_errors_are_not_retried(fake_openai):
+    fake_openai.failures = [status_error(400)]
+    client, sleeps = make_client(fake_openai, max_retries=2)
+
+    with pytest.raises(openai.APIStatusError):
+        asyncio.run(client.create(model="m", messages=MESSAGES))
+    assert len(fake_openai.calls) == 1
+    assert sleeps == []
+
+
+def warmed_up(fake_openai, latency):
+    client, _ = make_client(fake_openai, hedge=True, hedge_min_samples=5)
+    for _ in range(5):
+        client.latencies.record(latency)
+    return client
+
+
+def test_no_hedge_before_the_hedge_delay(fake_openai):
+    client = warmed_up(fake_openai, latency=1.0)
+
+    response = asyncio.run(client.create(model="m", messages=MESSAGES))
+
+    assert answer(response) == fake_openai.answer
+    assert len(fake_openai.calls) == 1
+    assert client.stats()["hedged"] == 0
+
+
+def test_hedge_fires_after_the_delay_and_the_loser_is_cancelled(fake_openai):
+    client = warmed_up(fake_openai, latency=0.05)
+    # The first request stalls; the hedge answers at once
+    fake_openai.delays = [30, 0]
+
+    async def scenario():
+        call = asyncio.ensure_future(client.create(model="m", messages=MESSAGES))
+        await asyncio.sleep(0.01)
+        assert len(fake_openai.calls) == 1
+        response = await asyncio.wait_for(call, 5)
+        await asyncio.sleep(0)
+        return response
+
+    response = asyncio.run(scenario())
+    assert answer(response) == fake_openai.answer
+    assert len(fake_openai.calls) == 2
+    assert fake_openai.cancelled == 1
+    assert client.stats()["hedged"] == 1
+    assert client.stats()["hedge_wins"] == 1
+
+
+def test_streams_are_never_hedged(fake_openai):
+    client = warmed_up(fake_openai, latency=0.0)
+    fake_openai.delays = [0.05]
+
+    async def scenario():
+        stream = await client.create(model="m", messages=MESSAGES, stream=True)
+        return "".join([chunk.choices[0].delta.content async for chunk in stream])
+
+    assert asyncio.run(scenario()) == fake_openai.answer
+    assert len(fake_openai.calls) == 1
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    A local chat completions endpoint. Each request takes the next
+    (status, delay) pair from `script`, waits `delay` seconds, then answers
+    with that status; once the script runs out it answers 200 at once.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.script = []
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def next_reply(self):
+        with self.lock:
+            self.requests += 1
+            return self.script.pop(0) if self.script else (200, 0)
+
+    def handle_error(self, request, client_address):
+        # Clients hang up on slow replies (timeouts, lost hedges)
+        pass
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        status, delay = self.server.next_reply()
+        if self.server.stopped.wait(delay):
+            return
+        if status == 200:
+            body = {
+                "id": f"stub-{self.server.requests}",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "m",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": f"status {status} after {delay}s"},
+                    "finish_reason": "stop"
+                }]
+            }
+        else:
+            body = {"error": {"message": f"status {status}"}}
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    """A StubServer that clients from create_openai_client talk to."""
+    server = StubServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+    yield server
+    server.stopped.set()
+    server.shutdown()
+    server.server_close()
+
+
+def call_stub(client: LLMClient):
+    async def scenario():
+        try:
+            return await client.create(model="m", messages=MESSAGES)
+        finally:
+            await client.close()
+
+    return asyncio.run(scenario())
+
+
+def test_stub_server_503_is_retried(stub_server):
+    stub_server.script = [(503, 0)]
+    client = LLMClient(create_openai_client("sk-test"), max_retries=1, retry_base_delay=0.01)
+
+    response = call_stub(client)
+
+    assert answer(response) == "status 200 after 0s"
+    assert stub_server.requests == 2
+    assert client.stats()["retries"] == 1
+
+
+def test_stub_server_read_timeout_fires(monkeypatch, stub_server):
+    monkeypatch.setenv("LLM_HTTP_READ_TIMEOUT_SECONDS", "0.2")
+    stub_server.script = [(200, 5)]
+    client = LLMClient(create_openai_client("sk-test"), max_retries=0)
+
+    started = time.monotonic()
+    with pytest.raises(openai.APITimeoutError):
+        call_stub(client)
+    assert time.monotonic() - started < 2
+    assert stub_server.requests == 1
+
+
+def test_stub_server_read_timeout_is_retried(monkeypatch, stub_server):
+    monkeypatch.setenv("LLM_HTTP_READ_TIMEOUT_SECONDS", "0.2")
+    stub_server.script = [(200, 5)]
+    client = LLMClient(create_openai_client("sk-test"), max_retries=1, retry_base_delay=0.01)
+
+    response = call_stub(client)
+
+    assert answer(response) == "status 200 after 0s"
+    assert stub_server.requests == 2
+    assert client.stats()["retries"] == 1
+
+
+def test_stub_server_slow_first_response_is_hedged(stub_server):
+    # The first request stalls; the hedge answers at once
+    stub_server.script = [(200, 5), (200, 0)]
+    client = LLMClient(create_openai_client("sk-test"), hedge=True, hedge_min_samples=5)
+    for _ in range(5):
+        client.latencies.record(0.1)
+
+    started = time.monotonic()
+    response = call_stub(client)
+
+    assert answer(response) == "status 200 after 0s"
+    assert time.monotonic() - started < 2
+    assert stub_server.requests == 2
+    assert client.stats()["hedged"] == 1
+    assert client.stats()["hedge_wins"] == 1
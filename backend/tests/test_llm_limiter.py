@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from backend.services.llm_limiter import ConcurrencyLimiter, LLMOverloadedError
+
+
+def test_waiters_get_freed_slots_in_arrival_order():
+    async def scenario():
+        limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=5, queue_timeout_seconds=5)
+        order = []
+        release = asyncio.Event()
+
+        async def call(name):
+            async with limiter.slot():
+                order.append(name)
+                await release.wait()
+
+        tasks = [asyncio.create_task(call(name)) for name in ("a", "b", "c")]
+        await asyncio.sleep(0)
+        assert (limiter.active, limiter.queue_depth) == (1, 2)
+        release.set()
+        await asyncio.gather(*tasks)
+        return limiter, order
+
+    limiter, order = asyncio.run(scenario())
+    assert order == ["a", "b", "c"]
+    stats = limiter.stats()
+    assert (stats["active"], stats["queue_depth"], stats["max_queue_depth"], stats["admitted"]) == (0, 0, 2, 3)
+
+
+def test_calls_beyond_the_queue_fail_fast():
+    async def scenario():
+        limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=1, queue_timeout_seconds=5)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        with pytest.raises(LLMOverloadedError):
+            await limiter.acquire()
+
+        limiter.release()
+        await waiter
+        limiter.release()
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.stats()["rejected_queue_full"] == 1
+    assert limiter.active == 0
+
+
+def test_waits_past_the_deadline_are_rejected():
+    async def scenario():
+        limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=5, queue_timeout_seconds=0.01)
+        await limiter.acquire()
+        with pytest.raises(LLMOverloadedError):
+            await limiter.acquire()
+        assert limiter.queue_depth == 0
+
+        # The timed-out waiter is gone, so the slot goes back to the pool
+        limiter.release()
+        await limiter.acquire()
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.stats()["rejected_timeout"] == 1
+    assert limiter.active == 1
+
+
+def test_cancelled_waiter_does_not_keep_a_slot():
+    async def scenario():
+        limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=5, queue_timeout_seconds=5)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert limiter.queue_depth == 0
+
+        # The slot is not handed to the cancelled waiter
+        limiter.release()
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert (limiter.active, limiter.queue_depth) == (0, 0)
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import random
+import threading
+
+import pytest
+
+from backend.services.admin_qa_service import AdminQAService
+from backend.services.matching_pipeline import MatchingPipeline, MatchQuery
+from backend.services.qa_service import QAService
+
+
+@pytest.fixture
+def services(tmp_path):
+    rng = random.Random(0)
+    words = [f"word{i}" for i in range(40)] + ["what", "is", "your", "price"]
+
+    def sentence():
+        return " ".join(rng.choice(words) for _ in range(rng.randint(2, 5)))
+
+    predefined_file = tmp_path / "predefined_qa.json"
+    predefined_file.write_text(json.dumps({"questions": [
+        {"question": sentence(), "answer": f"predefined {i}", "keywords": [rng.choice(words)]}
+        for i in range(200)
+    ]}), encoding="utf-8")
+    admin_file = tmp_path / "admin_qa.json"
+    admin_file.write_text(json.dumps({"qa_pairs": [
+        {"id": i + 1, "question": sentence(), "answer": f"admin {i}"} for i in range(50)
+    ], "next_id": 51}), encoding="utf-8")
+
+    admin = AdminQAService(qa_file_path=admin_file, backend="json", storage_mode="snapshot")
+    qa = QAService(qa_file_path=predefined_file, backend="json")
+    return admin, qa, rng, sentence
+
+
+def make_pipeline(admin, qa):
+    pipeline = MatchingPipeline(version=lambda: (admin.version, qa.version))
+    pipeline.add_tier("admin", admin.match, admin.get_all_questions, languages=admin.get_languages)
+    pipeline.add_tier("predefined", qa.match, qa.get_all_questions, languages=qa.get_languages)
+    return pipeline
+
+
+def test_patched_map_equals_rebuilt_map(services):
+    admin, qa, rng, sentence = services
+    pipeline = make_pipeline(admin, qa)
+    built = (admin.version, qa.version)
+    pipeline.rebuild(built)
+
+    for _ in range(40):
+        pair_ids = [pair["id"] for pair in admin.qa_pairs]
+        operation = rng.choice(["add", "update", "delete"])
+        question = rng.choice(qa.get_all_questions()) if rng.random() < 0.5 else sentence()
+        if operation == "add":
+            admin.add_qa_pair(question, "added")
+        elif operation == "update":
+            admin.update_qa_pair(rng.choice(pair_ids), question, "updated")
+        else:
+            admin.delete_qa_pair(rng.choice(pair_ids))
+
+        version = (admin.version, qa.version)
+        changes = admin.changes_since(built[0], version[0])
+        assert changes is not None
+        assert pipeline.patch(version, "admin", *changes)
+        built = version
+
+        rebuilt = make_pipeline(admin, qa)
+        rebuilt.rebuild(version)
+        assert pipeline._built[1] == rebuilt._built[1]
+
+
+def test_changes_are_unknown_after_reload(services):
+    admin, _, _, _ = services
+    version = admin.version
+    admin.add_qa_pair("first question", "answer")
+    assert admin.changes_since(version, admin.version) == ([], ["first question"])
+
+    admin.qa_file_path.write_text(json.dumps({"qa_pairs": []}), encoding="utf-8")
+    admin.reload()
+    assert admin.changes_since(version, admin.version) is None
+
+
+def test_stale_map_is_not_used(services):
+    admin, qa, _, _ = services
+    pipeline = make_pipeline(admin, qa)
+    pipeline.rebuild((admin.version, qa.version))
+    pair = admin.qa_pairs[0]
+    admin.update_qa_pair(pair["id"], pair["question"], "edited")
+
+    tier, match = pipeline.match(MatchQuery(pair["question"]))
+    assert (tier, match["answer"]) == ("admin", "edited")
+    assert pipeline.stats()["exact"]["calls"] == 0
+
+
+def test_tiers_are_scanned_on_a_worker_thread(services):
+    admin, qa, _, _ = services
+    pipeline = make_pipeline(admin, qa)
+    threads = []
+    match = admin.match
+    pipeline._tiers[0] = ("admin", lambda query: threads.append(threading.current_thread()) or match(query))
+    question = admin.qa_pairs[0]["question"]
+
+    async def scenario():
+        first = await pipeline.match_in_thread(MatchQuery(question))
+        # Memoized on the calling thread, so asking again scans nothing
+        second = await pipeline.match_in_thread(MatchQuery(question))
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == second == ("admin", admin.match(MatchQuery(question)))
+    assert len(threads) == 1 and threads[0] is not threading.main_thread()
+    assert pipeline.stats()["memo"]["matches"] == 1
+
+
+def test_memo_is_dropped_when_the_knowledge_changes(admin_qa_file, chatbot_service, tmp_path):
+    pipeline = chatbot_service.matching_pipeline
+    admin = chatbot_service.admin_qa_service
+    message = MatchQuery("zxqvw blorf", "en")
+
+    def tier_calls():
+        return pipeline.stats()["admin"]["calls"]
+
+    assert pipeline.match(message) is None
+    calls = tier_calls()
+    assert pipeline.match(message) is None
+    assert tier_calls() == calls
+    assert pipeline.stats()["memo"]["matches"] == 1
+
+    qa = admin.add_qa_pair("What is zxqvw blorf?", "added")
+    assert pipeline.match(message)[1]["answer"] == "added"
+    admin.update_qa_pair(qa["id"], qa["question"], "edited")
+    assert pipeline.match(message)[1]["answer"] == "edited"
+    admin.delete_qa_pair(qa["id"])
+    assert pipeline.match(message) is None
+    assert tier_calls() == calls + 3
+
+    faq_file = tmp_path / "faqs.json"
+    faq_file.write_text(json.dumps({"blorf": {"keywords": ["blorf"], "answer": "faq"}}), encoding="utf-8")
+    chatbot_service.faq_service.faq_file_path = faq_file
+    assert chatbot_service.faq_service.reload_faqs()
+    assert pipeline.match(message) == ("faq", {"topic": "blorf", "answer": "faq"})
@@ -0,0 +1,67 @@
+import json
+import random
+
+from backend.services.qa_service import QAService
+
+
+def reference_score(message, entry):
+    """The keyword ratio formula, applied to every entry as before the index."""
+    message = message.lower().strip()
+    if message == entry["question"].lower().strip():
+        return 1.0
+    keywords = entry.get("keywords", [])
+    matched = sum(1 for keyword in keywords if keyword.lower() in message)
+    if matched and keywords:
+        return min(
+            QAService.KEYWORD_MATCH_CEILING,
+            QAService.BASE_SCORE + matched / len(keywords) * QAService.MAX_KEYWORD_SCORE
+        )
+    return 0.0
+
+
+def reference_answer(message, entries, threshold=0.3):
+    best, best_score = None, 0.0
+    for entry in entries:
+        score = reference_score(message, entry)
+        if score > best_score:
+            best, best_score = entry, score
+    if best is None or best_score < threshold:
+        return None
+    return {"answer": best["answer"], "question": best["question"], "confidence": best_score}
+
+
+def write_entries(path, entries):
+    path.write_text(json.dumps({"questions": entries}), encoding="utf-8")
+
+
+def test_indexed_scores_equal_scoring_every_entry(tmp_path):
+    rng = random.Random(0)
+    words = ["price", "pricing", "web", "website", "seo", "logo", "app", "team", "ceo", "fee"]
+    entries = [
+        {
+            "question": " ".join(rng.sample(words, 3)),
+            "answer": f"answer {i}",
+            "keywords": rng.sample(words, rng.randint(1, 4))
+        }
+        for i in range(60)
+    ]
+    qa_file = tmp_path / "predefined_qa.json"
+    write_entries(qa_file, entries)
+    qa = QAService(qa_file_path=qa_file)
+
+    messages = [" ".join(rng.sample(words, rng.randint(1, 4))) for _ in range(200)]
+    messages += [entry["question"].upper() for entry in entries[:10]] + ["nothing here", ""]
+    for message in messages:
+        assert qa.find_answer(message) == reference_answer(message, entries), message
+
+
+def test_reload_rebuilds_the_index(tmp_path):
+    qa_file = tmp_path / "predefined_qa.json"
+    write_entries(qa_file, [{"question": "What are your fees?", "answer": "fees", "keywords": ["fees"]}])
+    qa = QAService(qa_file_path=qa_file)
+    assert qa.find_answer("fees please")["answer"] == "fees"
+
+    write_entries(qa_file, [{"question": "Do you do SEO?", "answer": "seo", "keywords": ["seo"]}])
+    assert qa.reload_qa_data()
+    assert qa.find_answer("fees please") is None
+    assert qa.find_answer("seo please")["answer"] == "seo"
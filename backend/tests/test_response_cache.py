@@ -0,0 +1,83 @@
+import asyncio
+
+from backend.services.response_cache import ResponseCache, normalize_message
+from backend.tests.conftest import LLM_QUESTION
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_normalize_message_ignores_case_spacing_and_punctuation():
+    assert normalize_message("  What   are your HOURS?? ") == normalize_message("what are your hours")
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = ResponseCache(max_entries=10, ttl_seconds=60, clock=clock)
+    cache.get("key", 1)
+    cache.put("key", 1, "answer")
+
+    clock.now = 59
+    assert cache.get("key", 1) == "answer"
+    clock.now = 60
+    assert cache.get("key", 1) is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.get("a", 1)
+    cache.put("a", 1, "A")
+    cache.put("b", 1, "B")
+    cache.get("a", 1)
+    cache.put("c", 1, "C")
+
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) == "A"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_version_change_drops_entries_and_stale_puts():
+    cache = ResponseCache()
+    cache.get("key", 1)
+    cache.put("key", 1, "answer")
+
+    assert cache.get("key", 2) is None
+    assert cache.stats()["invalidations"] == 1
+    # Computed against version 1 after version 2 was seen
+    cache.put("key", 1, "stale")
+    assert cache.get("key", 2) is None
+
+
+def test_disabled_cache_stores_nothing():
+    cache = ResponseCache(max_entries=0)
+    cache.get("key", 1)
+    cache.put("key", 1, "answer")
+    assert cache.get("key", 1) is None
+
+
+def test_repeated_question_is_answered_from_cache(chatbot_service, fake_openai):
+    async def scenario():
+        first = await chatbot_service.process_message(LLM_QUESTION, "conversation-1")
+        second = await chatbot_service.process_message(LLM_QUESTION.upper() + "?", "conversation-2")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert len(fake_openai.calls) == 1
+    assert first["metadata"]["cache_hit"] is False
+    assert second["metadata"]["cache_hit"] is True
+    assert second["message"] == fake_openai.answer
+
+
+def test_follow_up_turns_are_not_cached(chatbot_service, fake_openai):
+    async def scenario():
+        await chatbot_service.process_message(LLM_QUESTION, "conversation-1")
+        return await chatbot_service.process_message(LLM_QUESTION, "conversation-1")
+
+    follow_up = asyncio.run(scenario())
+    assert len(fake_openai.calls) == 2
+    assert follow_up["metadata"]["cache_hit"] is False
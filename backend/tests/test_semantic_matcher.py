@@ -0,0 +1,117 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import asyncio
+
+from backend.services import semantic_matcher
+from backend.services.matching_pipeline import MatchQuery
+from backend.services.semantic_matcher import DEFAULT_THRESHOLD, ANNIndex, SemanticMatcher, embed_texts
+from backend.tests.conftest import LLM_QUESTION, make_chatbot_service
+
+
+def make_documents(count: int):
+    return [(f"question number {i} about topic {i % 97}", {"id": i}, "en") for i in range(count)]
+
+
+def test_matches_previous_index_until_rebuild():
+    documents = [("how much does a press release cost", {"id": 1}, "en")]
+    matcher = SemanticMatcher(lambda: list(documents), threshold=0.6)
+    assert matcher.match(MatchQuery("press release cost")) is None
+
+    matcher.rebuild()
+    documents[0] = ("do you run social media campaigns", {"id": 2}, "en")
+    assert matcher.match(MatchQuery("press release costs"))["id"] == 1
+
+    matcher.rebuild()
+    assert matcher.match(MatchQuery("press release costs")) is None
+    assert matcher.match(MatchQuery("do you run social media campaign"))["id"] == 2
+
+
+def test_rebuild_only_embeds_new_texts(monkeypatch):
+    documents = make_documents(50)
+    matcher = SemanticMatcher(lambda: list(documents))
+    matcher.rebuild()
+
+    embedded = []
+
+    def counting_embed(texts, dim=512):
+        embedded.extend(texts)
+        return embed_texts(texts, dim)
+
+    monkeypatch.setattr(semantic_matcher, "embed_texts", counting_embed)
+    documents[7] = ("a brand new question", {"id": "new"}, "en")
+    matcher.rebuild()
+
+    assert embedded == ["a brand new question"]
+    partition = matcher._partitions["en"]
+    assert np.allclose(partition.index.item_vectors(), embed_texts(partition.texts))
+
+
+def test_centroids_are_reused_when_most_vectors_carry_over():
+    documents = make_documents(2100)
+    matcher = SemanticMatcher(lambda: list(documents))
+    matcher.rebuild()
+    centroids = matcher._partitions["en"].index.centroids
+    assert centroids is not None
+
+    documents[0] = ("a brand new question", {"id": "new"}, "en")
+    matcher.rebuild()
+    assert matcher._partitions["en"].index.centroids is centroids
+
+    documents[:] = [(f"entirely different text {i}", {"id": i}, "en") for i in range(2100)]
+    matcher.rebuild()
+    assert matcher._partitions["en"].index.centroids is not centroids
+
+
+def test_item_vectors_round_trip_through_clustering():
+    vectors = embed_texts([text for text, _, _ in make_documents(2100)])
+    index = ANNIndex(vectors)
+    assert index.centroids is not None
+    assert np.array_equal(index.item_vectors(), vectors)
+
+
+def test_semantic_tier_runs_after_the_keyword_tiers(semantic_chatbot_service, fake_openai):
+    service = semantic_chatbot_service
+    assert service.matching_pipeline.tier_names == ["admin", "faq", "predefined", "semantic"]
+
+    async def ask(message: str):
+        return await service.process_message(message, f"conversation-{message}")
+
+    # A keyword tier answers before the semantic tier is tried
+    keyword = asyncio.run(ask("Do you guys handle crisis management"))
+    assert keyword["metadata"]["source"] == "predefined"
+    assert keyword["metadata"]["matched_question"] == "Do you provide crisis management?"
+
+    # A paraphrase no keyword tier matches
+    paraphrase = asyncio.run(ask("What service do you offer?"))
+    assert paraphrase["metadata"]["source"] == "semantic"
+    assert paraphrase["metadata"]["matched_question"] == "What services do you offer?"
+    assert paraphrase["metadata"]["similarity"] >= service.semantic_matcher.threshold
+    assert paraphrase["answer_source"] == "predefined"
+    assert fake_openai.calls == []
+
+    # Off-topic messages stay under the threshold and go to the LLM
+    assert service.matching_pipeline.match(MatchQuery("What is the capital of France", "en")) is None
+    off_topic = asyncio.run(ask(LLM_QUESTION))
+    assert off_topic["metadata"]["source"] == "llm"
+    assert len(fake_openai.calls) == 1
+
+
+def test_near_miss_questions_fall_through_to_the_llm(monkeypatch, fake_openai):
+    monkeypatch.delenv("SEMANTIC_THRESHOLD", raising=False)
+
+    # The tier is opt-in
+    service = make_chatbot_service(monkeypatch, fake_openai, semantic_matching=None)
+    assert service.semantic_matcher is None
+
+    # Turned on, the default threshold still rejects questions a letter or
+    # two away from a curated one ("Who is your CEO?" scores about 0.79)
+    service = make_chatbot_service(monkeypatch, fake_openai, semantic_matching=True)
+    assert service.semantic_matcher.threshold == DEFAULT_THRESHOLD
+    for question in ("Who is your CFO?", "Who is your CTO?", "Who is your cook?"):
+        assert service.matching_pipeline.match(MatchQuery(question, "en")) is None
+
+    response = asyncio.run(service.process_message("Who is your CFO?", "conversation-cfo"))
+    assert response["metadata"]["source"] == "llm"
+    assert len(fake_openai.calls) == 1
@@ -0,0 +1,95 @@
+import asyncio
+
+from backend.services.single_flight import SingleFlight
+from backend.tests.conftest import LLM_QUESTION
+
+
+def test_concurrent_calls_share_one_flight():
+    async def scenario():
+        flights = SingleFlight()
+        gate = asyncio.Event()
+        calls = 0
+
+        async def fn():
+            nonlocal calls
+            calls += 1
+            await gate.wait()
+            return "answer"
+
+        callers = [asyncio.ensure_future(flights.run("key", fn)) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert len(flights) == 1
+        gate.set()
+        results = await asyncio.gather(*callers)
+        return flights, calls, results
+
+    flights, calls, results = asyncio.run(scenario())
+    assert calls == 1
+    assert [result for result, _ in results] == ["answer"] * 3
+    assert [shared for _, shared in results] == [False, True, True]
+    assert flights.stats() == {"in_flight": 0, "calls": 1, "coalesced": 2}
+
+
+def test_errors_are_shared_and_not_remembered():
+    async def scenario():
+        flights = SingleFlight()
+        gate = asyncio.Event()
+
+        async def failing():
+            await gate.wait()
+            raise ValueError("upstream failed")
+
+        callers = [asyncio.ensure_future(flights.run("key", failing)) for _ in range(2)]
+        await asyncio.sleep(0)
+        gate.set()
+        outcomes = await asyncio.gather(*callers, return_exceptions=True)
+
+        async def succeeding():
+            return "answer"
+
+        return outcomes, await flights.run("key", succeeding)
+
+    outcomes, retry = asyncio.run(scenario())
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+    assert retry == ("answer", False)
+
+
+def test_cancelled_caller_does_not_cancel_the_flight():
+    async def scenario():
+        flights = SingleFlight()
+        gate = asyncio.Event()
+
+        async def fn():
+            await gate.wait()
+            return "answer"
+
+        first = asyncio.ensure_future(flights.run("key", fn))
+        second = asyncio.ensure_future(flights.run("key", fn))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        gate.set()
+        return first, await second
+
+    first, second = asyncio.run(scenario())
+    assert first.cancelled()
+    assert second == ("answer", True)
+
+
+def test_identical_questions_make_one_llm_call(chatbot_service, fake_openai):
+    async def scenario():
+        fake_openai.gate = asyncio.Event()
+        callers = [
+            asyncio.ensure_future(chatbot_service.process_message(LLM_QUESTION, f"conversation-{i}"))
+            for i in range(3)
+        ]
+        while not fake_openai.calls:
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+        fake_openai.gate.set()
+        return await asyncio.gather(*callers)
+
+    responses = asyncio.run(scenario())
+    assert len(fake_openai.calls) == 1
+    assert {response["message"] for response in responses} == {fake_openai.answer}
+    assert sorted(response["metadata"]["coalesced"] for response in responses) == [False, True, True]
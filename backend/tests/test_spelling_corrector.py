@@ -0,0 +1,95 @@
+import pytest
+
+from backend.services.matching_pipeline import MatchQuery
+from backend.services.spelling_corrector import SpellingCorrector
+
+
+def record_index_updates(monkeypatch, corrector: SpellingCorrector):
+    """Record the words whose counts _add and _remove change."""
+    updates = {"added": [], "removed": []}
+    add, remove = corrector._add, corrector._remove
+
+    def record_add(word, count):
+        updates["added"].append(word)
+        add(word, count)
+
+    def record_remove(word, count):
+        updates["removed"].append(word)
+        remove(word, count)
+
+    monkeypatch.setattr(corrector, "_add", record_add)
+    monkeypatch.setattr(corrector, "_remove", record_remove)
+    return updates
+
+
+def test_corrects_within_the_edit_distance():
+    corrector = SpellingCorrector()
+    corrector.update_source("predefined", ["crisis management", "chief executive", "pricing"])
+
+    assert corrector.correct("crisys") == "crisis"
+    assert corrector.correct("pricng") == "pricing"
+    assert corrector.correct_text("cheif executive") == "chief executive"
+    # Short words and words too far from any vocabulary word are kept
+    assert corrector.correct("prc") is None
+    assert corrector.correct("zxqvw") is None
+    assert corrector.correct_text("zxqvw blorf") == "zxqvw blorf"
+
+
+def test_update_source_reindexes_only_changed_words(monkeypatch):
+    corrector = SpellingCorrector()
+    corrector.update_source("admin", ["urgent crisis hotline"])
+    corrector.update_source("faq", ["hotline"])
+    updates = record_index_updates(monkeypatch, corrector)
+
+    corrector.update_source("admin", ["urgent crisis helpline"])
+    assert updates == {"added": ["helpline"], "removed": ["hotline"]}
+    # Still in the FAQ vocabulary
+    assert "hotline" in corrector
+    assert corrector.correct("helplin") == "helpline"
+
+    corrector.update_source("faq", [])
+    assert corrector.correct("hotlin") is None
+
+
+@pytest.mark.parametrize("message, tier, corrected", [
+    ("crisys", "admin", "crisis"),
+    ("cheif executive", "faq", "chief executive"),
+    ("pricng", "faq", "pricing"),
+])
+def test_misspelled_message_matches_after_correction(chatbot_service, message, tier, corrected):
+    name, match = chatbot_service.matching_pipeline.match(MatchQuery(message, "en"))
+
+    assert name == tier
+    assert match["corrected_message"] == corrected
+
+
+def test_message_without_corrections_or_matches_goes_unanswered(chatbot_service):
+    assert chatbot_service.matching_pipeline.match(MatchQuery("zxqvw blorf", "en")) is None
+
+
+def test_admin_edit_reindexes_only_its_words(admin_qa_file, chatbot_service, monkeypatch):
+    admin = chatbot_service.admin_qa_service
+    corrector = chatbot_service.spelling_corrector
+    updates = record_index_updates(monkeypatch, corrector)
+    sources = []
+    update_source = corrector.update_source
+    monkeypatch.setattr(
+        corrector, "update_source", lambda source, words: (sources.append(source), update_source(source, words))
+    )
+
+    assert "masterclasses" not in corrector
+    qa = admin.add_qa_pair("Do you run masterclasses?", "Yes, every quarter.")
+    chatbot_service._rebuild_indexes()
+    assert sources == ["admin"]
+    assert set(updates["added"]) == {"do", "you", "run", "masterclasses"}
+    assert updates["removed"] == []
+    name, match = chatbot_service.matching_pipeline.match(MatchQuery("masterclases", "en"))
+    assert (name, match["answer"]) == ("admin", "Yes, every quarter.")
+    assert match["corrected_message"] == "masterclasses"
+
+    updates["added"].clear()
+    admin.delete_qa_pair(qa["id"])
+    chatbot_service._rebuild_indexes()
+    assert updates["added"] == []
+    assert set(updates["removed"]) == {"do", "you", "run", "masterclasses"}
+    assert "masterclasses" not in corrector
@@ -0,0 +1,116 @@
+import json
+
+from backend.services.admin_qa_service import AdminQAService
+from backend.services.sqlite_qa_store import SQLiteAdminQAStore, SQLitePredefinedQAStore
+
+PAIRS = [
+    {"id": 1, "question": "What are your fees?", "answer": "fees"},
+    {"id": 2, "question": "How long does a website take?", "answer": "timeline"},
+    {"id": 3, "question": "Do you offer SEO services?", "answer": "seo"},
+    {"id": 5, "question": "Fees for a \"quick\" logo?", "answer": "logo"},
+]
+
+
+def answers(entries):
+    return [entry["qa"]["answer"] for entry in entries]
+
+
+def test_fts_candidates_share_a_word_in_list_order(tmp_path):
+    store = SQLiteAdminQAStore(tmp_path / "qa.sqlite3")
+    store.import_pairs(PAIRS, 6)
+
+    assert answers(store.find_candidates({"fees"})) == ["fees", "logo"]
+    assert answers(store.find_candidates({"seo", "website"})) == ["timeline", "seo"]
+    # Quotes in a word cannot break out of the FTS5 query
+    assert answers(store.find_candidates({'"quick"'})) == ["logo"]
+    assert answers(store.find_candidates({"unknown"})) == []
+    assert answers(store.find_candidates(set())) == []
+    assert answers(store.find_candidates({"fees"}, frozenset({"hi"}))) == []
+
+    entry = store.find_candidates({"logo"})[0]
+    assert entry["question_lower"] == 'fees for a "quick" logo?'
+    assert entry["question_words"] == {"fees", "for", "a", "quick", "logo"}
+
+    # The full-text index follows updates and deletes
+    store.update(1, "What is your pricing?", "pricing")
+    store.delete(5)
+    assert answers(store.find_candidates({"fees"})) == []
+    assert answers(store.find_candidates({"pricing"})) == ["pricing"]
+    store.close()
+
+
+def test_predefined_entries_resync_only_when_the_source_changes(tmp_path):
+    db_path = tmp_path / "qa.sqlite3"
+    store = SQLitePredefinedQAStore(db_path)
+    entries = [{"question": "What are your fees?", "answer": "fees", "keywords": ["fees", "price"]}]
+    assert store.sync(entries, "predefined_qa.json:1:100")
+    assert not store.sync(entries, "predefined_qa.json:1:100")
+    assert [(entry["answer"], matched, total) for entry, matched, total in store.keyword_matches("fees please")] == [
+        ("fees", 1, 2)
+    ]
+
+    # Another worker resyncs a new version of the file; this worker's
+    # keyword automaton is rebuilt for it
+    other = SQLitePredefinedQAStore(db_path)
+    assert other.sync(
+        [{"question": "Do you do SEO?", "answer": "seo", "keywords": ["seo"]}], "predefined_qa.json:2:90"
+    )
+    assert store.keyword_matches("fees please") == []
+    assert [entry["answer"] for entry, _, _ in store.keyword_matches("seo audit")] == ["seo"]
+    assert store.find_exact("do you do seo?") == {"question": "Do you do SEO?", "answer": "seo"}
+    assert store.all_questions() == ["Do you do SEO?"]
+    store.close()
+    other.close()
+
+
+def test_exported_pairs_import_back_unchanged(tmp_path):
+    store = SQLiteAdminQAStore(tmp_path / "qa.sqlite3")
+    assert store.import_pairs(PAIRS, 6)
+    added = store.add("Where are you based?", "location")
+    store.update(2, "How long does an app take?", "app timeline")
+    store.delete(3)
+
+    exported = []
+    assert store.export_pairs(exported.append) == 4
+    data = exported[0]
+    assert data["next_id"] == added["id"] + 1 == 7
+    assert data["qa_pairs"] == store.all_pairs()
+
+    # The exported file counts as imported, so it is not imported back
+    assert not store.import_pairs(data["qa_pairs"], data["next_id"])
+
+    fresh = SQLiteAdminQAStore(tmp_path / "fresh.sqlite3")
+    assert fresh.import_pairs(data["qa_pairs"], data["next_id"])
+    assert fresh.all_pairs() == store.all_pairs()
+    assert fresh.next_id == store.next_id
+    store.close()
+    fresh.close()
+
+
+def test_file_changes_never_overwrite_edited_pairs(tmp_path):
+    store = SQLiteAdminQAStore(tmp_path / "qa.sqlite3")
+    store.import_pairs(PAIRS, 6)
+    store.add("Where are you based?", "location")
+
+    assert not store.import_pairs(PAIRS[:1], 6)
+    assert store.count() == 5
+    store.close()
+
+
+def test_admin_pairs_are_read_from_the_database_once_per_version(tmp_path, monkeypatch):
+    monkeypatch.setenv("QA_SQLITE_PATH", str(tmp_path / "qa.sqlite3"))
+    admin_file = tmp_path / "admin_qa.json"
+    admin_file.write_text(json.dumps({"qa_pairs": PAIRS, "next_id": 6}), encoding="utf-8")
+    admin = AdminQAService(qa_file_path=admin_file, backend="sqlite", storage_mode="snapshot")
+
+    reads = []
+    all_pairs = admin._store.all_pairs
+    monkeypatch.setattr(admin._store, "all_pairs", lambda: reads.append(1) or all_pairs())
+
+    assert admin.get_all_questions() == [qa["question"] for qa in PAIRS]
+    assert admin.get_all_qa_pairs() == PAIRS
+    assert len(reads) == 1
+
+    admin.add_qa_pair("Where are you based?", "location")
+    assert admin.get_all_questions()[-1] == "Where are you based?"
+    assert len(reads) == 2
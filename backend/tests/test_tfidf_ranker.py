@@ -0,0 +1,91 @@
+import json
+import math
+import random
+import re
+from collections import Counter
+
+import pytest
+
+from backend.services.qa_service import QAService
+from backend.services.tfidf_ranker import TfidfRanker, numpy_available
+
+pytestmark = pytest.mark.skipif(not numpy_available(), reason="needs numpy")
+
+DOCUMENTS = [
+    "website design website",
+    "mobile app development",
+    "seo for your website",
+    "logo design",
+    "mobile app design",
+]
+
+
+def dense_scores(documents, text):
+    """Cosine similarities from full TF-IDF vectors, term by term."""
+    terms = [Counter(re.findall(r"\w+", doc.lower())) for doc in documents]
+    df = Counter(term for doc_terms in terms for term in doc_terms)
+    idf = lambda term: math.log((1 + len(documents)) / (1 + df[term])) + 1
+
+    def vector(counts):
+        return {term: (1 + math.log(count)) * idf(term) for term, count in counts.items()}
+
+    def norm(v):
+        return math.sqrt(sum(w * w for w in v.values())) or 1.0
+
+    query = vector(Counter(re.findall(r"\w+", text.lower())))
+    scores = []
+    for doc_terms in terms:
+        doc = vector(doc_terms)
+        dot = sum(weight * doc.get(term, 0.0) for term, weight in query.items())
+        scores.append(dot / (norm(doc) * norm(query)) if query else 0.0)
+    return scores
+
+
+def test_scores_equal_dense_cosine_similarity():
+    rng = random.Random(0)
+    words = sorted({word for doc in DOCUMENTS for word in doc.split()}) + ["unknown"]
+    ranker = TfidfRanker(DOCUMENTS)
+    for _ in range(100):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+        assert ranker.scores(text) == pytest.approx(dense_scores(DOCUMENTS, text)), text
+
+
+def test_top_k_orders_by_score_then_document_order():
+    ranker = TfidfRanker(DOCUMENTS)
+
+    # Both app documents share both terms; "development" is rarer than
+    # "design", so it weighs more in its document and dilutes the match.
+    # Documents sharing no term are left out
+    assert [doc_id for doc_id, _ in ranker.top_k("mobile app", 5)] == [4, 1]
+    assert [doc_id for doc_id, _ in ranker.top_k("mobile app", 1)] == [4]
+
+    # A rare term outweighs a common one
+    assert [doc_id for doc_id, _ in ranker.top_k("website logo", 3)] == [3, 0, 2]
+
+    # Equal scores keep document order
+    tied = TfidfRanker(["price list", "list price", "price"])
+    assert [doc_id for doc_id, _ in tied.top_k("price list", 2)] == [0, 1]
+
+
+def test_unknown_words_lower_the_score():
+    ranker = TfidfRanker(DOCUMENTS)
+    (_, on_topic), = ranker.top_k("logo design", 1)
+    (_, diluted), = ranker.top_k("logo design for my bakery", 1)
+
+    assert on_topic == pytest.approx(1.0)
+    assert 0 < diluted < on_topic
+    assert ranker.top_k("bakery", 1) == []
+
+
+def test_predefined_answers_use_the_ranker_threshold(tmp_path, monkeypatch):
+    monkeypatch.setenv("QA_RANKER_THRESHOLD", "0.5")
+    qa_file = tmp_path / "predefined_qa.json"
+    qa_file.write_text(json.dumps({"questions": [
+        {"question": question, "answer": f"answer {i}", "keywords": []} for i, question in enumerate(DOCUMENTS)
+    ]}), encoding="utf-8")
+    qa = QAService(qa_file_path=qa_file, ranker="tfidf")
+
+    match = qa.find_answer("logo design")
+    assert match["answer"] == "answer 3"
+    assert match["confidence"] == pytest.approx(1.0)
+    assert qa.find_answer("design ideas for my bakery") is None